@@ -1,10 +1,21 @@
 """분석기 기본 인터페이스"""
+import asyncio
+import structlog
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable
+from analyzers.cache import AnalysisCache
 from models.token import TokenAnalysis
 
+logger = structlog.get_logger()
+
 
 class BaseAnalyzer(ABC):
-    """토큰 분석기 추상 클래스"""
+    """토큰 분석기 추상 클래스
+
+    분석은 섹션(basic, security, market, contract ...)별 조회를 동시에 실행하고
+    _apply로 결과에 합친다. analyze_iter는 섹션이 끝날 때마다 중간 결과를 내보낸다.
+    섹션 조회는 AnalysisCache를 거치므로 사용자 간에 섹션별 TTL로 공유된다.
+    """
 
     @abstractmethod
     async def analyze(self, address: str) -> TokenAnalysis:
@@ -19,6 +30,52 @@ class BaseAnalyzer(ABC):
         """
         pass
 
+    @abstractmethod
+    def _new_analysis(self, address: str) -> TokenAnalysis:
+        """빈 분석 결과 생성"""
+        pass
+
+    @abstractmethod
+    def _sections(self, address: str) -> dict[str, Callable[[], Awaitable[Any]]]:
+        """섹션 이름 -> 조회 코루틴 함수 (캐시에 없을 때만 호출)"""
+        pass
+
+    @abstractmethod
+    def _apply(self, analysis: TokenAnalysis, section: str, result: Any):
+        """섹션 조회 결과를 분석 결과에 반영"""
+        pass
+
+    async def analyze_iter(self, address: str) -> AsyncIterator[tuple[TokenAnalysis, set[str]]]:
+        """
+        섹션이 끝날 때마다 (지금까지의 분석 결과, 남은 섹션) yield
+        마지막 yield의 남은 섹션은 비어 있다. 중간에 멈추면 남은 조회는 취소된다.
+
+        Args:
+            address: 토큰 컨트랙트 주소
+        """
+        analysis = self._new_analysis(address)
+        tasks = {
+            asyncio.ensure_future(AnalysisCache.fetch(analysis.chain, address, section, factory)): section
+            for section, factory in self._sections(address).items()
+        }
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    section = tasks[task]
+                    if task.exception() is not None:
+                        error = str(task.exception())
+                        logger.error("analysis_task_error", section=section, error=error)
+                        analysis.errors.append(f"Error in {section}: {error}")
+                    elif task.result() is not None:
+                        self._apply(analysis, section, task.result())
+                yield analysis, {tasks[task] for task in pending}
+        finally:
+            for task in pending:
+                task.cancel()
+
     @abstractmethod
     async def close(self):
         """리소스 정리"""
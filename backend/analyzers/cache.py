@@ -0,0 +1,140 @@
+"""토큰 분석 섹션 캐시 - 사용자 간 공유, 섹션별 TTL
+
+인기 토큰은 여러 사용자가 같은 주소를 연달아 붙여 넣는데, 매번 전체 분석을 다시 돌리지
+않도록 섹션(basic/contract/security/market) 조회 결과를 (체인, 주소, 섹션) 단위로 캐시한다.
+
+- contract: 검증된 컨트랙트는 사실상 불변 - 길게 (미검증은 나중에 검증될 수 있어 짧게)
+- basic, security: 약 1시간 (basic의 이름/심볼/decimals는 불변이지만 총 공급량은 민트/소각으로 바뀜)
+- market: 약 30초
+
+같은 섹션을 동시에 요청하면 진행 중인 조회 1건을 함께 기다린다 (요청 합치기).
+기다리는 요청이 모두 취소되면 조회도 취소한다 (추측 분석 취소가 실제 조회까지 멈추도록).
+조회 실패(None/예외)는 캐시하지 않는다.
+"""
+import asyncio
+import structlog
+from typing import Any, Awaitable, Callable, Optional
+from cachetools import TLRUCache
+
+from config import settings
+
+logger = structlog.get_logger()
+
+
+class AnalysisCache:
+    """(체인, 주소, 섹션) -> 섹션 조회 결과
+
+    봇 이벤트 루프에서만 사용한다.
+    """
+
+    _cache: Optional[TLRUCache] = None
+    _inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+    # 진행 중인 조회 태스크별 기다리는 요청 수
+    _waiters: dict[asyncio.Task, int] = {}
+    stats: dict[str, dict[str, int]] = {}
+
+    @staticmethod
+    def _ttl(key: tuple[str, str, str], value: Any) -> float:
+        """섹션별 TTL (초)"""
+        section = key[2]
+        if section == "market":
+            return settings.analysis_cache_market_ttl
+        if section in ("basic", "security"):
+            return settings.analysis_cache_security_ttl
+        if section == "contract" and not (isinstance(value, dict) and value.get("is_verified")):
+            return settings.analysis_cache_security_ttl
+        return settings.analysis_cache_static_ttl
+
+    @classmethod
+    def _get_cache(cls) -> TLRUCache:
+        if cls._cache is None:
+            cls._cache = TLRUCache(
+                maxsize=5000,
+                ttu=lambda key, value, now: now + cls._ttl(key, value),
+            )
+        return cls._cache
+
+    @staticmethod
+    def _key(chain: str, address: str, section: str) -> tuple[str, str, str]:
+        # EVM 주소는 대소문자 무시, Solana는 구분
+        return chain, address if chain == "solana" else address.lower(), section
+
+    @classmethod
+    def _count(cls, section: str, name: str):
+        counts = cls.stats.setdefault(section, {"hits": 0, "misses": 0, "coalesced": 0})
+        counts[name] += 1
+
+    @classmethod
+    async def fetch(
+        cls,
+        chain: str,
+        address: str,
+        section: str,
+        factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """캐시된 섹션 결과 반환 (없으면 조회, 진행 중인 같은 조회가 있으면 합류)"""
+        if not settings.analysis_cache_enabled:
+            return await factory()
+
+        key = cls._key(chain, address, section)
+        cache = cls._get_cache()
+        if key in cache:
+            cls._count(section, "hits")
+            return cache[key]
+
+        task = cls._inflight.get(key)
+        if task is None:
+            cls._count(section, "misses")
+            task = asyncio.create_task(factory())
+            cls._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: cls._on_done(key, t))
+        else:
+            cls._count(section, "coalesced")
+
+        # 요청 1건이 취소돼도 같은 조회를 기다리는 다른 요청은 계속,
+        # 마지막 요청이 취소되면 조회도 취소
+        cls._waiters[task] = cls._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if cls._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            cls._waiters[task] -= 1
+            if not cls._waiters[task]:
+                del cls._waiters[task]
+
+    @classmethod
+    def _on_done(cls, key: tuple[str, str, str], task: asyncio.Task):
+        """조회가 끝나면 성공한 결과만 캐시"""
+        if cls._inflight.get(key) is task:
+            del cls._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result is not None:
+            cls._get_cache()[key] = result
+
+    @classmethod
+    async def close(cls):
+        """진행 중인 조회 취소 + 캐시 비우기"""
+        tasks = list(cls._inflight.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        cls._inflight.clear()
+        cls._waiters.clear()
+        logger.info("analysis_cache_closed", **cls.get_stats())
+        if cls._cache is not None:
+            cls._cache.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """섹션별 hit/miss/합류 수 + 캐시 크기"""
+        return {
+            "sections": {section: dict(counts) for section, counts in cls.stats.items()},
+            "entries": len(cls._get_cache()),
+            "inflight": len(cls._inflight),
+        }
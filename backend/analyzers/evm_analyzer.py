@@ -1,7 +1,7 @@
 """EVM 체인 분석기"""
-import asyncio
 import structlog
-from web3 import Web3
+from functools import partial
+from web3 import AsyncWeb3
 from typing import Optional
 
 from analyzers.base import BaseAnalyzer
@@ -17,17 +17,12 @@ from models.token import (
 from services.contract_analysis.dexscreener import DEXScreenerService
 from services.contract_analysis.goplus import GoPlusService
 from services.contract_analysis.etherscan import EtherscanService
+from services.rpc_batcher import BatchingProvider
+from services.token_facts import CODE, CONTRACT, TokenFactsService
+from services.token_metadata import TokenMetadataService
 
 logger = structlog.get_logger()
 
-# ERC20 기본 ABI
-ERC20_ABI = [
-    {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-    {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-    {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
-    {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
-]
-
 
 class EVMAnalyzer(BaseAnalyzer):
     """EVM 체인 (ETH, BSC, Arbitrum, Base) 분석기"""
@@ -35,7 +30,11 @@ class EVMAnalyzer(BaseAnalyzer):
     def __init__(self, chain: str, config: ChainConfig):
         self.chain = chain
         self.config = config
-        self.web3 = Web3(Web3.HTTPProvider(config.rpc_url))
+        # 비동기 프로바이더 - RPC 호출이 executor 스레드 없이 이벤트 루프에서 처리되고,
+        # 다른 분석과 동시에 나온 호출은 JSON-RPC 배치로 묶인다 (공유 httpx 연결 풀)
+        self.web3 = AsyncWeb3(BatchingProvider(config.rpc_url))
+        # 읽기 전용이라 트랜잭션 검증 미들웨어는 불필요 (호출마다 eth_chainId 왕복이 추가됨)
+        self.web3.middleware_onion.remove("validation")
 
         # 서비스 초기화
         self.dexscreener = DEXScreenerService()
@@ -61,44 +60,9 @@ class EVMAnalyzer(BaseAnalyzer):
             address=address
         )
 
-        analysis = TokenAnalysis(
-            chain=self.chain,
-            chain_name=self.config.name,
-            address=address
-        )
-
-        # 병렬로 모든 데이터 수집
-        tasks = [
-            self._get_basic_info(address),
-            self._get_security_info(address),
-            self._get_market_info(address),
-        ]
-
-        if self.etherscan:
-            tasks.append(self._get_contract_info(address))
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 결과 처리
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                error_msg = f"Error in task {i}: {str(result)}"
-                logger.error("analysis_task_error", task_index=i, error=str(result))
-                analysis.errors.append(error_msg)
-            elif result is not None:
-                if i == 0:  # basic info
-                    analysis.basic = TokenBasicInfo(**result)
-                elif i == 1:  # security info
-                    analysis.security = TokenSecurityInfo(**result)
-                    # GoPlus에서 홀더 수와 오너 정보 병합
-                    if result.get("holder_count"):
-                        analysis.basic.holder_count = result["holder_count"]
-                    if result.get("owner"):
-                        analysis.basic.owner = result["owner"]
-                elif i == 2:  # market info
-                    analysis.market = TokenMarketInfo(**result)
-                elif i == 3:  # contract info
-                    analysis.contract = ContractInfo(**result)
+        # 병렬로 모든 데이터 수집 (섹션이 모두 끝난 마지막 결과)
+        async for analysis, _ in self.analyze_iter(address):
+            pass
 
         logger.info(
             "evm_analysis_completed",
@@ -110,53 +74,130 @@ class EVMAnalyzer(BaseAnalyzer):
 
         return analysis
 
+    def _new_analysis(self, address: str) -> TokenAnalysis:
+        """이 체인의 빈 분석 결과"""
+        return TokenAnalysis(
+            chain=self.chain,
+            chain_name=self.config.name,
+            address=address
+        )
+
+    def _sections(self, address: str) -> dict:
+        """basic(Multicall3), security(GoPlus), market(DEXScreener), contract(Etherscan 키가 있을 때)"""
+        sections = {
+            "basic": partial(self._get_basic_info, address),
+            "security": partial(self._get_security_info, address),
+            "market": partial(self._get_market_info, address),
+        }
+        if self.etherscan:
+            sections["contract"] = partial(self._get_contract_info, address)
+        return sections
+
+    def _apply(self, analysis: TokenAnalysis, section: str, result: dict):
+        """섹션 결과 반영 (basic과 security는 도착 순서와 관계없이 홀더 수/오너를 합침)"""
+        if section == "basic":
+            # 먼저 도착한 GoPlus 홀더 수/오너 정보는 유지
+            basic = TokenBasicInfo(**result)
+            basic.holder_count = basic.holder_count or analysis.basic.holder_count
+            basic.owner = basic.owner or analysis.basic.owner
+            analysis.basic = basic
+        elif section == "security":
+            analysis.security = TokenSecurityInfo(**result)
+            # GoPlus에서 홀더 수와 오너 정보 병합
+            if result.get("holder_count"):
+                analysis.basic.holder_count = result["holder_count"]
+            if result.get("owner"):
+                analysis.basic.owner = result["owner"]
+        elif section == "market":
+            analysis.market = TokenMarketInfo(**result)
+        elif section == "contract":
+            analysis.contract = ContractInfo(**result)
+
     async def _get_basic_info(self, address: str) -> Optional[dict]:
-        """Web3로 기본 정보 조회"""
+        """Multicall3로 기본 정보 조회 (eth_call 1회)"""
         try:
-            checksum_address = Web3.to_checksum_address(address)
-            contract = self.web3.eth.contract(address=checksum_address, abi=ERC20_ABI)
-
-            # 동기 호출을 비동기로 래핑
-            loop = asyncio.get_event_loop()
-
-            name = await loop.run_in_executor(None, contract.functions.name().call)
-            symbol = await loop.run_in_executor(None, contract.functions.symbol().call)
-            decimals = await loop.run_in_executor(None, contract.functions.decimals().call)
-            total_supply_raw = await loop.run_in_executor(None, contract.functions.totalSupply().call)
-
-            total_supply = total_supply_raw / (10 ** decimals)
-
-            # 큰 숫자 포맷팅
-            if total_supply >= 1_000_000_000_000:
-                formatted = f"{total_supply / 1_000_000_000_000:.2f}T"
-            elif total_supply >= 1_000_000_000:
-                formatted = f"{total_supply / 1_000_000_000:.2f}B"
-            elif total_supply >= 1_000_000:
-                formatted = f"{total_supply / 1_000_000:.2f}M"
-            elif total_supply >= 1_000:
-                formatted = f"{total_supply / 1_000:.2f}K"
-            else:
-                formatted = f"{total_supply:.2f}"
+            AsyncWeb3.to_checksum_address(address)  # 주소 형식 검증
+            infos = await self.get_basic_infos([address])
+            info = infos.get(address.lower())
+            if info is None:
+                raise ValueError("token metadata unavailable (decimals() failed)")
 
             logger.debug(
                 "basic_info_fetched",
-                name=name,
-                symbol=symbol,
-                decimals=decimals
+                name=info["name"],
+                symbol=info["symbol"],
+                decimals=info["decimals"]
             )
-
-            return {
-                "name": name,
-                "symbol": symbol,
-                "decimals": decimals,
-                "total_supply": total_supply,
-                "total_supply_formatted": formatted,
-            }
+            return info
 
         except Exception as e:
             logger.error("basic_info_error", error=str(e), address=address)
             return None
 
+    async def has_code(self, address: str) -> bool:
+        """이 체인에 컨트랙트 바이트코드가 있는지 (저장된 바이트코드 해시 -> eth_getCode)"""
+        chain_code = self.config.chain_code
+        if await TokenFactsService.get(chain_code, address, CODE) is not None:
+            return True
+
+        code = await self.web3.eth.get_code(AsyncWeb3.to_checksum_address(address))
+        if not code:
+            # 아직 배포 전일 수 있으므로 "없음"은 저장하지 않음
+            return False
+
+        await TokenFactsService.save(chain_code, address, CODE, {
+            "hash": AsyncWeb3.keccak(code).hex(),
+            "size": len(code),
+        })
+        return True
+
+    async def get_basic_infos(self, addresses: list[str]) -> dict[str, dict]:
+        """여러 토큰의 기본 정보 일괄 조회
+
+        name/symbol/decimals/totalSupply를 Multicall3 aggregate3 한 번에 묶는다
+        (메타데이터가 캐시에 있으면 totalSupply만). 함수별로 revert를 허용하므로
+        totalSupply가 없는 비표준 토큰도 나머지 정보는 채워진다.
+
+        Returns:
+            소문자 주소 -> TokenBasicInfo 필드 (decimals()가 실패한 주소는 제외)
+        """
+        results = await TokenMetadataService.get_with_supply(
+            self.config.chain_code, addresses, web3=self.web3
+        )
+
+        infos = {}
+        for address, (metadata, total_supply_raw) in results.items():
+            if metadata is None:
+                continue
+
+            total_supply = None
+            formatted = None
+            if total_supply_raw is not None:
+                total_supply = total_supply_raw / (10 ** metadata.decimals)
+                formatted = self._format_supply(total_supply)
+
+            infos[address] = {
+                "name": metadata.name,
+                "symbol": metadata.symbol,
+                "decimals": metadata.decimals,
+                "total_supply": total_supply,
+                "total_supply_formatted": formatted,
+            }
+        return infos
+
+    @staticmethod
+    def _format_supply(total_supply: float) -> str:
+        """큰 숫자 포맷팅"""
+        if total_supply >= 1_000_000_000_000:
+            return f"{total_supply / 1_000_000_000_000:.2f}T"
+        if total_supply >= 1_000_000_000:
+            return f"{total_supply / 1_000_000_000:.2f}B"
+        if total_supply >= 1_000_000:
+            return f"{total_supply / 1_000_000:.2f}M"
+        if total_supply >= 1_000:
+            return f"{total_supply / 1_000:.2f}K"
+        return f"{total_supply:.2f}"
+
     async def _get_security_info(self, address: str) -> Optional[dict]:
         """GoPlus로 보안 정보 조회"""
         try:
@@ -190,12 +231,19 @@ class EVMAnalyzer(BaseAnalyzer):
             return None
 
     async def _get_contract_info(self, address: str) -> Optional[dict]:
-        """Etherscan으로 컨트랙트 정보 조회"""
+        """Etherscan으로 컨트랙트 정보 조회 (검증된 컨트랙트는 저장해 두고 재사용)"""
         try:
+            stored = await TokenFactsService.get(self.config.chain_code, address, CONTRACT)
+            if stored is not None:
+                return stored
+
             data = await self.etherscan.get_contract_source(address)
 
             if data:
-                return self.etherscan.parse_contract_data(data)
+                info = self.etherscan.parse_contract_data(data)
+                if info.get("is_verified"):
+                    await TokenFactsService.save(self.config.chain_code, address, CONTRACT, info)
+                return info
             return {}
 
         except Exception as e:
@@ -0,0 +1,87 @@
+"""체인별 분석기 레지스트리 - 프로세스 수명 동안 재사용
+
+분석기를 요청마다 만들고 닫으면 분석마다 RPC/API 호스트 4곳에 TCP+TLS 연결을 새로 맺는다.
+체인별 분석기를 하나씩 두고 RPC 배처(공유 httpx 클라이언트)와 공유 aiohttp 세션
+(컨트랙트 분석 서비스)의 keep-alive 연결을 분석 사이에 재사용한다.
+
+aiohttp 세션은 루프에 묶이므로 봇 루프에서 start()/close() 한다.
+"""
+import asyncio
+import structlog
+from typing import Optional
+
+from analyzers.base import BaseAnalyzer
+from analyzers.evm_analyzer import EVMAnalyzer
+from analyzers.solana_analyzer import SolanaAnalyzer
+from config.chains import ALL_CHAINS, EVM_CHAINS, get_chain_configs
+from services.http_client import close_aiohttp_session, get_aiohttp_session
+
+logger = structlog.get_logger()
+
+
+class AnalyzerRegistry:
+    """체인 ID(ethereum, bsc, ..., solana) -> 분석기"""
+
+    _analyzers: dict[str, BaseAnalyzer] = {}
+
+    @classmethod
+    async def start(cls):
+        """모든 체인 분석기 생성 + 공유 세션 준비"""
+        for chain_id in ALL_CHAINS:
+            cls.get(chain_id)
+        await get_aiohttp_session()
+        logger.info("analyzer_registry_started", chains=list(cls._analyzers))
+
+    @classmethod
+    def get(cls, chain_id: str) -> Optional[BaseAnalyzer]:
+        """체인 분석기 (없는 체인이면 None, 처음 요청이면 생성)"""
+        analyzer = cls._analyzers.get(chain_id)
+        if analyzer is not None:
+            return analyzer
+
+        config = get_chain_configs().get(chain_id)
+        if config is None:
+            return None
+
+        if chain_id == "solana":
+            analyzer = SolanaAnalyzer(config)
+        else:
+            analyzer = EVMAnalyzer(chain_id, config)
+        cls._analyzers[chain_id] = analyzer
+        return analyzer
+
+    @classmethod
+    async def probe_evm(cls, address: str, timeout: float) -> tuple[list[str], list[str]]:
+        """모든 EVM 체인에 eth_getCode를 동시에 보내 컨트랙트가 있는 체인 찾기
+
+        Returns:
+            (컨트랙트가 있는 체인, 조회 실패/시간 초과 체인) - 둘 다 EVM_CHAINS 순서
+        """
+        analyzers = [cls.get(chain_id) for chain_id in EVM_CHAINS]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(analyzer.has_code(address), timeout) for analyzer in analyzers),
+            return_exceptions=True,
+        )
+
+        found, failed = [], []
+        for chain_id, result in zip(EVM_CHAINS, results):
+            if isinstance(result, Exception):
+                logger.warning("chain_probe_error", chain=chain_id, error=str(result) or type(result).__name__)
+                failed.append(chain_id)
+            elif result:
+                found.append(chain_id)
+
+        logger.info("chain_probe_completed", address=address, found=found, failed=failed)
+        return found, failed
+
+    @classmethod
+    async def close(cls):
+        """분석기 + 공유 세션 종료"""
+        for chain_id, analyzer in cls._analyzers.items():
+            try:
+                await analyzer.close()
+            except Exception as e:
+                logger.warning("analyzer_close_error", chain=chain_id, error=str(e))
+        cls._analyzers.clear()
+        await close_aiohttp_session()
+        logger.info("analyzer_registry_closed")
@@ -1,7 +1,6 @@
 """솔라나 체인 분석기"""
-import asyncio
 import structlog
-from solana.rpc.async_api import AsyncClient
+from functools import partial
 from solders.pubkey import Pubkey
 from typing import Optional
 
@@ -16,6 +15,7 @@ from models.token import (
 )
 from services.contract_analysis.dexscreener import DEXScreenerService
 from services.contract_analysis.goplus import GoPlusService
+from services.rpc_batcher import get_rpc_batcher
 
 logger = structlog.get_logger()
 
@@ -25,7 +25,6 @@ class SolanaAnalyzer(BaseAnalyzer):
 
     def __init__(self, config: ChainConfig):
         self.config = config
-        self.client = AsyncClient(config.rpc_url)
 
         # 서비스 초기화
         self.dexscreener = DEXScreenerService()
@@ -46,36 +45,9 @@ class SolanaAnalyzer(BaseAnalyzer):
             address=address
         )
 
-        analysis = TokenAnalysis(
-            chain="solana",
-            chain_name="Solana",
-            address=address
-        )
-
-        # 병렬로 모든 데이터 수집
-        tasks = [
-            self._get_basic_info(address),
-            self._get_security_info(address),
-            self._get_market_info(address),
-        ]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 결과 처리
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                error_msg = f"Error in task {i}: {str(result)}"
-                logger.error("analysis_task_error", task_index=i, error=str(result))
-                analysis.errors.append(error_msg)
-            elif result is not None:
-                if i == 0:  # basic info
-                    analysis.basic = TokenBasicInfo(**result)
-                elif i == 1:  # security info
-                    analysis.security = TokenSecurityInfo(**result)
-                    if result.get("holder_count"):
-                        analysis.basic.holder_count = result["holder_count"]
-                elif i == 2:  # market info
-                    analysis.market = TokenMarketInfo(**result)
+        # 병렬로 모든 데이터 수집 (섹션이 모두 끝난 마지막 결과)
+        async for analysis, _ in self.analyze_iter(address):
+            pass
 
         logger.info(
             "solana_analysis_completed",
@@ -86,18 +58,48 @@ class SolanaAnalyzer(BaseAnalyzer):
 
         return analysis
 
+    def _new_analysis(self, address: str) -> TokenAnalysis:
+        """솔라나 빈 분석 결과"""
+        return TokenAnalysis(
+            chain="solana",
+            chain_name="Solana",
+            address=address
+        )
+
+    def _sections(self, address: str) -> dict:
+        """basic(getTokenSupply), security(GoPlus), market(DEXScreener) - 컨트랙트 검증 섹션 없음"""
+        return {
+            "basic": partial(self._get_basic_info, address),
+            "security": partial(self._get_security_info, address),
+            "market": partial(self._get_market_info, address),
+        }
+
+    def _apply(self, analysis: TokenAnalysis, section: str, result: dict):
+        """섹션 결과 반영 (GoPlus 홀더 수는 basic보다 먼저 와도 유지)"""
+        if section == "basic":
+            # 먼저 도착한 GoPlus 홀더 수는 유지
+            basic = TokenBasicInfo(**result)
+            basic.holder_count = basic.holder_count or analysis.basic.holder_count
+            analysis.basic = basic
+        elif section == "security":
+            analysis.security = TokenSecurityInfo(**result)
+            if result.get("holder_count"):
+                analysis.basic.holder_count = result["holder_count"]
+        elif section == "market":
+            analysis.market = TokenMarketInfo(**result)
+
     async def _get_basic_info(self, address: str) -> Optional[dict]:
         """솔라나 RPC로 기본 정보 조회"""
         try:
-            pubkey = Pubkey.from_string(address)
+            Pubkey.from_string(address)  # 주소 형식 검증
 
-            # 토큰 공급량 조회
-            supply_response = await self.client.get_token_supply(pubkey)
+            # 토큰 공급량 조회 (동시 분석의 RPC 호출과 배치로 묶임)
+            result = await get_rpc_batcher(self.config.rpc_url).call("getTokenSupply", [address])
 
-            if supply_response.value:
-                supply_data = supply_response.value
-                decimals = supply_data.decimals
-                total_supply = float(supply_data.ui_amount or 0)
+            if result and result.get("value"):
+                supply_data = result["value"]
+                decimals = supply_data["decimals"]
+                total_supply = float(supply_data.get("uiAmountString") or 0)
 
                 # 큰 숫자 포맷팅
                 if total_supply >= 1_000_000_000_000:
@@ -169,6 +171,5 @@ class SolanaAnalyzer(BaseAnalyzer):
 
     async def close(self):
         """리소스 정리"""
-        await self.client.close()
         await self.dexscreener.close()
         await self.goplus.close()
@@ -0,0 +1,128 @@
+"""추측 분석 - 체인 선택 키보드를 보여주는 동안 후보 체인을 미리 분석
+
+키보드를 보낸 뒤 사용자가 체인을 고를 때까지 몇 초가 비는데, 그동안 상위 후보 체인의
+분석을 백그라운드로 시작해 두고 결과를 (체인, 주소) 단위로 잠시 캐시한다.
+사용자가 체인을 고르면 진행 중/완료된 결과를 그대로 쓰고 나머지 체인의 추측은 취소한다.
+
+실제 요청을 밀어내지 않도록 동시에 진행하는 추측 분석 수는 전체 예산으로 제한한다
+(예산이 차 있으면 새 추측을 시작하지 않음).
+"""
+import asyncio
+import structlog
+from typing import Optional
+from cachetools import TTLCache
+
+from analyzers.registry import AnalyzerRegistry
+from config import settings
+from models.token import TokenAnalysis
+
+logger = structlog.get_logger()
+
+
+class SpeculativeAnalysis:
+    """(체인, 주소) 추측 분석 태스크 + 단기 결과 캐시
+
+    봇 이벤트 루프에서만 사용한다.
+    """
+
+    _tasks: dict[tuple[str, str], asyncio.Task] = {}
+    _results: Optional[TTLCache] = None
+    stats = {"started": 0, "skipped_budget": 0, "hits": 0, "joined": 0, "cancelled": 0}
+
+    @classmethod
+    def _cache(cls) -> TTLCache:
+        if cls._results is None:
+            cls._results = TTLCache(maxsize=500, ttl=settings.analyze_speculative_ttl)
+        return cls._results
+
+    @staticmethod
+    def _key(chain: str, address: str) -> tuple[str, str]:
+        return chain, address.lower()
+
+    @classmethod
+    def start(cls, address: str, chain_ids: list[str]):
+        """후보 순서대로 상위 체인 추측 분석 시작 (예산 안에서)"""
+        if not settings.analyze_speculative:
+            return
+
+        for chain in chain_ids[:settings.analyze_speculative_chains]:
+            key = cls._key(chain, address)
+            if key in cls._tasks or key in cls._cache():
+                continue
+            if len(cls._tasks) >= settings.analyze_speculative_budget:
+                cls.stats["skipped_budget"] += 1
+                logger.debug("speculation_budget_full", chain=chain, address=address)
+                break
+
+            analyzer = AnalyzerRegistry.get(chain)
+            if analyzer is None:
+                continue
+
+            task = asyncio.create_task(analyzer.analyze(address))
+            cls._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: cls._on_done(key, t))
+            cls.stats["started"] += 1
+
+    @classmethod
+    def _on_done(cls, key: tuple[str, str], task: asyncio.Task):
+        """완료된 추측 결과를 캐시에 저장"""
+        if cls._tasks.get(key) is task:
+            del cls._tasks[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.debug("speculation_failed", chain=key[0], address=key[1], error=str(task.exception()))
+            return
+        cls._cache()[key] = task.result()
+
+    @classmethod
+    async def get(cls, chain: str, address: str) -> Optional[TokenAnalysis]:
+        """미리 분석된 결과 (진행 중이면 완료까지 대기, 없으면 None)"""
+        key = cls._key(chain, address)
+        result = cls._cache().pop(key, None)
+        if result is not None:
+            cls.stats["hits"] += 1
+            return result
+
+        task = cls._tasks.get(key)
+        if task is None:
+            return None
+
+        cls.stats["joined"] += 1
+        try:
+            # 요청 핸들러가 취소돼도 추측 태스크는 계속 (다른 요청이 이어받을 수 있음)
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception:
+            # 추측이 실패하면 호출자가 직접 다시 분석
+            return None
+
+    @classmethod
+    def cancel(cls, address: str, keep: Optional[str] = None):
+        """주소의 추측 분석 취소 (keep 체인은 유지)"""
+        address = address.lower()
+        for (chain, addr), task in list(cls._tasks.items()):
+            if addr == address and chain != keep:
+                task.cancel()
+                cls.stats["cancelled"] += 1
+
+    @classmethod
+    async def close(cls):
+        """진행 중인 추측 분석 모두 취소"""
+        tasks = list(cls._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        cls._tasks.clear()
+        logger.info("speculation_closed", **cls.get_stats())
+        if cls._results is not None:
+            cls._results.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """추측 분석 통계"""
+        return {**cls.stats, "running": len(cls._tasks), "cached": len(cls._cache())}
@@ -16,6 +16,7 @@ from bot.handlers.wallet import (
     remove_wallet,
     toggle_incoming,
     set_filter,
+    set_digest,
 )
 from bot.handlers.analyzer import (
     handle_analyze_message,
@@ -34,6 +35,7 @@ def setup_handlers(app: Application):
     app.add_handler(CommandHandler("remove", remove_wallet))
     app.add_handler(CommandHandler("toggle", toggle_incoming))
     app.add_handler(CommandHandler("filter", set_filter))
+    app.add_handler(CommandHandler("digest", set_digest))
 
     # 콜백 쿼리 핸들러 (Contract Analysis - 체인 선택)
     app.add_handler(CallbackQueryHandler(handle_analyze_callback))
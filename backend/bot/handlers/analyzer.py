@@ -1,11 +1,15 @@
 """컨트랙트 분석 핸들러"""
+import asyncio
+from contextlib import aclosing, suppress
+from typing import Optional
 from loguru import logger
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
+from config import settings
 from config.chains import get_chain_configs, EVM_CHAINS
-from analyzers.evm_analyzer import EVMAnalyzer
-from analyzers.solana_analyzer import SolanaAnalyzer
+from analyzers.registry import AnalyzerRegistry
+from analyzers.speculative import SpeculativeAnalysis
 from utils.validators import extract_address
 from utils.formatters import format_analysis_result, format_loading_message
 
@@ -34,22 +38,61 @@ async def handle_analyze_message(update: Update, context: ContextTypes.DEFAULT_T
         await analyze_solana(update, context, address)
 
     elif addr_type == "evm":
-        # EVM은 체인 선택 필요
-        await show_chain_selection(update, context, address)
+        if settings.analyze_chain_probe:
+            # 컨트랙트가 있는 체인을 먼저 찾음
+            await probe_chains(update, context, address)
+        else:
+            # EVM은 체인 선택 필요
+            await show_chain_selection(update, context, address)
 
     return True  # 처리됨 표시
 
 
-async def show_chain_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, address: str):
+async def probe_chains(update: Update, context: ContextTypes.DEFAULT_TYPE, address: str):
     """
-    EVM 체인 선택 키보드 표시
+    모든 EVM 체인에 컨트랙트 존재 여부를 동시에 조회
+    한 체인에만 있으면 바로 분석, 아니면 있는(또는 확인 못 한) 체인만 선택지로 표시
+    """
+    short_addr = f"{address[:6]}...{address[-4:]}"
+    status_message = await update.message.reply_text(
+        f"Address: <code>{short_addr}</code>\n\nLooking up chains...",
+        parse_mode="HTML"
+    )
+
+    found, failed = await AnalyzerRegistry.probe_evm(address, settings.analyze_probe_timeout)
+
+    if len(found) == 1 and not failed:
+        await run_evm_analysis(status_message.edit_text, update.effective_user.id, found[0], address)
+        return
+
+    if not found and not failed:
+        await status_message.edit_text(
+            f"Address: <code>{short_addr}</code>\n\n"
+            "No contract found at this address on the supported EVM chains.",
+            parse_mode="HTML"
+        )
+        return
+
+    await show_chain_selection(update, context, address, chain_ids=found + failed, message=status_message)
+
+
+async def show_chain_selection(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    address: str,
+    chain_ids: list[str] = EVM_CHAINS,
+    message=None
+):
+    """
+    EVM 체인 선택 키보드 표시 (message가 있으면 그 메시지를 수정)
+    키보드를 보낸 뒤 chain_ids 앞쪽 후보 체인을 미리 분석해 둔다
     """
     chains = get_chain_configs()
 
     keyboard = []
     row = []
 
-    for i, chain_id in enumerate(EVM_CHAINS):
+    for chain_id in [c for c in EVM_CHAINS if c in chain_ids]:
         chain = chains[chain_id]
         callback_data = f"analyze:{chain_id}:{address}"
 
@@ -65,12 +108,15 @@ async def show_chain_selection(update: Update, context: ContextTypes.DEFAULT_TYP
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     short_addr = f"{address[:6]}...{address[-4:]}"
-    await update.message.reply_text(
+    send = message.edit_text if message is not None else update.message.reply_text
+    await send(
         f"Address: <code>{short_addr}</code>\n\nSelect the chain to analyze:",
         reply_markup=reply_markup,
         parse_mode="HTML"
     )
 
+    SpeculativeAnalysis.start(address, chain_ids)
+
 
 async def handle_analyze_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -93,31 +139,43 @@ async def handle_analyze_callback(update: Update, context: ContextTypes.DEFAULT_
 
 async def analyze_evm(query, context: ContextTypes.DEFAULT_TYPE, chain: str, address: str):
     """
-    EVM 토큰 분석 실행
+    EVM 토큰 분석 실행 (체인 선택 콜백)
     """
-    user = query.from_user
-    logger.info(f"EVM analysis requested by {user.id}: {chain} / {address[:10]}...")
+    # 고르지 않은 체인의 추측 분석은 중단
+    SpeculativeAnalysis.cancel(address, keep=chain)
+    await run_evm_analysis(query.edit_message_text, query.from_user.id, chain, address)
+
+
+async def run_evm_analysis(edit_text, user_id: int, chain: str, address: str):
+    """
+    EVM 토큰 분석 후 결과로 메시지 수정
+
+    Args:
+        edit_text: 상태 메시지 수정 함수 (CallbackQuery.edit_message_text / Message.edit_text)
+    """
+    logger.info(f"EVM analysis requested by {user_id}: {chain} / {address[:10]}...")
 
     chains = get_chain_configs()
     config = chains.get(chain)
+    analyzer = AnalyzerRegistry.get(chain)
 
-    if not config:
-        await query.edit_message_text("Invalid chain selected.")
+    if not config or analyzer is None:
+        await edit_text("Invalid chain selected.")
         return
 
     # 로딩 메시지
     loading_msg = format_loading_message(config.name, address)
-    await query.edit_message_text(loading_msg, parse_mode="HTML")
-
-    # 분석 실행
-    analyzer = EVMAnalyzer(chain, config)
+    await edit_text(loading_msg, parse_mode="HTML")
 
+    # 분석 실행 (미리 분석한 결과가 있으면 사용, 없으면 체인별 분석기 재사용)
     try:
-        result = await analyzer.analyze(address)
+        result = await SpeculativeAnalysis.get(chain, address)
+        if result is None:
+            result = await analyze_progressively(edit_text, analyzer, address)
 
         # 결과 포맷팅 및 전송
         message = format_analysis_result(result)
-        await query.edit_message_text(
+        await edit_text(
             message,
             parse_mode="HTML",
             disable_web_page_preview=True
@@ -131,13 +189,10 @@ async def analyze_evm(query, context: ContextTypes.DEFAULT_TYPE, chain: str, add
     except Exception as e:
         logger.error(f"EVM analysis failed: {chain}/{address[:10]}... error={e}")
 
-        await query.edit_message_text(
+        await edit_text(
             f"Analysis failed: {str(e)[:100]}\n\nPlease try again later."
         )
 
-    finally:
-        await analyzer.close()
-
 
 async def analyze_solana(update: Update, context: ContextTypes.DEFAULT_TYPE, address: str):
     """
@@ -146,18 +201,15 @@ async def analyze_solana(update: Update, context: ContextTypes.DEFAULT_TYPE, add
     user = update.effective_user
     logger.info(f"Solana analysis requested by {user.id}: {address[:10]}...")
 
-    chains = get_chain_configs()
-    config = chains.get("solana")
+    analyzer = AnalyzerRegistry.get("solana")
 
     # 로딩 메시지
     loading_msg = format_loading_message("Solana", address)
     status_message = await update.message.reply_text(loading_msg, parse_mode="HTML")
 
-    # 분석 실행
-    analyzer = SolanaAnalyzer(config)
-
+    # 분석 실행 (체인별 분석기 재사용)
     try:
-        result = await analyzer.analyze(address)
+        result = await analyze_progressively(status_message.edit_text, analyzer, address)
 
         # DEXScreener에서 이름/심볼 업데이트
         if hasattr(result.market, '_name') and result.market._name:
@@ -185,5 +237,58 @@ async def analyze_solana(update: Update, context: ContextTypes.DEFAULT_TYPE, add
             f"Analysis failed: {str(e)[:100]}\n\nPlease try again later."
         )
 
+
+async def analyze_progressively(edit_text, analyzer, address: str):
+    """
+    섹션이 끝날 때마다 중간 결과로 상태 메시지 수정 후 최종 결과 반환
+    (최종 결과 메시지는 호출자가 보냄)
+
+    텔레그램 메시지 수정 제한에 맞춰 수정 간격은 analyze_edit_interval 이상으로 두고,
+    그 사이에 끝난 섹션은 간격이 지난 뒤 한 번의 수정에 모아 반영한다.
+    """
+    if not settings.analyze_progressive:
+        return await analyzer.analyze(address)
+
+    loop = asyncio.get_running_loop()
+    last_edit = None
+    latest = None  # 아직 반영하지 않은 (분석 결과, 남은 섹션)
+    editor: Optional[asyncio.Task] = None
+
+    async def edit_pending():
+        """간격을 지키며 최신 중간 결과로 수정 (기다리는 동안 온 결과는 합쳐짐)"""
+        nonlocal last_edit, latest
+        while latest is not None:
+            if last_edit is not None:
+                await asyncio.sleep(max(0.0, settings.analyze_edit_interval - (loop.time() - last_edit)))
+            analysis, pending = latest
+            latest = None
+            try:
+                await edit_text(
+                    format_analysis_result(analysis, pending=pending),
+                    parse_mode="HTML",
+                    disable_web_page_preview=True
+                )
+            except Exception as e:
+                # 중간 결과 수정 실패는 무시 (최종 결과는 호출자가 다시 보냄)
+                logger.debug(f"Progressive edit skipped: {e}")
+            last_edit = loop.time()
+
+    try:
+        async with aclosing(analyzer.analyze_iter(address)) as updates:
+            async for analysis, pending in updates:
+                if not pending:
+                    break
+                latest = (analysis, pending)
+                if editor is None or editor.done():
+                    editor = asyncio.create_task(edit_pending())
     finally:
-        await analyzer.close()
+        # 최종 결과가 나오면 예약된 중간 수정은 버림
+        if editor is not None and not editor.done():
+            editor.cancel()
+            with suppress(asyncio.CancelledError):
+                await editor
+
+    # 최종 수정도 간격 유지
+    if last_edit is not None:
+        await asyncio.sleep(max(0.0, settings.analyze_edit_interval - (loop.time() - last_edit)))
+    return analysis
@@ -8,7 +8,7 @@ from telegram.ext import (
 from loguru import logger
 
 from db.crud import WalletCRUD
-from config.base import SUPPORTED_CHAINS
+from config.base import settings, SUPPORTED_CHAINS
 from services.moralis_api import MoralisAPI
 from services.helius_api import HeliusAPI
 from utils.validators import validate_address
@@ -27,6 +27,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 /remove &lt;라벨&gt; - 지갑 삭제
 /toggle &lt;라벨&gt; - incoming 알림 on/off
 /filter &lt;라벨&gt; &lt;금액&gt; - 최소 금액 필터 ($)
+/digest &lt;라벨&gt; &lt;on|off|auto&gt; - 요약 알림 모드
 /chains - 지원 체인 목록
 
 <b>컨트랙트 분석:</b>
@@ -157,13 +158,14 @@ async def list_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
         chain_name = SUPPORTED_CHAINS.get(w["chain"], {}).get("name", w["chain"])
         incoming = "ON" if w["incoming_enabled"] else "OFF"
         min_amt = f"${w['min_amount_usd']:.0f}" if w["min_amount_usd"] > 0 else "-"
+        digest = (w.get("digest_mode") or "auto").upper()
         stream_status = "OK" if w.get("stream_id") else "NO STREAM"
 
         text += (
             f"<b>{w['label']}</b>\n"
             f"  체인: {chain_name}\n"
             f"  주소: <code>{w['address'][:10]}...{w['address'][-6:]}</code>\n"
-            f"  Incoming: {incoming} | 최소금액: {min_amt}\n"
+            f"  Incoming: {incoming} | 최소금액: {min_amt} | 요약: {digest}\n"
             f"  상태: {stream_status}\n\n"
         )
 
@@ -258,6 +260,41 @@ async def set_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"'{label}' 지갑을 찾을 수 없습니다.")
 
 
+DIGEST_MODES = {
+    "on": "항상 요약",
+    "off": "개별 알림",
+    "auto": "빈도가 높을 때 자동 요약",
+}
+
+
+async def set_digest(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """요약 알림 모드 설정"""
+    user_id = update.effective_user.id
+    args = context.args
+
+    if len(args) < 2 or args[1].lower() not in DIGEST_MODES:
+        await update.message.reply_text(
+            "사용법: <code>/digest &lt;라벨&gt; &lt;on|off|auto&gt;</code>\n"
+            f"on: 알림을 {settings.digest_window:.0f}초마다 요약해서 전송\n"
+            "off: 항상 개별 알림\n"
+            f"auto: 분당 {settings.digest_auto_threshold}건 이상이면 자동 요약 (기본값)",
+            parse_mode="HTML",
+        )
+        return
+
+    label = args[0]
+    mode = args[1].lower()
+
+    if await WalletCRUD.set_digest_mode(user_id, label, mode):
+        await update.message.reply_text(
+            f"'{label}' 요약 알림: <b>{mode.upper()}</b> ({DIGEST_MODES[mode]})",
+            parse_mode="HTML",
+        )
+        logger.info(f"User {user_id} set digest mode for {label}: {mode}")
+    else:
+        await update.message.reply_text(f"'{label}' 지갑을 찾을 수 없습니다.")
+
+
 def setup_handlers(app: Application):
     """핸들러 등록"""
     app.add_handler(CommandHandler("start", start))
@@ -268,5 +305,6 @@ def setup_handlers(app: Application):
     app.add_handler(CommandHandler("remove", remove_wallet))
     app.add_handler(CommandHandler("toggle", toggle_incoming))
     app.add_handler(CommandHandler("filter", set_filter))
+    app.add_handler(CommandHandler("digest", set_digest))
 
     logger.info("Telegram handlers registered")
@@ -0,0 +1,71 @@
+"""텔레그램 업데이트 동시 처리 - 전체 동시성 제한 + 사용자별 순서 보장
+
+기본 Application은 업데이트를 하나씩 처리하므로 30초 넘게 걸리는 분석 1건이
+다른 모든 사용자의 /add, /list, 분석을 막는다. 이 프로세서는 업데이트를 동시에
+처리하되, 같은 사용자의 업데이트는 도착 순서대로 하나씩 처리한다.
+
+PTB의 BaseUpdateProcessor는 전체 세마포어를 잡은 채 do_process_update를 호출하므로,
+사용자 락을 기다리는 업데이트가 전체 슬롯을 차지하지 않도록 기본 세마포어는
+사실상 무제한으로 두고 사용자 락 -> 전체 세마포어 순으로 직접 잡는다.
+"""
+import asyncio
+from typing import Any, Awaitable, Optional
+from loguru import logger
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# PTB 기본 세마포어 크기 (실제 제한은 아래 _slots)
+_UNBOUNDED = 1_000_000
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """전체 max_concurrent개까지 동시 처리, 사용자별로는 순차 처리"""
+
+    def __init__(self, max_concurrent: int):
+        super().__init__(max_concurrent_updates=_UNBOUNDED)
+        self.max_concurrent = max(1, max_concurrent)
+        self._slots = asyncio.BoundedSemaphore(self.max_concurrent)
+        # 사용자 ID -> (락, 대기+처리 중인 업데이트 수)
+        self._users: dict[int, list] = {}
+
+    @staticmethod
+    def _user_key(update: object) -> Optional[int]:
+        """순서를 보장할 키 (사용자, 없으면 채팅)"""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """사용자 락 -> 전체 슬롯 순으로 잡고 처리"""
+        key = self._user_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+
+        # 업데이트 태스크는 도착 순서대로 여기까지 오고, asyncio.Lock은 FIFO라 순서가 유지된다
+        entry = self._users.get(key)
+        if entry is None:
+            entry = self._users[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                async with self._slots:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._users.pop(key, None)
+
+    async def initialize(self) -> None:
+        logger.info(f"Bot update processor: up to {self.max_concurrent} concurrent updates")
+
+    async def shutdown(self) -> None:
+        if self._users:
+            logger.debug(f"Bot update processor shut down with {len(self._users)} busy users")
+        self._users.clear()
@@ -1,5 +1,7 @@
 """Config 모듈"""
-from config.base import settings, Settings, SUPPORTED_CHAINS, DEX_CONTRACTS
+from config.base import (
+    settings, Settings, SUPPORTED_CHAINS, DEX_CONTRACTS, STABLECOINS, WRAPPED_NATIVE,
+)
 from config.chains import get_chain_configs, ChainConfig, EVM_CHAINS, ALL_CHAINS
 
 __all__ = [
@@ -7,6 +9,8 @@ __all__ = [
     "Settings",
     "SUPPORTED_CHAINS",
     "DEX_CONTRACTS",
+    "STABLECOINS",
+    "WRAPPED_NATIVE",
     "get_chain_configs",
     "ChainConfig",
     "EVM_CHAINS",
@@ -10,6 +10,7 @@ class Settings(BaseSettings):
 
     # Telegram
     telegram_bot_token: str = ""
+    bot_concurrent_updates: int = 64  # 동시에 처리할 업데이트 수 (같은 사용자는 순차 처리)
 
     # Moralis (EVM)
     moralis_api_key: str = ""
@@ -21,6 +22,38 @@ class Settings(BaseSettings):
     # Webhook Server
     webhook_host: str = "0.0.0.0"
     webhook_port: int = 8000
+    # 인박스 처리 워커 수 (워커는 페이로드를 파이프라인 첫 단계 큐에 넣고 바로 다음 항목으로 넘어감,
+    # 처리 동시성은 단계별 워커 수로 정함)
+    webhook_workers: int = 4
+    webhook_inbox_retention_days: int = 3  # 처리 완료 항목 보관 기간
+
+    # Event Pipeline (단계별 워커 수 / 단계 간 큐 크기)
+    pipeline_queue_size: int = 500
+    pipeline_decode_workers: int = 2
+    pipeline_match_workers: int = 4
+    pipeline_enrich_workers: int = 8
+    pipeline_render_workers: int = 2
+    pipeline_deliver_workers: int = 16
+
+    # Telegram Delivery (텔레그램 제한: 전체 약 30건/초, 채팅당 약 1건/초)
+    telegram_global_rate: float = 30.0
+    telegram_chat_rate: float = 1.0
+    telegram_max_pending: int = 5000  # 전송 대기 메시지 상한
+    telegram_send_attempts: int = 5  # 네트워크 오류 재시도 횟수
+
+    # 같은 (사용자, 트랜잭션) 알림을 모아 한 메시지로 보내는 대기 시간 (초, 0이면 끔)
+    notification_coalesce_window: float = 1.5
+
+    # 요약 알림 (지갑별 /digest 설정, auto면 최근 1분 알림 수가 임계값 이상일 때 자동)
+    digest_window: float = 60.0  # 요약 주기 (초)
+    digest_max_events: int = 50  # 이만큼 모이면 주기 전에 전송
+    digest_auto_threshold: int = 20  # 분당 알림 수 (0이면 auto 끔)
+
+    # Notification Outbox (전송 실패 시 백오프 재시도, 초과하면 dead-letter)
+    outbox_max_attempts: int = 5
+    outbox_retry_base_delay: float = 30.0  # 초 (시도마다 2배)
+    outbox_sweep_interval: float = 5.0  # 재전송 대상 확인 주기 (초)
+    outbox_retention_days: int = 3  # 전송 완료 항목 보관 기간 (이 기간 동안 중복 방지)
 
     # Dashboard
     dashboard_enabled: bool = False
@@ -29,6 +62,17 @@ class Settings(BaseSettings):
     # Database
     database_path: str = "./data/wallets.db"
 
+    # Notification
+    notification_show_usd: bool = True  # false면 금액 필터가 있을 때만 가격 조회
+
+    # Price Cache (초 단위)
+    price_soft_ttl: int = 300  # 지나면 캐시값을 바로 쓰고 백그라운드 갱신
+    price_hard_ttl: int = 1800  # 지나면 캐시에서 제거 (동기 조회)
+    price_refresh_interval: int = 60  # 백그라운드 가격 갱신 주기
+    price_refresh_top_tokens: int = 50  # 주기 갱신 대상 인기 토큰 수
+    price_hedge_delay: float = 0.8  # 소스 응답이 이보다 늦으면 다음 소스 동시 요청
+    price_resolve_timeout: float = 3.0  # 토큰 가격 조회 전체 제한 시간
+
     # Logging
     log_level: str = "INFO"
 
@@ -38,6 +82,29 @@ class Settings(BaseSettings):
     arb_rpc_url: str = "https://arb1.arbitrum.io/rpc"
     base_rpc_url: str = "https://mainnet.base.org"
     solana_rpc_url: str = "https://api.mainnet-beta.solana.com"
+    # 웹훅 전용 체인 (토큰 메타데이터 조회용)
+    polygon_rpc_url: str = "https://polygon-rpc.com"
+    op_rpc_url: str = "https://mainnet.optimism.io"
+    avax_rpc_url: str = "https://api.avax.network/ext/bc/C/rpc"
+    # 컨트랙트 분석 체인 자동 탐지 (모든 EVM 체인에 eth_getCode 동시 조회)
+    analyze_chain_probe: bool = True  # false면 항상 체인 선택 키보드
+    analyze_probe_timeout: float = 3.0  # 체인별 조회 제한 시간 (초)
+    # 분석 결과를 섹션이 끝날 때마다 메시지에 반영 (수정 간격은 텔레그램 제한 고려)
+    analyze_progressive: bool = True
+    analyze_edit_interval: float = 1.0  # 초
+    # 분석 섹션 캐시 (사용자 간 공유, 초 단위 TTL)
+    analysis_cache_enabled: bool = True
+    analysis_cache_static_ttl: int = 86400  # 검증된 컨트랙트 (사실상 불변)
+    analysis_cache_security_ttl: int = 3600  # 기본 정보(총 공급량 포함) / GoPlus 보안 정보 / 미검증 컨트랙트
+    analysis_cache_market_ttl: int = 30  # DEXScreener 시장 정보
+    # 체인 선택 키보드를 보여주는 동안 후보 체인 미리 분석
+    analyze_speculative: bool = True
+    analyze_speculative_chains: int = 2  # 키보드 1개당 미리 분석할 후보 체인 수
+    analyze_speculative_budget: int = 8  # 동시에 진행하는 추측 분석 최대 수 (전체)
+    analyze_speculative_ttl: int = 60  # 미리 분석한 결과 보관 시간 (초)
+    # JSON-RPC 배칭 (이 시간 동안 같은 엔드포인트로 나온 호출을 배치 요청 1회로)
+    rpc_batch_window_ms: float = 5.0
+    rpc_batch_max_size: int = 50  # 배치 1회 최대 호출 수
 
     # Explorer API Keys (Contract Analysis)
     etherscan_api_key: str = ""
@@ -123,3 +190,59 @@ DEX_CONTRACTS = {
         "raydium": "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8",
     },
 }
+
+# 가격 기준 토큰 (네트워크 조회 없이 USD 가치 계산용)
+# 스테이블코인은 $1, 래핑 네이티브 토큰은 네이티브 토큰 가격으로 계산
+STABLECOINS = {
+    "eth": {
+        "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48": "USDC",
+        "0xdac17f958d2ee523a2206206994597c13d831ec7": "USDT",
+        "0x6b175474e89094c44da98b954eedeac495271d0f": "DAI",
+    },
+    "bsc": {
+        "0x55d398326f99059ff775485246999027b3197955": "USDT",
+        "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d": "USDC",
+        "0xe9e7cea3dedca5984780bafc599bd69add087d56": "BUSD",
+    },
+    "polygon": {
+        "0x3c499c542cef5e3811e1192ce70d8cc03d5c3359": "USDC",
+        "0x2791bca1f2de4661ed88a30c99a7a9449aa84174": "USDC.e",
+        "0xc2132d05d31c914a87c6611c10748aeb04b58e8f": "USDT",
+        "0x8f3cf7ad23cd3cadbd9735aff958023239c6a063": "DAI",
+    },
+    "arb": {
+        "0xaf88d065e77c8cc2239327c5edb3a432268e5831": "USDC",
+        "0xff970a61a04b1ca14834a43f5de4533ebddb5cc8": "USDC.e",
+        "0xfd086bc7cd5c481dcc9c85ebe478a1c0b69fcbb9": "USDT",
+        "0xda10009cbd5d07dd0cecc66161fc93d7c9000da1": "DAI",
+    },
+    "base": {
+        "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913": "USDC",
+        "0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca": "USDbC",
+        "0x50c5725949a6f0c72e6c4a641f24049a917db0cb": "DAI",
+    },
+    "op": {
+        "0x0b2c639c533813f4aa9d7837caf62653d097ff85": "USDC",
+        "0x94b008aa00579c1307b0ef2c499ad98a8ce58e58": "USDT",
+        "0xda10009cbd5d07dd0cecc66161fc93d7c9000da1": "DAI",
+    },
+    "avax": {
+        "0xb97ef9ef8734c71904d8002f8b6bc66dd9c48a6e": "USDC",
+        "0x9702230a8ea53601f5cd2dc00fdbc13d4df4a8c7": "USDT",
+    },
+    "sol": {
+        "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": "USDC",
+        "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY2tbVYC6ZRXTgKo": "USDT",
+    },
+}
+
+WRAPPED_NATIVE = {
+    "eth": "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",  # WETH
+    "bsc": "0xbb4cdb9cbd36b01bd1cbaebf2de08d9173bc095c",  # WBNB
+    "polygon": "0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270",  # WMATIC
+    "arb": "0x82af49447d8a07e3bd95bd0d56f35241523fbab1",  # WETH
+    "base": "0x4200000000000000000000000000000000000006",  # WETH
+    "op": "0x4200000000000000000000000000000000000006",  # WETH
+    "avax": "0xb31f66aa3c1e785363f0875a1b74e27b85fd66c7",  # WAVAX
+    "sol": "So11111111111111111111111111111111111111112",  # WSOL
+}
@@ -16,6 +16,7 @@ class ChainConfig:
     dexscreener_id: str
     symbol: str
     is_evm: bool = True
+    chain_code: str = ""  # 웹훅/지갑 추적용 체인 코드 (SUPPORTED_CHAINS 키)
 
 
 @lru_cache()
@@ -32,7 +33,8 @@ def get_chain_configs() -> dict[str, ChainConfig]:
             explorer_api="https://api.etherscan.io/api",
             explorer_api_key=settings.etherscan_api_key,
             dexscreener_id="ethereum",
-            symbol="ETH"
+            symbol="ETH",
+            chain_code="eth"
         ),
         "bsc": ChainConfig(
             name="BNB Chain",
@@ -42,7 +44,8 @@ def get_chain_configs() -> dict[str, ChainConfig]:
             explorer_api="https://api.bscscan.com/api",
             explorer_api_key=settings.bscscan_api_key,
             dexscreener_id="bsc",
-            symbol="BNB"
+            symbol="BNB",
+            chain_code="bsc"
         ),
         "arbitrum": ChainConfig(
             name="Arbitrum",
@@ -52,7 +55,8 @@ def get_chain_configs() -> dict[str, ChainConfig]:
             explorer_api="https://api.arbiscan.io/api",
             explorer_api_key=settings.arbiscan_api_key,
             dexscreener_id="arbitrum",
-            symbol="ETH"
+            symbol="ETH",
+            chain_code="arb"
         ),
         "base": ChainConfig(
             name="Base",
@@ -62,7 +66,8 @@ def get_chain_configs() -> dict[str, ChainConfig]:
             explorer_api="https://api.basescan.org/api",
             explorer_api_key=settings.basescan_api_key,
             dexscreener_id="base",
-            symbol="ETH"
+            symbol="ETH",
+            chain_code="base"
         ),
         "solana": ChainConfig(
             name="Solana",
@@ -73,7 +78,8 @@ def get_chain_configs() -> dict[str, ChainConfig]:
             explorer_api_key="",
             dexscreener_id="solana",
             symbol="SOL",
-            is_evm=False
+            is_evm=False,
+            chain_code="sol"
         )
     }
 
@@ -1,5 +1,6 @@
 """Database module"""
 from .models import init_db, get_db
-from .crud import WalletCRUD
+from .crud import WalletCRUD, InboxCRUD, OutboxCRUD, TokenMetadataCRUD
+from .wallet_index import WalletIndex, WatchEntry
 
-__all__ = ["init_db", "get_db", "WalletCRUD"]
+__all__ = ["init_db", "get_db", "WalletCRUD", "InboxCRUD", "OutboxCRUD", "TokenMetadataCRUD", "WalletIndex", "WatchEntry"]
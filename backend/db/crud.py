@@ -1,7 +1,10 @@
 """CRUD 함수"""
+import json
 from typing import Optional
+import aiosqlite
 from loguru import logger
 from .models import get_db
+from .wallet_index import WalletIndex, WatchEntry
 
 
 class WalletCRUD:
@@ -36,6 +39,11 @@ class WalletCRUD:
             )
 
             await db.commit()
+
+            WalletIndex.add(
+                address,
+                WatchEntry(wallet_id=wallet_id, user_id=user_id, label=label, chain=chain.lower()),
+            )
             logger.info(f"Wallet added: {label} ({chain}:{address[:10]}...)")
             return wallet_id
         except Exception as e:
@@ -48,7 +56,7 @@ class WalletCRUD:
         db = await get_db()
         cursor = await db.execute(
             """
-            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd
+            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd, ws.digest_mode
             FROM wallets w
             LEFT JOIN wallet_settings ws ON w.id = ws.wallet_id
             WHERE w.user_id = ?
@@ -65,7 +73,7 @@ class WalletCRUD:
         db = await get_db()
         cursor = await db.execute(
             """
-            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd
+            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd, ws.digest_mode
             FROM wallets w
             LEFT JOIN wallet_settings ws ON w.id = ws.wallet_id
             WHERE w.user_id = ? AND w.label = ?
@@ -81,7 +89,7 @@ class WalletCRUD:
         db = await get_db()
         cursor = await db.execute(
             """
-            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd
+            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd, ws.digest_mode
             FROM wallets w
             LEFT JOIN wallet_settings ws ON w.id = ws.wallet_id
             WHERE LOWER(w.address) = LOWER(?)
@@ -97,7 +105,7 @@ class WalletCRUD:
         db = await get_db()
         cursor = await db.execute(
             """
-            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd
+            SELECT w.*, ws.incoming_enabled, ws.min_amount_usd, ws.digest_mode
             FROM wallets w
             LEFT JOIN wallet_settings ws ON w.id = ws.wallet_id
             WHERE w.user_id = ? AND LOWER(w.address) = LOWER(?)
@@ -111,15 +119,21 @@ class WalletCRUD:
     async def remove_wallet(user_id: int, label: str) -> bool:
         """지갑 삭제"""
         db = await get_db()
+
+        wallet = await WalletCRUD.get_wallet_by_label(user_id, label)
+        if not wallet:
+            return False
+
         cursor = await db.execute(
             """
-            DELETE FROM wallets WHERE user_id = ? AND label = ?
+            DELETE FROM wallets WHERE id = ?
             """,
-            (user_id, label),
+            (wallet["id"],),
         )
         await db.commit()
         deleted = cursor.rowcount > 0
         if deleted:
+            WalletIndex.remove(wallet["address"], wallet["id"])
             logger.info(f"Wallet removed: {label}")
         return deleted
 
@@ -156,6 +170,8 @@ class WalletCRUD:
             (int(new_state), wallet["id"]),
         )
         await db.commit()
+
+        WalletIndex.update(wallet["address"], wallet["id"], incoming_enabled=new_state)
         logger.info(f"Incoming toggled for {label}: {new_state}")
         return new_state
 
@@ -177,5 +193,472 @@ class WalletCRUD:
             (amount, wallet["id"]),
         )
         await db.commit()
+
+        WalletIndex.update(wallet["address"], wallet["id"], min_amount_usd=float(amount))
         logger.info(f"Min amount set for {label}: ${amount}")
         return True
+
+    @staticmethod
+    async def set_digest_mode(user_id: int, label: str, mode: str) -> bool:
+        """요약 알림 모드 설정 (on / off / auto)"""
+        db = await get_db()
+
+        wallet = await WalletCRUD.get_wallet_by_label(user_id, label)
+        if not wallet:
+            return False
+
+        await db.execute(
+            """
+            UPDATE wallet_settings
+            SET digest_mode = ?
+            WHERE wallet_id = ?
+            """,
+            (mode, wallet["id"]),
+        )
+        await db.commit()
+
+        WalletIndex.update(wallet["address"], wallet["id"], digest_mode=mode)
+        logger.info(f"Digest mode set for {label}: {mode}")
+        return True
+
+
+class InboxCRUD:
+    """웹훅 인박스 CRUD 함수"""
+
+    @staticmethod
+    async def add_entry(source: str, payload: str) -> int:
+        """웹훅 원본 저장 (커밋 후 반환)"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            INSERT INTO webhook_inbox (source, payload) VALUES (?, ?)
+            """,
+            (source, payload),
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+    @staticmethod
+    async def get_pending() -> list[dict]:
+        """미처리 항목 조회 (재시작시 재처리용)"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            SELECT id, source, payload, attempts
+            FROM webhook_inbox
+            WHERE status = 'pending'
+            ORDER BY id
+            """
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def mark_done(entry_id: int):
+        """처리 완료 표시"""
+        db = await get_db()
+        await db.execute(
+            """
+            UPDATE webhook_inbox
+            SET status = 'done', processed_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (entry_id,),
+        )
+        await db.commit()
+
+    @staticmethod
+    async def mark_failed(entry_id: int, error: str, give_up: bool):
+        """처리 실패 기록 (give_up이면 더 이상 재시도하지 않음)"""
+        db = await get_db()
+        await db.execute(
+            """
+            UPDATE webhook_inbox
+            SET attempts = attempts + 1,
+                last_error = ?,
+                status = ?,
+                processed_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE NULL END
+            WHERE id = ?
+            """,
+            (error[:500], "failed" if give_up else "pending", int(give_up), entry_id),
+        )
+        await db.commit()
+
+    @staticmethod
+    async def purge_processed(retention_days: int) -> int:
+        """보관 기간이 지난 처리 완료 항목 삭제"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            DELETE FROM webhook_inbox
+            WHERE status = 'done'
+              AND processed_at < datetime('now', ?)
+            """,
+            (f"-{retention_days} days",),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+    @staticmethod
+    async def count_pending() -> int:
+        """미처리 항목 수"""
+        db = await get_db()
+        cursor = await db.execute(
+            "SELECT COUNT(*) AS cnt FROM webhook_inbox WHERE status = 'pending'"
+        )
+        row = await cursor.fetchone()
+        return row["cnt"] if row else 0
+
+
+class LegConflictError(Exception):
+    """묶음 알림의 레그 일부가 이미 다른 알림으로 저장됨 (existing: 그 레그 목록)"""
+
+    def __init__(self, existing: list[tuple[str, str]]):
+        super().__init__(f"{len(existing)} legs already in the outbox")
+        self.existing = existing
+
+
+class OutboxCRUD:
+    """알림 아웃박스 CRUD 함수"""
+
+    @staticmethod
+    async def add_entries(
+        rows: list[tuple],
+        next_attempt_at: float
+    ) -> list[Optional[int] | Exception]:
+        """알림 여러 건 저장 (커밋 1회)
+
+        알림 1건이 여러 전송(레그)을 묶을 수 있으므로 중복 판정은 레그 단위로 한다.
+        레그 키 (user_id, tx_hash, direction, leg)를 notification_legs에 선점하고,
+        모든 레그가 이미 선점돼 있으면 중복이다. 재처리 때 묶음 구성이 달라져도
+        이미 저장한 레그만으로 된 알림은 다시 저장되지 않는다. 일부 레그만 선점돼 있으면
+        이미 보낸 전송이 다시 나가지 않도록 저장하지 않고 LegConflictError를 돌려준다
+        (호출자가 남은 레그만으로 다시 렌더링).
+
+        레그 선점과 항목 저장은 한 트랜잭션이다. 행마다 SAVEPOINT를 두어 실패한 행만
+        되돌리고 나머지 행은 함께 커밋하며, 커밋이 실패하면 전체를 롤백한다. 그래서 선점만
+        남아 재처리 때 중복으로 오인되는 일이 없다. 공유 연결에서 다른 커밋에 섞여
+        선점만 남은 경우(entry_id 없음)도 다시 선점할 수 있다.
+
+        Args:
+            rows: (user_id, tx_hash, legs, label, text) 목록, legs는 [(direction, leg), ...]
+            next_attempt_at: 재전송 대상이 되는 시각 (그 전에는 스위퍼가 건드리지 않음)
+
+        Returns:
+            행별 새 항목 ID (모든 레그가 이미 있으면 None = 중복, 실패한 행은 예외 객체)
+        """
+        db = await get_db()
+        if db.in_transaction:
+            # 다른 CRUD의 (실행 직후 커밋될) 변경을 먼저 확정해 롤백 범위에서 제외
+            await db.commit()
+        await db.execute("BEGIN")
+        try:
+            entry_ids = []
+            for row in rows:
+                await db.execute("SAVEPOINT outbox_row")
+                try:
+                    entry_ids.append(await OutboxCRUD._add_entry(db, *row, next_attempt_at))
+                except Exception as e:
+                    await db.execute("ROLLBACK TO outbox_row")
+                    entry_ids.append(e)
+                await db.execute("RELEASE outbox_row")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return entry_ids
+
+    @staticmethod
+    async def _add_entry(
+        db: aiosqlite.Connection,
+        user_id: int,
+        tx_hash: str,
+        legs: list[tuple[str, str]],
+        label: str,
+        text: str,
+        next_attempt_at: float
+    ) -> Optional[int]:
+        """알림 1건의 레그 선점 + 항목 저장 (커밋/롤백은 호출자)
+
+        Raises:
+            LegConflictError: 레그 일부만 새로 선점된 경우
+        """
+        legs = list(dict.fromkeys(legs))
+        claimed = []
+        for direction, leg in legs:
+            cursor = await db.execute(
+                """
+                INSERT INTO notification_legs (user_id, tx_hash, direction, leg)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, tx_hash, direction, leg)
+                DO UPDATE SET created_at = CURRENT_TIMESTAMP WHERE entry_id IS NULL
+                """,
+                (user_id, tx_hash, direction, leg),
+            )
+            if cursor.rowcount:
+                claimed.append((direction, leg))
+        if not claimed:
+            return None
+        if len(claimed) < len(legs):
+            raise LegConflictError([key for key in legs if key not in claimed])
+
+        # 항목 키는 새로 선점한 첫 레그 (레그 테이블 도입 전 항목과 겹치면 중복)
+        direction, leg = claimed[0]
+        cursor = await db.execute(
+            """
+            INSERT OR IGNORE INTO notification_outbox
+                (user_id, tx_hash, direction, leg, label, text, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, tx_hash, direction, leg, label, text, next_attempt_at),
+        )
+        entry_id = cursor.lastrowid if cursor.rowcount else None
+        if entry_id is not None:
+            await db.executemany(
+                """
+                UPDATE notification_legs SET entry_id = ?
+                WHERE user_id = ? AND tx_hash = ? AND direction = ? AND leg = ?
+                """,
+                [(entry_id, user_id, tx_hash, d, l) for d, l in claimed],
+            )
+        return entry_id
+
+    @staticmethod
+    async def get_due(now: float, limit: int = 200) -> list[dict]:
+        """전송 시각이 된 미전송 항목"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            SELECT id, user_id, label, text, attempts
+            FROM notification_outbox
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (now, limit),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def release_leases() -> int:
+        """이전 실행에서 전송을 시작했지만 결과가 없는 항목을 즉시 재전송 대상으로"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            UPDATE notification_outbox
+            SET next_attempt_at = 0
+            WHERE status = 'pending' AND attempts = 0
+            """
+        )
+        await db.commit()
+        return cursor.rowcount
+
+    @staticmethod
+    async def mark_sent(entry_id: int):
+        """전송 완료 표시"""
+        db = await get_db()
+        await db.execute(
+            """
+            UPDATE notification_outbox
+            SET status = 'sent', sent_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (entry_id,),
+        )
+        await db.commit()
+
+    @staticmethod
+    async def mark_failed(entry_id: int, error: str, next_attempt_at: float, give_up: bool):
+        """전송 실패 기록 (give_up이면 dead-letter)"""
+        db = await get_db()
+        await db.execute(
+            """
+            UPDATE notification_outbox
+            SET attempts = attempts + 1,
+                last_error = ?,
+                status = ?,
+                next_attempt_at = ?
+            WHERE id = ?
+            """,
+            (error[:500], "dead" if give_up else "pending", next_attempt_at, entry_id),
+        )
+        await db.commit()
+
+    @staticmethod
+    async def purge_sent(retention_days: int) -> int:
+        """보관 기간이 지난 전송 완료 항목 삭제 (이 기간 동안 중복 방지 유지)"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            DELETE FROM notification_outbox
+            WHERE status = 'sent'
+              AND sent_at < datetime('now', ?)
+            """,
+            (f"-{retention_days} days",),
+        )
+        # 항목이 지워진 레그 키도 같은 보관 기간이 지나면 삭제
+        await db.execute(
+            """
+            DELETE FROM notification_legs
+            WHERE created_at < datetime('now', ?)
+              AND (entry_id IS NULL OR entry_id NOT IN (SELECT id FROM notification_outbox))
+            """,
+            (f"-{retention_days} days",),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+    @staticmethod
+    async def count_by_status() -> dict[str, int]:
+        """상태별 항목 수"""
+        db = await get_db()
+        cursor = await db.execute(
+            "SELECT status, COUNT(*) AS cnt FROM notification_outbox GROUP BY status"
+        )
+        rows = await cursor.fetchall()
+        return {row["status"]: row["cnt"] for row in rows}
+
+
+class TokenMetadataCRUD:
+    """토큰 메타데이터 / 풀 토큰 / 불변 사실 CRUD 함수"""
+
+    @staticmethod
+    async def get_tokens(chain: str, addresses: list[str]) -> list[dict]:
+        """저장된 토큰 메타데이터 조회"""
+        if not addresses:
+            return []
+        db = await get_db()
+        placeholders = ",".join("?" * len(addresses))
+        cursor = await db.execute(
+            f"""
+            SELECT chain, address, symbol, name, decimals
+            FROM token_metadata
+            WHERE chain = ? AND address IN ({placeholders})
+            """,
+            (chain, *addresses),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def save_tokens(rows: list[dict]):
+        """토큰 메타데이터 저장 (chain, address, symbol, name, decimals)"""
+        if not rows:
+            return
+        db = await get_db()
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO token_metadata (chain, address, symbol, name, decimals)
+            VALUES (:chain, :address, :symbol, :name, :decimals)
+            """,
+            rows,
+        )
+        await db.commit()
+
+    @staticmethod
+    async def get_pools(chain: str, pools: list[str]) -> list[dict]:
+        """저장된 풀 토큰 조회"""
+        if not pools:
+            return []
+        db = await get_db()
+        placeholders = ",".join("?" * len(pools))
+        cursor = await db.execute(
+            f"""
+            SELECT pool, token0, token1
+            FROM pool_tokens
+            WHERE chain = ? AND pool IN ({placeholders})
+            """,
+            (chain, *pools),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def save_pools(chain: str, pools: dict[str, tuple[str, str]]):
+        """풀 토큰 저장 (풀 주소 -> (token0, token1))"""
+        if not pools:
+            return
+        db = await get_db()
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO pool_tokens (chain, pool, token0, token1)
+            VALUES (?, ?, ?, ?)
+            """,
+            [(chain, pool, token0, token1) for pool, (token0, token1) in pools.items()],
+        )
+        await db.commit()
+
+    @staticmethod
+    async def get_fact(chain: str, address: str, kind: str) -> Optional[dict]:
+        """저장된 불변 사실 조회"""
+        db = await get_db()
+        cursor = await db.execute(
+            "SELECT data FROM token_facts WHERE chain = ? AND address = ? AND kind = ?",
+            (chain, address, kind),
+        )
+        row = await cursor.fetchone()
+        return json.loads(row["data"]) if row else None
+
+    @staticmethod
+    async def save_fact(chain: str, address: str, kind: str, data: dict):
+        """불변 사실 저장 (JSON)"""
+        db = await get_db()
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO token_facts (chain, address, kind, data)
+            VALUES (?, ?, ?, ?)
+            """,
+            (chain, address, kind, json.dumps(data)),
+        )
+        await db.commit()
+
+
+class DigestCRUD:
+    """요약 버퍼 이벤트 CRUD 함수"""
+
+    @staticmethod
+    async def add_event(
+        wallet_id: int,
+        user_id: int,
+        label: str,
+        chain: str,
+        window_start: float,
+        event: dict
+    ) -> int:
+        """버퍼에 넣을 이벤트 저장 (커밋 후 반환)"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            INSERT INTO digest_events (wallet_id, user_id, label, chain, window_start, event)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (wallet_id, user_id, label, chain, window_start, json.dumps(event)),
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+    @staticmethod
+    async def seal_batch(batch_id: int, event_ids: list[int]):
+        """이벤트를 전송할 묶음으로 확정 (재시작 후에도 같은 묶음/같은 키로 재전송)"""
+        db = await get_db()
+        await db.executemany(
+            "UPDATE digest_events SET batch_id = ? WHERE id = ?",
+            [(batch_id, event_id) for event_id in event_ids],
+        )
+        await db.commit()
+
+    @staticmethod
+    async def delete_batch(batch_id: int):
+        """전송(아웃박스 저장)이 끝난 묶음 삭제"""
+        db = await get_db()
+        await db.execute("DELETE FROM digest_events WHERE batch_id = ?", (batch_id,))
+        await db.commit()
+
+    @staticmethod
+    async def get_events() -> list[dict]:
+        """남아 있는 이벤트 전체 (저장 순서)"""
+        db = await get_db()
+        cursor = await db.execute("SELECT * FROM digest_events ORDER BY id")
+        rows = await cursor.fetchall()
+        return [{**dict(row), "event": json.loads(row["event"])} for row in rows]
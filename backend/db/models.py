@@ -41,10 +41,14 @@ async def init_db():
             wallet_id INTEGER NOT NULL,
             incoming_enabled INTEGER DEFAULT 1,
             min_amount_usd REAL DEFAULT 0,
+            digest_mode TEXT DEFAULT 'auto',
             FOREIGN KEY (wallet_id) REFERENCES wallets(id) ON DELETE CASCADE
         )
     """)
 
+    # 기존 DB 마이그레이션 (이후 추가된 컬럼)
+    await _add_column_if_missing(db, "wallet_settings", "digest_mode", "TEXT DEFAULT 'auto'")
+
     # 인덱스 생성
     await db.execute("""
         CREATE INDEX IF NOT EXISTS idx_wallets_user_id ON wallets(user_id)
@@ -53,10 +57,124 @@ async def init_db():
         CREATE INDEX IF NOT EXISTS idx_wallets_address ON wallets(address)
     """)
 
+    # webhook_inbox 테이블: 수신한 웹훅 원본 (처리 전 영속화)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS webhook_inbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_at TIMESTAMP
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_webhook_inbox_status ON webhook_inbox(status)
+    """)
+
+    # notification_outbox 테이블: 렌더링된 알림 (전송 전 영속화, 중복 방지 키)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            tx_hash TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            leg TEXT NOT NULL DEFAULT '',
+            label TEXT,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at REAL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP,
+            UNIQUE(user_id, tx_hash, direction, leg)
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_outbox_status
+        ON notification_outbox(status, next_attempt_at)
+    """)
+
+    # notification_legs 테이블: 아웃박스 항목이 다룬 개별 전송 (레그 단위 중복 방지)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS notification_legs (
+            user_id INTEGER NOT NULL,
+            tx_hash TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            leg TEXT NOT NULL DEFAULT '',
+            entry_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, tx_hash, direction, leg)
+        )
+    """)
+
+    # digest_events 테이블: 요약 버퍼의 이벤트 (요약 전송 전 영속화, batch_id는 전송 중인 묶음)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS digest_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            wallet_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            chain TEXT NOT NULL,
+            window_start REAL NOT NULL,
+            event TEXT NOT NULL,
+            batch_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # token_metadata 테이블: 토큰 decimals/심볼 (불변 데이터, 체인 코드 + 주소)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS token_metadata (
+            chain TEXT NOT NULL,
+            address TEXT NOT NULL,
+            symbol TEXT,
+            name TEXT,
+            decimals INTEGER NOT NULL,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chain, address)
+        )
+    """)
+
+    # pool_tokens 테이블: DEX 풀의 token0/token1 (스왑 로그 디코딩용)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS pool_tokens (
+            chain TEXT NOT NULL,
+            pool TEXT NOT NULL,
+            token0 TEXT NOT NULL,
+            token1 TEXT NOT NULL,
+            PRIMARY KEY (chain, pool)
+        )
+    """)
+
+    # token_facts 테이블: 분석용 불변 사실 (검증된 컨트랙트 정보, 바이트코드 해시 등, JSON)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS token_facts (
+            chain TEXT NOT NULL,
+            address TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            data TEXT NOT NULL,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chain, address, kind)
+        )
+    """)
+
     await db.commit()
     logger.info("Database initialized successfully")
 
 
+async def _add_column_if_missing(db: aiosqlite.Connection, table: str, column: str, ddl: str):
+    """컬럼이 없으면 추가 (CREATE TABLE IF NOT EXISTS는 기존 테이블을 바꾸지 않음)"""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    columns = {row["name"] for row in await cursor.fetchall()}
+    if column not in columns:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+        logger.info(f"Migrated {table}: added column {column}")
+
+
 async def close_db():
     """DB 연결 종료"""
     global _db
@@ -0,0 +1,117 @@
+"""추적 주소 인메모리 인덱스
+
+웹훅 매칭 핫패스에서 DB 조회 없이 주소 -> 추적 지갑 목록을 O(1)로 찾기 위한 인덱스.
+시작 시 DB에서 전체를 읽고, 이후 WalletCRUD 변경 함수가 증분 갱신한다.
+
+봇(메인 루프)과 웹훅 서버(별도 스레드)가 함께 쓰므로 쓰기는 락 안에서
+새 튜플로 교체하고(copy-on-write), 읽기는 락 없이 dict 조회만 한다.
+"""
+import threading
+from dataclasses import dataclass, replace
+from loguru import logger
+
+from .models import get_db
+
+
+@dataclass(frozen=True)
+class WatchEntry:
+    """추적 지갑 1개 (알림 매칭에 필요한 필드만)"""
+    wallet_id: int
+    user_id: int
+    label: str
+    chain: str
+    incoming_enabled: bool = True
+    min_amount_usd: float = 0.0
+    digest_mode: str = "auto"  # "on" / "off" / "auto" (빈도가 높으면 자동 요약)
+
+
+class WalletIndex:
+    """주소(lowercase) -> WatchEntry 튜플"""
+
+    _by_address: dict[str, tuple[WatchEntry, ...]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    async def load(cls):
+        """DB에서 전체 인덱스 로드"""
+        db = await get_db()
+        cursor = await db.execute(
+            """
+            SELECT w.id, w.user_id, w.chain, w.address, w.label,
+                   ws.incoming_enabled, ws.min_amount_usd, ws.digest_mode
+            FROM wallets w
+            LEFT JOIN wallet_settings ws ON w.id = ws.wallet_id
+            """
+        )
+        rows = await cursor.fetchall()
+
+        index: dict[str, tuple[WatchEntry, ...]] = {}
+        for row in rows:
+            # 설정 행이 없으면 기본값 (incoming on, 필터 없음)
+            incoming = row["incoming_enabled"]
+            entry = WatchEntry(
+                wallet_id=row["id"],
+                user_id=row["user_id"],
+                label=row["label"],
+                chain=row["chain"],
+                incoming_enabled=True if incoming is None else bool(incoming),
+                min_amount_usd=float(row["min_amount_usd"] or 0),
+                digest_mode=row["digest_mode"] or "auto",
+            )
+            address = row["address"].lower()
+            index[address] = index.get(address, ()) + (entry,)
+
+        with cls._lock:
+            cls._by_address = index
+
+        logger.info(f"Wallet index loaded: {len(rows)} wallets, {len(index)} addresses")
+
+    @classmethod
+    def lookup(cls, address: str) -> tuple[WatchEntry, ...]:
+        """주소를 추적 중인 지갑 목록"""
+        if not address:
+            return ()
+        return cls._by_address.get(address.lower(), ())
+
+    @classmethod
+    def is_watched(cls, address: str) -> bool:
+        """추적 중인 주소인지"""
+        return bool(address) and address.lower() in cls._by_address
+
+    @classmethod
+    def add(cls, address: str, entry: WatchEntry):
+        """지갑 추가"""
+        address = address.lower()
+        with cls._lock:
+            cls._by_address[address] = cls._by_address.get(address, ()) + (entry,)
+
+    @classmethod
+    def remove(cls, address: str, wallet_id: int):
+        """지갑 삭제"""
+        address = address.lower()
+        with cls._lock:
+            remaining = tuple(
+                e for e in cls._by_address.get(address, ()) if e.wallet_id != wallet_id
+            )
+            if remaining:
+                cls._by_address[address] = remaining
+            else:
+                cls._by_address.pop(address, None)
+
+    @classmethod
+    def update(cls, address: str, wallet_id: int, **changes):
+        """지갑 설정 변경 (incoming_enabled, min_amount_usd, digest_mode 등)"""
+        address = address.lower()
+        with cls._lock:
+            entries = cls._by_address.get(address)
+            if not entries:
+                return
+            cls._by_address[address] = tuple(
+                replace(e, **changes) if e.wallet_id == wallet_id else e
+                for e in entries
+            )
+
+    @classmethod
+    def size(cls) -> int:
+        """추적 주소 수"""
+        return len(cls._by_address)
@@ -15,9 +15,22 @@ from loguru import logger
 
 from config.base import settings, validate_required_settings
 from db.models import init_db, close_db
+from db.wallet_index import WalletIndex
 from bot.handlers import setup_handlers
+from bot.update_processor import PerUserUpdateProcessor
 from webhook.server import create_app
-from services.http_client import close_http_client
+from webhook.inbox import WebhookInbox
+from webhook.pipeline import start_pipeline, stop_pipeline
+from webhook.delivery import start_delivery, stop_delivery
+from webhook.outbox import NotificationOutbox
+from webhook.digest import DigestBuffer
+from services.http_client import close_aiohttp_session, close_http_client
+from services.rpc_batcher import close_rpc_batchers
+from analyzers.cache import AnalysisCache
+from analyzers.registry import AnalyzerRegistry
+from analyzers.speculative import SpeculativeAnalysis
+from services.price_service import start_price_refresher, stop_price_refresher
+from services.price_sources import close_price_resolver
 
 # 종료 이벤트
 shutdown_event = asyncio.Event()
@@ -34,7 +47,13 @@ async def run_telegram_bot():
             pass
         return
 
-    app = Application.builder().token(settings.telegram_bot_token).build()
+    # 업데이트 동시 처리 (느린 분석이 다른 사용자를 막지 않도록, 사용자별 순서는 유지)
+    app = (
+        Application.builder()
+        .token(settings.telegram_bot_token)
+        .concurrent_updates(PerUserUpdateProcessor(settings.bot_concurrent_updates))
+        .build()
+    )
     setup_handlers(app)
 
     logger.info("Starting Telegram bot...")
@@ -79,6 +98,22 @@ def run_webhook_server(stop_event: threading.Event):
 
     async def serve_with_stop():
         """서버 실행 + 종료 체크"""
+        # 파이프라인/인박스 워커/가격 갱신은 웹훅 서버와 같은 루프에서 실행
+        start_price_refresher()
+        start_delivery()
+        await NotificationOutbox.start(
+            max_attempts=settings.outbox_max_attempts,
+            retry_base_delay=settings.outbox_retry_base_delay,
+            sweep_interval=settings.outbox_sweep_interval,
+            retention_days=settings.outbox_retention_days,
+        )
+        # 요약 버퍼 복구는 새 이벤트가 들어오기 전에
+        await DigestBuffer.start()
+        start_pipeline()
+        await WebhookInbox.start(
+            settings.webhook_workers,
+            retention_days=settings.webhook_inbox_retention_days,
+        )
         server_task = asyncio.create_task(server.serve())
 
         while not stop_event.is_set() and not server_task.done():
@@ -95,6 +130,18 @@ def run_webhook_server(stop_event: threading.Event):
             except asyncio.CancelledError:
                 pass
 
+        await WebhookInbox.stop()
+        await stop_pipeline()
+        await DigestBuffer.stop()
+        await stop_delivery()
+        await NotificationOutbox.stop()
+        stop_price_refresher()
+        await close_price_resolver()
+        # 이 루프의 연결 풀 종료
+        await close_rpc_batchers()
+        await close_http_client()
+        await close_aiohttp_session()
+
     try:
         loop.run_until_complete(serve_with_stop())
     except Exception as e:
@@ -136,8 +183,12 @@ async def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    # DB 초기화
+    # DB 초기화 + 추적 주소 인덱스 로드
     await init_db()
+    await WalletIndex.load()
+
+    # 체인별 분석기 + 연결 풀 (봇 루프에서 재사용)
+    await AnalyzerRegistry.start()
 
     # 웹훅 서버 종료 이벤트
     webhook_stop_event = threading.Event()
@@ -162,12 +213,17 @@ async def main():
     finally:
         logger.info("Shutting down...")
 
-        # 웹훅 서버 종료
+        # 웹훅 서버 종료 - 스레드가 끝날 때까지 기다림
+        # (요약/아웃박스/전송 정리가 공유 DB 연결을 쓰므로 그 전에 close_db 하면 안 됨)
         webhook_stop_event.set()
-        webhook_thread.join(timeout=5)
+        await asyncio.to_thread(webhook_thread.join)
         logger.info("Webhook server stopped")
 
-        # HTTP 클라이언트 종료
+        # 분석기 + HTTP 클라이언트 종료
+        await SpeculativeAnalysis.close()
+        await AnalysisCache.close()
+        await AnalyzerRegistry.close()
+        await close_rpc_batchers()
         await close_http_client()
 
         # DB 종료
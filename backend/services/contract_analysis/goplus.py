@@ -4,6 +4,7 @@ import structlog
 from typing import Optional, List
 from tenacity import retry, stop_after_attempt, wait_exponential
 from models.token import RiskLevel
+from services.http_client import get_aiohttp_session
 
 logger = structlog.get_logger()
 
@@ -13,21 +14,13 @@ class GoPlusService:
 
     BASE_URL = "https://api.gopluslabs.io/api/v1"
 
-    def __init__(self):
-        self._session: Optional[aiohttp.ClientSession] = None
-
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """HTTP 세션 반환"""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        return self._session
+    @staticmethod
+    async def _get_session() -> aiohttp.ClientSession:
+        """HTTP 세션 반환 (루프별 공유 세션)"""
+        return await get_aiohttp_session()
 
     async def close(self):
-        """세션 종료"""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """공유 세션은 종료 시 close_aiohttp_session()에서 닫음"""
 
     @retry(
         stop=stop_after_attempt(3),
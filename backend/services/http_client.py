@@ -1,30 +1,68 @@
-"""공유 HTTP 클라이언트 - 연결 풀링"""
+"""공유 HTTP 클라이언트 - 연결 풀링
+
+봇(메인 루프)과 웹훅 서버(별도 스레드 루프)는 각자 이벤트 루프를 가진다.
+httpx/aiohttp 연결 풀은 만든 루프에 묶이므로 클라이언트를 루프별로 하나씩 두고,
+각 루프 종료 시 그 루프에서 close_*를 호출한다.
+
+- httpx: 가격/메타데이터/Moralis/Helius API
+- aiohttp: 컨트랙트 분석 서비스 (DEXScreener, GoPlus, Etherscan)
+"""
+import asyncio
+import aiohttp
 import httpx
-from typing import Optional
 from loguru import logger
 
-_client: Optional[httpx.AsyncClient] = None
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
 
 
 async def get_http_client() -> httpx.AsyncClient:
-    """싱글톤 HTTP 클라이언트 반환"""
-    global _client
-    if _client is None or _client.is_closed:
-        _client = httpx.AsyncClient(
+    """현재 루프의 httpx 클라이언트 반환"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
             timeout=30.0,
             limits=httpx.Limits(
                 max_connections=100,
                 max_keepalive_connections=20,
             ),
         )
+        _clients[loop] = client
         logger.debug("HTTP client created")
-    return _client
+    return client
 
 
 async def close_http_client():
-    """HTTP 클라이언트 종료"""
-    global _client
-    if _client is not None and not _client.is_closed:
-        await _client.aclose()
+    """현재 루프의 httpx 클라이언트 종료"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
         logger.info("HTTP client closed")
-        _client = None
+
+
+async def get_aiohttp_session() -> aiohttp.ClientSession:
+    """현재 루프의 aiohttp 세션 반환 (keep-alive 연결 재사용)"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            ),
+        )
+        _sessions[loop] = session
+        logger.debug("aiohttp session created")
+    return session
+
+
+async def close_aiohttp_session():
+    """현재 루프의 aiohttp 세션 종료"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("aiohttp session closed")
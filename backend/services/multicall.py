@@ -0,0 +1,111 @@
+"""Multicall3 일괄 조회 - JSON-RPC eth_call 1회로 여러 컨트랙트 호출
+
+Multicall3는 대부분의 EVM 체인에 같은 주소로 배포되어 있다.
+aggregate3(allowFailure=True)를 사용하므로 일부 호출이 revert돼도 나머지 결과는 받는다.
+eth_call은 기본으로 RPC 배처로 보내고, web3를 넘기면 그 프로바이더로 보낸다.
+"""
+from typing import Optional
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+from loguru import logger
+from web3 import AsyncWeb3
+
+from services.rpc_batcher import get_rpc_batcher
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# 요청 1회당 최대 호출 수 (RPC 응답 크기/가스 제한)
+MAX_CALLS_PER_REQUEST = 300
+
+
+def selector(signature: str) -> bytes:
+    """함수 시그니처 -> 4바이트 셀렉터"""
+    return function_signature_to_4byte_selector(signature)
+
+
+AGGREGATE3 = selector("aggregate3((address,bool,bytes)[])")
+
+# ERC20 조회용 셀렉터
+ERC20_NAME = selector("name()")
+ERC20_SYMBOL = selector("symbol()")
+ERC20_DECIMALS = selector("decimals()")
+ERC20_TOTAL_SUPPLY = selector("totalSupply()")
+
+# Uniswap V2/V3 풀 토큰
+POOL_TOKEN0 = selector("token0()")
+POOL_TOKEN1 = selector("token1()")
+
+
+async def eth_call(rpc_url: str, to: str, data: bytes) -> bytes:
+    """eth_call 1회 (RPC 에러 시 예외, 같은 엔드포인트 동시 호출과 배치로 묶임)"""
+    result = await get_rpc_batcher(rpc_url).call(
+        "eth_call", [{"to": to, "data": "0x" + data.hex()}, "latest"]
+    )
+    return bytes.fromhex((result or "0x")[2:])
+
+
+async def aggregate3(
+    rpc_url: str,
+    calls: list[tuple[str, bytes]],
+    web3: Optional[AsyncWeb3] = None
+) -> list[Optional[bytes]]:
+    """(대상 주소, calldata) 목록을 Multicall3로 일괄 호출
+
+    web3가 있으면 rpc_url 대신 그 프로바이더로 eth_call을 보낸다.
+
+    Returns:
+        호출 순서대로 반환 데이터 (revert된 호출은 None)
+    """
+    results: list[Optional[bytes]] = []
+
+    for start in range(0, len(calls), MAX_CALLS_PER_REQUEST):
+        chunk = calls[start:start + MAX_CALLS_PER_REQUEST]
+        payload = AGGREGATE3 + encode(
+            ["(address,bool,bytes)[]"],
+            [[(target, True, data) for target, data in chunk]],
+        )
+        if web3 is not None:
+            raw = bytes(await web3.eth.call({"to": MULTICALL3_ADDRESS, "data": payload}))
+        else:
+            raw = await eth_call(rpc_url, MULTICALL3_ADDRESS, payload)
+        (decoded,) = decode(["(bool,bytes)[]"], raw)
+        results.extend(data if success and data else None for success, data in decoded)
+
+    logger.debug(f"Multicall3: {len(calls)} calls in {-(-len(calls) // MAX_CALLS_PER_REQUEST)} requests")
+    return results
+
+
+def decode_string(data: Optional[bytes]) -> Optional[str]:
+    """string 반환값 디코딩 (구형 토큰의 bytes32 반환도 처리)"""
+    if not data:
+        return None
+    try:
+        (value,) = decode(["string"], data)
+        return value
+    except Exception:
+        pass
+    if len(data) == 32:
+        return data.rstrip(b"\x00").decode("utf-8", errors="ignore") or None
+    return None
+
+
+def decode_uint(data: Optional[bytes]) -> Optional[int]:
+    """uint 반환값 디코딩"""
+    if not data or len(data) < 32:
+        return None
+    try:
+        (value,) = decode(["uint256"], data[:32])
+        return value
+    except Exception:
+        return None
+
+
+def decode_address(data: Optional[bytes]) -> Optional[str]:
+    """address 반환값 디코딩 (소문자)"""
+    if not data or len(data) < 32:
+        return None
+    try:
+        (value,) = decode(["address"], data[:32])
+        return value.lower()
+    except Exception:
+        return None
@@ -1,14 +1,44 @@
-"""실시간 가격 조회 서비스 - CoinGecko API"""
+"""실시간 가격 조회 서비스 - CoinGecko API
+
+캐시 조회는 락 없이 수행한다 (웹훅 루프 단일 스레드, 조회 중 await 없음).
+같은 키의 동시 캐시 미스는 진행 중인 요청 하나를 공유하고(single-flight),
+미상장 토큰/조회 실패는 짧은 TTL의 negative 캐시에 넣어 재시도 폭주를 막는다.
+
+stale-while-revalidate: soft TTL이 지난 값은 그대로 반환하고 백그라운드에서
+갱신한다. 네이티브 토큰과 자주 조회되는 토큰은 스케줄러가 주기적으로 미리
+갱신하므로 알림 처리 중에는 가격 조회를 기다리지 않는다.
+"""
 import asyncio
-from typing import Optional, Dict
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, Dict
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from cachetools import TTLCache
 from loguru import logger
 
+from config import settings
 from services.http_client import get_http_client
+from services.price_sources import get_price_resolver
+
+# 캐시: 키 -> (가격, 조회 시각), hard TTL까지 보관
+_price_cache: TTLCache = TTLCache(maxsize=500, ttl=settings.price_hard_ttl)
+
+# negative 캐시: 미상장 토큰 / 조회 실패 (1분 TTL)
+_negative_cache: TTLCache = TTLCache(maxsize=2000, ttl=60)
+
+# 진행 중인 조회 (캐시 키 -> 결과 Future)
+_inflight: Dict[str, asyncio.Future] = {}
 
-# 캐시: 5분 TTL, 최대 500개 항목
-_price_cache: TTLCache = TTLCache(maxsize=500, ttl=300)
-_cache_lock = asyncio.Lock()
+# 백그라운드 갱신 중인 키 / 태스크 (GC 방지용 참조)
+_refreshing: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+# 토큰 조회 횟수 ((체인, 주소) -> 횟수, 갱신 주기마다 절반으로 감쇠)
+_token_hits: Counter = Counter()
+
+# 조회 함수: 캐시 미스 키 목록 -> 키별 가격 (없으면 실패/미상장)
+Fetcher = Callable[[list[str]], Awaitable[Dict[str, float]]]
 
 # CoinGecko 체인 ID 매핑
 COINGECKO_CHAIN_MAP = {
@@ -28,45 +58,70 @@ class PriceService:
 
     BASE_URL = "https://api.coingecko.com/api/v3"
 
+    @staticmethod
+    def _normalize_address(chain: str, address: str) -> str:
+        """주소 정규화 (EVM은 소문자, Solana 민트는 대소문자 구분)"""
+        return address if chain == "sol" else address.lower()
+
     @classmethod
     async def get_native_price(cls, chain: str) -> float:
         """네이티브 토큰 USD 가격 조회 (ETH, SOL, BNB 등)"""
-        cache_key = f"native:{chain}"
+        prices = await cls.get_native_prices([chain])
+        return prices.get(chain, 0.0)
 
-        async with _cache_lock:
-            if cache_key in _price_cache:
-                cached = _price_cache[cache_key]
-                logger.debug(f"Cache hit for {chain} native: ${cached}")
-                return cached
+    @classmethod
+    async def get_native_prices(cls, chains: Iterable[str]) -> Dict[str, float]:
+        """여러 체인의 네이티브 토큰 가격 조회 (캐시 미스는 요청 1회로 조회)"""
+        prices: Dict[str, float] = {}
+        keys: Dict[str, str] = {}
+
+        for chain in set(chains):
+            if chain in COINGECKO_CHAIN_MAP:
+                keys[f"native:{chain}"] = chain
+            else:
+                logger.warning(f"Unknown chain for price lookup: {chain}")
+                prices[chain] = 0.0
 
-        chain_info = COINGECKO_CHAIN_MAP.get(chain)
-        if not chain_info:
-            logger.warning(f"Unknown chain for price lookup: {chain}")
-            return 0.0
+        async def fetch(missing: list[str]) -> Dict[str, float]:
+            return await cls._fetch_native_prices({key: keys[key] for key in missing})
+
+        resolved = await cls._resolve(list(keys), fetch)
+        for key, price in resolved.items():
+            prices[keys[key]] = price
+        return prices
+
+    @classmethod
+    async def _fetch_native_prices(cls, chains_by_key: Dict[str, str]) -> Dict[str, float]:
+        """/simple/price 요청 1회 (코인 여러 개)"""
+        coin_ids = sorted({COINGECKO_CHAIN_MAP[chain]["id"] for chain in chains_by_key.values()})
 
         try:
             client = await get_http_client()
             resp = await client.get(
                 f"{cls.BASE_URL}/simple/price",
                 params={
-                    "ids": chain_info["id"],
+                    "ids": ",".join(coin_ids),
                     "vs_currencies": "usd",
                 },
             )
             resp.raise_for_status()
             data = resp.json()
 
-            price = data.get(chain_info["id"], {}).get("usd", 0.0)
-
-            async with _cache_lock:
-                _price_cache[cache_key] = price
-
-            logger.info(f"Native price for {chain}: ${price}")
-            return price
+            logger.info(f"Native prices fetched: {', '.join(sorted(chains_by_key.values()))}")
+            return {
+                key: data.get(COINGECKO_CHAIN_MAP[chain]["id"], {}).get("usd", 0.0)
+                for key, chain in chains_by_key.items()
+            }
 
         except Exception as e:
-            logger.error(f"Failed to get native price for {chain}: {e}")
-            return 0.0
+            logger.error(f"Failed to get native prices for {list(chains_by_key.values())}: {e}")
+            return {}
+
+    @staticmethod
+    def get_cached_native_price(chain: str) -> Optional[float]:
+        """캐시된 네이티브 토큰 가격 (네트워크 조회 없음, stale 포함, 없으면 None)"""
+        cached = _price_cache.get(f"native:{chain}")
+        return cached[0] if cached else None
 
     @classmethod
     async def get_token_price(cls, chain: str, contract_address: str) -> float:
@@ -74,48 +129,206 @@ class PriceService:
         if not contract_address:
             return 0.0
 
-        # 주소 정규화
-        address = contract_address.lower()
-        cache_key = f"token:{chain}:{address}"
+        prices = await cls.get_token_prices(chain, [contract_address])
+        return prices.get(cls._normalize_address(chain, contract_address), 0.0)
 
-        async with _cache_lock:
-            if cache_key in _price_cache:
-                cached = _price_cache[cache_key]
-                logger.debug(f"Cache hit for token {address[:10]}...: ${cached}")
-                return cached
-
-        chain_info = COINGECKO_CHAIN_MAP.get(chain)
-        if not chain_info:
+    @classmethod
+    async def get_token_prices(
+        cls,
+        chain: str,
+        contract_addresses: Iterable[str]
+    ) -> Dict[str, float]:
+        """같은 체인의 토큰 여러 개 USD 가격 조회
+
+        캐시 미스만 모아 소스별 일괄 요청으로 조회한다
+        (CoinGecko 우선, 없거나 느리면 다른 소스로 폴백 - price_sources 참고).
+
+        Returns:
+            정규화된 주소 -> 가격 (조회 실패/미상장은 0.0)
+        """
+        keys = {
+            f"token:{chain}:{address}": address
+            for address in (cls._normalize_address(chain, a) for a in contract_addresses if a)
+        }
+
+        if not any(source.supports(chain) for source in get_price_resolver().sources):
             logger.warning(f"Unknown chain for token price: {chain}")
-            return 0.0
+            return {address: 0.0 for address in keys.values()}
 
-        try:
-            client = await get_http_client()
-            resp = await client.get(
-                f"{cls.BASE_URL}/simple/token_price/{chain_info['platform']}",
-                params={
-                    "contract_addresses": address,
-                    "vs_currencies": "usd",
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        for address in keys.values():
+            _token_hits[(chain, address)] += 1
 
-            price = data.get(address, {}).get("usd", 0.0)
+        resolved = await cls._resolve(list(keys), cls._token_fetcher(chain, keys))
+        return {keys[key]: price for key, price in resolved.items()}
 
-            async with _cache_lock:
-                _price_cache[cache_key] = price
+    @classmethod
+    def _token_fetcher(cls, chain: str, keys: Dict[str, str]) -> Fetcher:
+        """체인별 토큰 조회 함수 (단계별 소스 조회)"""
 
-            if price > 0:
-                logger.info(f"Token price for {address[:10]}... on {chain}: ${price}")
+        async def fetch(missing: list[str]) -> Dict[str, float]:
+            addresses = [keys[key] for key in missing]
+            prices = await get_price_resolver().resolve(chain, addresses)
+
+            found = sum(1 for p in prices.values() if p > 0)
+            logger.info(f"Token prices on {chain}: {found}/{len(addresses)} found")
+            return {key: prices.get(keys[key], 0.0) for key in missing}
+
+        return fetch
+
+    @classmethod
+    async def _resolve(cls, keys: list[str], fetch: Fetcher) -> Dict[str, float]:
+        """캐시 -> 진행 중 요청 공유 -> 나머지만 조회
+
+        Returns:
+            캐시 키 -> 가격 (실패/미상장은 0.0, negative 캐시에 기록)
+        """
+        result: Dict[str, float] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: list[str] = []
+        stale: list[str] = []
+        now = time.monotonic()
+
+        for key in keys:
+            cached = _price_cache.get(key)
+            if cached is not None:
+                price, fetched_at = cached
+                result[key] = price
+                if now - fetched_at > settings.price_soft_ttl:
+                    stale.append(key)
+            elif key in _negative_cache:
+                result[key] = 0.0
+            elif key in _inflight:
+                waiting[key] = _inflight[key]
             else:
-                logger.debug(f"Token {address[:10]}... not found on CoinGecko")
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            _inflight.update(futures)
+
+            try:
+                fetched = await fetch(missing)
+            except asyncio.CancelledError:
+                # 취소는 실패로 보지 않음 (negative 캐시 없이 기다리던 요청만 풀어줌)
+                cls._settle(futures, {}, negative=False)
+                raise
+            except Exception as e:
+                logger.warning(f"Price fetch failed for {len(missing)} keys: {e}")
+                fetched = {}
+            result.update(cls._settle(futures, fetched, negative=True))
+
+        for key, future in waiting.items():
+            # 공유 Future는 다른 요청이 취소돼도 결과가 남도록 shield
+            result[key] = await asyncio.shield(future)
+
+        if stale:
+            cls._revalidate_in_background(stale, fetch)
+
+        return result
+
+    @classmethod
+    def _settle(
+        cls,
+        futures: Dict[str, asyncio.Future],
+        fetched: Dict[str, float],
+        negative: bool
+    ) -> Dict[str, float]:
+        """조회 결과 캐시 + 진행 중 요청 해제 (negative면 가격 없는 키를 negative 캐시에)"""
+        prices = {}
+        for key, future in futures.items():
+            price = fetched.get(key, 0.0)
+            if price > 0:
+                cls._store(key, price)
+            elif negative:
+                _negative_cache[key] = True
+            if not future.done():
+                future.set_result(price)
+            _inflight.pop(key, None)
+            prices[key] = price
+        return prices
+
+    @staticmethod
+    def _store(key: str, price: float):
+        """가격 캐시 저장 (조회 시각 기록)"""
+        _price_cache[key] = (price, time.monotonic())
+        _negative_cache.pop(key, None)
+
+    @classmethod
+    def _revalidate_in_background(cls, keys: list[str], fetch: Fetcher):
+        """stale 키 백그라운드 갱신 (이미 갱신 중인 키는 제외)"""
+        keys = [key for key in keys if key not in _refreshing and key not in _inflight]
+        if not keys:
+            return
 
-            return price
+        task = asyncio.create_task(cls._revalidate(keys, fetch))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
+    @classmethod
+    async def _revalidate(cls, keys: list[str], fetch: Fetcher):
+        """키 목록 재조회 후 캐시 갱신 (실패하면 기존 값 유지)"""
+        _refreshing.update(keys)
+        try:
+            fetched = await fetch(keys)
+            for key, price in fetched.items():
+                if price > 0:
+                    cls._store(key, price)
         except Exception as e:
-            logger.error(f"Failed to get token price for {address[:10]}...: {e}")
-            return 0.0
+            logger.warning(f"Price revalidation failed ({len(keys)} keys): {e}")
+        finally:
+            _refreshing.difference_update(keys)
+
+    @classmethod
+    async def refresh_hot_prices(cls):
+        """네이티브 토큰 + 인기 토큰 가격 미리 갱신 (스케줄러 잡)"""
+        await cls.batch_get_native_prices()
+
+        hot = [pair for pair, _ in _token_hits.most_common(settings.price_refresh_top_tokens)]
+
+        # 최근 조회 빈도가 반영되도록 감쇠
+        for pair in list(_token_hits):
+            _token_hits[pair] //= 2
+            if not _token_hits[pair]:
+                del _token_hits[pair]
+
+        tokens_by_chain: dict[str, Dict[str, str]] = {}
+        for chain, address in hot:
+            tokens_by_chain.setdefault(chain, {})[f"token:{chain}:{address}"] = address
+
+        await asyncio.gather(*(
+            cls._revalidate(list(keys), cls._token_fetcher(chain, keys))
+            for chain, keys in tokens_by_chain.items()
+        ))
+
+        if hot:
+            logger.debug(f"Hot token prices refreshed: {len(hot)} tokens")
+
+    @classmethod
+    async def prefetch(cls, pairs: Iterable[tuple[str, Optional[str]]]):
+        """(체인, 컨트랙트) 쌍 묶음의 가격을 미리 캐시에 채움
+
+        웹훅 1건에 포함된 모든 토큰을 체인별로 묶어 최소 요청으로 조회한다.
+        컨트랙트가 None이면 네이티브 토큰.
+        """
+        native_chains = set()
+        tokens_by_chain: dict[str, set[str]] = {}
+
+        for chain, address in pairs:
+            if address:
+                tokens_by_chain.setdefault(chain, set()).add(address)
+            else:
+                native_chains.add(chain)
+
+        tasks = [
+            cls.get_token_prices(chain, addresses)
+            for chain, addresses in tokens_by_chain.items()
+        ]
+        if native_chains:
+            tasks.append(cls.get_native_prices(native_chains))
+
+        if tasks:
+            await asyncio.gather(*tasks)
 
     @classmethod
     async def get_usd_value(
@@ -155,11 +368,11 @@ class PriceService:
             data = resp.json()
 
             prices = {}
-            async with _cache_lock:
-                for chain, info in COINGECKO_CHAIN_MAP.items():
-                    price = data.get(info["id"], {}).get("usd", 0.0)
-                    prices[chain] = price
-                    _price_cache[f"native:{chain}"] = price
+            for chain, info in COINGECKO_CHAIN_MAP.items():
+                price = data.get(info["id"], {}).get("usd", 0.0)
+                prices[chain] = price
+                if price > 0:
+                    cls._store(f"native:{chain}", price)
 
             logger.info(f"Batch price update: {len(prices)} chains")
             return prices
@@ -172,4 +385,42 @@ class PriceService:
     def clear_cache(cls):
         """캐시 초기화"""
         _price_cache.clear()
+        _negative_cache.clear()
+        _token_hits.clear()
         logger.info("Price cache cleared")
+
+
+# 백그라운드 가격 갱신 스케줄러 (웹훅 서버 루프에서 start_price_refresher)
+_scheduler: Optional[AsyncIOScheduler] = None
+
+
+def start_price_refresher() -> AsyncIOScheduler:
+    """가격 갱신 스케줄러 시작 (즉시 1회 실행 후 주기 실행)
+
+    가격 캐시의 Future/태스크가 웹훅 루프에 묶이므로 봇 JobQueue가 아닌
+    웹훅 루프의 AsyncIOScheduler를 사용한다.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AsyncIOScheduler(event_loop=asyncio.get_running_loop())
+        _scheduler.add_job(
+            PriceService.refresh_hot_prices,
+            "interval",
+            seconds=settings.price_refresh_interval,
+            next_run_time=datetime.now(),
+            id="price_refresh",
+            max_instances=1,
+            coalesce=True,
+        )
+        _scheduler.start()
+        logger.info(f"Price refresher started (every {settings.price_refresh_interval}s)")
+    return _scheduler
+
+
+def stop_price_refresher():
+    """가격 갱신 스케줄러 종료"""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+        logger.info("Price refresher stopped")
@@ -0,0 +1,363 @@
+"""토큰 가격 소스 + 단계별(tiered) 가격 조회
+
+CoinGecko는 롱테일 토큰(밈코인 등)을 모르는 경우가 많아 0.0을 반환하고,
+그러면 min_amount_usd 필터가 조용히 깨진다. 여러 소스를 순서대로 시도해
+가격 커버리지를 높인다.
+
+- 1순위 CoinGecko, 이후 Jupiter(Solana 전용), DEXScreener 순으로 폴백
+- 앞 소스가 지연 예산(hedge delay)을 넘기면 다음 소스를 동시에 시작해
+  먼저 끝난 쪽 결과를 쓴다 (hedged request)
+- 전체 조회는 제한 시간을 넘지 않는다 (늦게 끝난 소스 결과는 소스 캐시에 남음)
+- 소스마다 자체 캐시와 요청 예산(토큰 버킷)을 가지며, 예산이 없으면
+  캐시 결과만 주고 다음 소스로 넘어간다
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from cachetools import TTLCache
+from loguru import logger
+from tenacity import stop_after_attempt
+
+from config import settings
+from services.contract_analysis.dexscreener import DEXScreenerService
+from services.http_client import get_http_client
+from utils.rate_limit import TokenBucket
+
+
+class PriceSource(ABC):
+    """토큰 가격 소스 추상 클래스
+
+    하위 클래스는 CHAINS(지원 체인 -> 소스별 체인 ID)와 _fetch를 구현한다.
+    """
+
+    name = "base"
+    CHAINS: Dict[str, str] = {}
+
+    # 요청 예산 (초당 요청 수 / 버스트)
+    RATE_PER_SEC = 1.0
+    BURST = 5
+
+    # 소스 자체 캐시 (가격 0.0 = 해당 소스에 없음)
+    CACHE_TTL = 120
+
+    def __init__(self):
+        self._cache: TTLCache = TTLCache(maxsize=2000, ttl=self.CACHE_TTL)
+        self._budget = TokenBucket(self.RATE_PER_SEC, self.BURST)
+        self.stats = {"requests": 0, "hits": 0, "found": 0, "throttled": 0, "errors": 0}
+
+    def supports(self, chain: str) -> bool:
+        """지원 체인 여부"""
+        return chain in self.CHAINS
+
+    async def get_prices(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """주소별 USD 가격 (캐시 -> 예산 내에서 조회)
+
+        Returns:
+            조회된 주소 -> 가격 (0.0 = 이 소스에 없음, 누락 = 조회 못함)
+        """
+        prices: Dict[str, float] = {}
+        missing: list[str] = []
+
+        for address in addresses:
+            cached = self._cache.get((chain, address))
+            if cached is not None:
+                prices[address] = cached
+                self.stats["hits"] += 1
+            else:
+                missing.append(address)
+
+        if not missing:
+            return prices
+
+        if not self._budget.try_acquire():
+            self.stats["throttled"] += 1
+            logger.debug(f"Price source {self.name} throttled ({len(missing)} tokens)")
+            return prices
+
+        self.stats["requests"] += 1
+        try:
+            fetched = await self._fetch(chain, missing)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Price source {self.name} failed on {chain}: {e}")
+            return prices
+
+        for address in missing:
+            price = fetched.get(address, 0.0)
+            self._cache[(chain, address)] = price
+            prices[address] = price
+            if price > 0:
+                self.stats["found"] += 1
+
+        return prices
+
+    @abstractmethod
+    async def _fetch(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """소스 API 조회 (실패 시 예외)"""
+        pass
+
+    async def close(self):
+        """리소스 정리"""
+
+
+class CoinGeckoSource(PriceSource):
+    """CoinGecko /simple/token_price"""
+
+    name = "coingecko"
+    BASE_URL = "https://api.coingecko.com/api/v3"
+    CHAINS = {
+        "eth": "ethereum",
+        "bsc": "binance-smart-chain",
+        "polygon": "polygon-pos",
+        "arb": "arbitrum-one",
+        "base": "base",
+        "op": "optimistic-ethereum",
+        "avax": "avalanche",
+        "sol": "solana",
+    }
+
+    # 무료 플랜 약 30회/분
+    RATE_PER_SEC = 0.5
+    BURST = 10
+
+    # 요청 1회당 최대 컨트랙트 수 (URL 길이 제한)
+    BATCH_SIZE = 30
+
+    async def _fetch(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """BATCH_SIZE 단위로 나눠 동시 요청"""
+        chunks = [
+            addresses[i:i + self.BATCH_SIZE]
+            for i in range(0, len(addresses), self.BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._fetch_chunk(chain, chunk) for chunk in chunks))
+        return {address: price for result in results for address, price in result.items()}
+
+    async def _fetch_chunk(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """요청 1회 (주소 여러 개)"""
+        client = await get_http_client()
+        resp = await client.get(
+            f"{self.BASE_URL}/simple/token_price/{self.CHAINS[chain]}",
+            params={
+                "contract_addresses": ",".join(addresses),
+                "vs_currencies": "usd",
+            },
+        )
+        resp.raise_for_status()
+        # 응답 키는 소문자일 수 있으므로 소문자로 맞춰 조회
+        data = {k.lower(): v for k, v in resp.json().items()}
+        return {
+            address: data.get(address.lower(), {}).get("usd", 0.0)
+            for address in addresses
+        }
+
+
+class JupiterSource(PriceSource):
+    """Jupiter Price API (Solana 전용)"""
+
+    name = "jupiter"
+    BASE_URL = "https://lite-api.jup.ag/price/v3"
+    CHAINS = {"sol": "solana"}
+
+    RATE_PER_SEC = 1.0
+    BURST = 5
+
+    # 요청 1회당 최대 민트 수
+    BATCH_SIZE = 50
+
+    async def _fetch(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """BATCH_SIZE 단위로 나눠 동시 요청"""
+        chunks = [
+            addresses[i:i + self.BATCH_SIZE]
+            for i in range(0, len(addresses), self.BATCH_SIZE)
+        ]
+        client = await get_http_client()
+        responses = await asyncio.gather(*(
+            client.get(self.BASE_URL, params={"ids": ",".join(chunk)})
+            for chunk in chunks
+        ))
+
+        prices: Dict[str, float] = {}
+        for resp in responses:
+            resp.raise_for_status()
+            for mint, info in (resp.json() or {}).items():
+                prices[mint] = float((info or {}).get("usdPrice") or 0.0)
+        return prices
+
+
+class DEXScreenerSource(PriceSource):
+    """DEXScreener 페어 가격 (유동성이 가장 큰 페어 기준)"""
+
+    name = "dexscreener"
+    CHAINS = {
+        "eth": "ethereum",
+        "bsc": "bsc",
+        "polygon": "polygon",
+        "arb": "arbitrum",
+        "base": "base",
+        "op": "optimism",
+        "avax": "avalanche",
+        "sol": "solana",
+    }
+
+    # token-pairs 엔드포인트 300회/분, 주소마다 1회씩 호출하므로 토큰 수만큼 소비
+    RATE_PER_SEC = 4.0
+    BURST = 10
+
+    def __init__(self):
+        super().__init__()
+        self._service = DEXScreenerService()
+
+    async def _fetch(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """주소별 동시 조회 (예산이 남는 만큼만)"""
+        # 첫 주소는 get_prices에서 예산을 이미 소비함
+        allowed = addresses[:1] + [a for a in addresses[1:] if self._budget.try_acquire()]
+
+        # 폴백/헤지 단계라 재시도 없이 1회만 호출
+        get_pairs = DEXScreenerService.get_token_pairs.retry_with(stop=stop_after_attempt(1))
+        results = await asyncio.gather(
+            *(get_pairs(self._service, self.CHAINS[chain], address) for address in allowed),
+            return_exceptions=True,
+        )
+
+        prices: Dict[str, float] = {}
+        for address, pairs in zip(allowed, results):
+            if isinstance(pairs, Exception):
+                continue
+            prices[address] = self._price_from_pairs(pairs or [], address)
+        return prices
+
+    @staticmethod
+    def _price_from_pairs(pairs: list, address: str) -> float:
+        """토큰이 포함된 페어 중 유동성이 가장 큰 페어의 USD 가격"""
+        address = address.lower()
+        best_liquidity = -1.0
+        best_price = 0.0
+
+        for pair in pairs:
+            liquidity = DEXScreenerService._safe_float(pair.get("liquidity", {}).get("usd")) or 0.0
+            if liquidity <= best_liquidity:
+                continue
+
+            price_usd = DEXScreenerService._safe_float(pair.get("priceUsd")) or 0.0
+            if (pair.get("baseToken", {}).get("address") or "").lower() == address:
+                price = price_usd
+            elif (pair.get("quoteToken", {}).get("address") or "").lower() == address:
+                # priceNative = 베이스 토큰 1개의 쿼트 토큰 가격
+                price_native = DEXScreenerService._safe_float(pair.get("priceNative")) or 0.0
+                price = price_usd / price_native if price_native else 0.0
+            else:
+                continue
+
+            if price > 0:
+                best_liquidity = liquidity
+                best_price = price
+
+        return best_price
+
+    async def close(self):
+        await self._service.close()
+
+
+class TieredPriceResolver:
+    """소스 우선순위대로 조회 + 지연 시 다음 소스 헤지"""
+
+    def __init__(self, sources: list[PriceSource]):
+        self.sources = sources
+        self.stats = {"resolved": 0, "hedged": 0, "timeouts": 0}
+        # 제한 시간 후에도 진행 중인 소스 요청 (결과는 소스 캐시에 반영됨)
+        self._background: set[asyncio.Task] = set()
+
+    async def resolve(self, chain: str, addresses: list[str]) -> Dict[str, float]:
+        """주소별 USD 가격 (어느 소스에도 없으면 0.0)"""
+        prices: Dict[str, float] = {}
+        remaining = list(dict.fromkeys(addresses))
+        queue = [source for source in self.sources if source.supports(chain)]
+        deadline = time.monotonic() + settings.price_resolve_timeout
+
+        while remaining and queue:
+            source = queue.pop(0)
+            tasks = {asyncio.create_task(source.get_prices(chain, remaining))}
+
+            # 지연 예산 안에 끝나지 않으면 다음 소스를 동시에 시작
+            done, _ = await asyncio.wait(tasks, timeout=settings.price_hedge_delay)
+            if not done and queue:
+                hedge = queue.pop(0)
+                tasks.add(asyncio.create_task(hedge.get_prices(chain, remaining)))
+                self.stats["hedged"] += 1
+                logger.debug(f"Price hedge on {chain}: {source.name} slow, racing {hedge.name}")
+
+            remaining = await self._collect(tasks, remaining, prices, deadline)
+            if time.monotonic() >= deadline:
+                if remaining:
+                    self.stats["timeouts"] += 1
+                    logger.warning(
+                        f"Price resolve timeout on {chain}: {len(remaining)} tokens unresolved"
+                    )
+                break
+
+        self.stats["resolved"] += len(prices)
+        return {address: prices.get(address, 0.0) for address in addresses}
+
+    async def _collect(
+        self,
+        tasks: set[asyncio.Task],
+        remaining: list[str],
+        prices: Dict[str, float],
+        deadline: float
+    ) -> list[str]:
+        """완료되는 순서대로 가격 반영, 남은 주소 반환"""
+        while tasks and remaining:
+            done, tasks = await asyncio.wait(
+                tasks,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+
+            for task in done:
+                for address, price in task.result().items():
+                    if price > 0 and address not in prices:
+                        prices[address] = price
+            remaining = [address for address in remaining if address not in prices]
+
+        # 남은 요청은 끊지 않고 백그라운드에서 마무리 (소스 캐시 채움)
+        for task in tasks:
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+        return remaining
+
+    async def close(self):
+        """진행 중 요청 취소 + 소스 정리"""
+        for task in list(self._background):
+            task.cancel()
+        for source in self.sources:
+            await source.close()
+
+
+# 토큰 가격 조회기 (웹훅 서버 루프에서 사용)
+_resolver: Optional[TieredPriceResolver] = None
+
+
+def get_price_resolver() -> TieredPriceResolver:
+    """기본 소스 구성의 조회기 (CoinGecko -> Jupiter -> DEXScreener)"""
+    global _resolver
+    if _resolver is None:
+        _resolver = TieredPriceResolver([
+            CoinGeckoSource(),
+            JupiterSource(),
+            DEXScreenerSource(),
+        ])
+    return _resolver
+
+
+async def close_price_resolver():
+    """조회기 종료"""
+    global _resolver
+    if _resolver is not None:
+        await _resolver.close()
+        _resolver = None
@@ -0,0 +1,203 @@
+"""JSON-RPC 마이크로 배칭 - 동시에 나온 호출을 배치 요청 1회로
+
+여러 사용자가 동시에 분석하면 eth_call, getTokenSupply 같은 호출이 각각 HTTP 요청이 되는데,
+공개 RPC 엔드포인트는 요청 수 기준으로 속도 제한을 건다. 엔드포인트별로 몇 ms 동안 들어온
+호출을 모아 JSON-RPC 배치(배열) 요청 1회로 보내고, 응답을 id로 나눠 각 호출자에게 돌려준다.
+
+- 첫 호출 후 batch window가 지나거나 max batch개가 차면 전송
+- 호출이 1건뿐이면 배치가 아닌 단일 요청으로 보냄
+- 배치를 거부하는 엔드포인트(4xx 또는 배열이 아닌 응답)면 그 배치를 1건씩 다시 보내고,
+  이후 그 엔드포인트는 배칭하지 않는다
+- 전송은 공유 httpx 클라이언트 사용. Future가 루프에 묶이므로 배처도 루프별로 둔다
+
+EVM 분석기(AsyncWeb3 BatchingProvider), Multicall3 eth_call, 솔라나 RPC가 함께 쓴다.
+"""
+import asyncio
+import itertools
+import json
+from typing import Any, Optional
+import httpx
+from loguru import logger
+from web3 import Web3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from config import settings
+from services.http_client import get_http_client
+
+# (루프, URL) -> 배처
+_batchers: dict[tuple[asyncio.AbstractEventLoop, str], "RpcBatcher"] = {}
+
+_stats = {"calls": 0, "requests": 0, "batched_calls": 0, "errors": 0, "unbatched_endpoints": 0}
+
+
+class RpcError(RuntimeError):
+    """JSON-RPC 에러 응답"""
+
+    def __init__(self, method: str, error: Any):
+        super().__init__(f"{method} error: {error}")
+        self.error = error
+
+
+class RpcBatcher:
+    """엔드포인트 1개의 호출 모으기 + 배치 전송"""
+
+    def __init__(self, url: str, window: float, max_batch: int):
+        self.url = url
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        # (요청 본문, 응답 Future)
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sends: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        # 배치 요청을 거부한 엔드포인트면 False (이후 1건씩 전송)
+        self._batch_supported = True
+
+    async def request(self, method: str, params: list) -> RPCResponse:
+        """호출 1건 (응답 객체 그대로 반환, error 필드 포함 가능)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        body = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        self._pending.append((body, future))
+        _stats["calls"] += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    async def call(self, method: str, params: list) -> Any:
+        """호출 1건 (result 반환, RPC 에러면 RpcError)"""
+        response = await self.request(method, params)
+        if response.get("error"):
+            raise RpcError(method, response["error"])
+        return response.get("result")
+
+    def _flush(self):
+        """모인 호출을 떼어 전송 태스크 시작"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        if self._batch_supported:
+            self._start_send(batch)
+        else:
+            for entry in batch:
+                self._start_send([entry])
+
+    def _start_send(self, batch: list[tuple[dict, asyncio.Future]]):
+        task = asyncio.create_task(self._send(batch))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]):
+        """HTTP 요청 1회로 전송하고 응답을 id별로 분배"""
+        _stats["requests"] += 1
+        if len(batch) > 1:
+            _stats["batched_calls"] += len(batch)
+
+        try:
+            client = await get_http_client()
+            payload = batch[0][0] if len(batch) == 1 else [body for body, _ in batch]
+            resp = await client.post(self.url, json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+        except httpx.HTTPStatusError as e:
+            if len(batch) > 1 and 400 <= e.response.status_code < 500 and e.response.status_code != 429:
+                await self._send_unbatched(batch, f"HTTP {e.response.status_code}")
+                return
+            self._fail(batch, e)
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        if len(batch) > 1 and not isinstance(data, list):
+            await self._send_unbatched(batch, "non-array response")
+            return
+
+        if isinstance(data, dict):
+            data = [data]
+        responses = {item.get("id"): item for item in data if isinstance(item, dict)}
+
+        for body, future in batch:
+            if future.done():
+                continue
+            response = responses.get(body["id"])
+            if response is None and len(batch) == 1 and len(data) == 1:
+                # 단일 요청의 id 없는 에러 응답
+                response = data[0]
+            if response is None:
+                future.set_exception(RpcError(body["method"], "missing response in batch"))
+            else:
+                future.set_result(response)
+
+    def _fail(self, batch: list[tuple[dict, asyncio.Future]], error: Exception):
+        """전송 실패를 배치의 모든 호출자에게 전달"""
+        _stats["errors"] += 1
+        logger.warning(f"RPC batch of {len(batch)} to {self.url} failed: {error}")
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _send_unbatched(self, batch: list[tuple[dict, asyncio.Future]], reason: str):
+        """배치를 거부한 엔드포인트: 기억해 두고 이번 배치는 1건씩 다시 전송"""
+        if self._batch_supported:
+            self._batch_supported = False
+            _stats["unbatched_endpoints"] += 1
+            logger.warning(f"RPC endpoint {self.url} rejected a batch ({reason}), sending calls one by one")
+        await asyncio.gather(*(self._send([entry]) for entry in batch))
+
+    async def close(self):
+        """남은 호출을 보내고 전송이 끝날 때까지 대기"""
+        self._flush()
+        if self._sends:
+            await asyncio.gather(*list(self._sends), return_exceptions=True)
+
+
+def get_rpc_batcher(url: str) -> RpcBatcher:
+    """현재 루프의 엔드포인트 배처 반환"""
+    key = (asyncio.get_running_loop(), url)
+    batcher = _batchers.get(key)
+    if batcher is None:
+        batcher = RpcBatcher(
+            url,
+            window=settings.rpc_batch_window_ms / 1000,
+            max_batch=settings.rpc_batch_max_size,
+        )
+        _batchers[key] = batcher
+    return batcher
+
+
+async def close_rpc_batchers():
+    """현재 루프의 배처 종료 (HTTP 클라이언트를 닫기 전에 호출)"""
+    loop = asyncio.get_running_loop()
+    for key in [k for k in _batchers if k[0] is loop]:
+        await _batchers.pop(key).close()
+
+
+def rpc_batch_stats() -> dict:
+    """배칭 통계 (호출 수 / HTTP 요청 수 / 배치로 합쳐진 호출 수)"""
+    return dict(_stats)
+
+
+class BatchingProvider(AsyncJSONBaseProvider):
+    """RpcBatcher로 요청을 보내는 AsyncWeb3 프로바이더"""
+
+    def __init__(self, endpoint_uri: str):
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        # HexBytes 등 web3 타입을 JSON 기본 타입으로
+        params = json.loads(Web3.to_json(list(params or [])))
+        return await get_rpc_batcher(self.endpoint_uri).request(method, params)
+
+    def __str__(self) -> str:
+        return f"Batching RPC connection {self.endpoint_uri}"
@@ -0,0 +1,69 @@
+"""토큰 불변 사실 저장소 - 재시작/캐시 만료 후에도 다시 조회하지 않을 분석 데이터
+
+검증된 컨트랙트 정보(Etherscan 소스 조회), 바이트코드 해시처럼 한 번 정해지면
+바뀌지 않는 값은 (체인, 주소, 종류) 단위로 SQLite(token_facts)에 JSON으로 저장한다.
+분석기는 먼저 여기서 찾고, 없을 때만 외부 API/RPC를 호출한 뒤 결과를 저장한다.
+(ERC20 name/symbol/decimals는 TokenMetadataService가 token_metadata 테이블에 저장)
+
+체인은 웹훅 체인 코드(eth, bsc, sol ...)로 구분한다.
+"""
+import threading
+from typing import Optional
+from cachetools import LRUCache
+from loguru import logger
+
+from db.crud import TokenMetadataCRUD
+
+# 사실 종류
+CONTRACT = "contract"  # 검증된 컨트랙트 정보 (미검증은 나중에 검증될 수 있어 저장하지 않음)
+CODE = "code"  # 배포된 바이트코드 해시/크기
+
+
+class TokenFactsService:
+    """불변 사실 조회 (LRU -> SQLite)"""
+
+    _facts: LRUCache = LRUCache(maxsize=10000)
+    _lock = threading.Lock()
+    stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "saved": 0}
+
+    @staticmethod
+    def _normalize(chain: str, address: str) -> str:
+        """주소 정규화 (EVM은 소문자, Solana는 대소문자 구분)"""
+        return address if chain == "sol" else address.lower()
+
+    @classmethod
+    async def get(cls, chain: str, address: str, kind: str) -> Optional[dict]:
+        """저장된 사실 (없으면 None)"""
+        key = (chain, cls._normalize(chain, address), kind)
+        with cls._lock:
+            data = cls._facts.get(key)
+        if data is not None:
+            cls.stats["memory_hits"] += 1
+            return data
+
+        data = await TokenMetadataCRUD.get_fact(*key)
+        if data is None:
+            cls.stats["misses"] += 1
+            return None
+
+        cls.stats["db_hits"] += 1
+        with cls._lock:
+            cls._facts[key] = data
+        return data
+
+    @classmethod
+    async def save(cls, chain: str, address: str, kind: str, data: dict):
+        """사실 저장 (메모리 + SQLite, 실패해도 분석은 계속)"""
+        key = (chain, cls._normalize(chain, address), kind)
+        with cls._lock:
+            cls._facts[key] = data
+        try:
+            await TokenMetadataCRUD.save_fact(*key, data)
+            cls.stats["saved"] += 1
+        except Exception as e:
+            logger.warning(f"Token fact save failed ({kind} {key[0]}:{key[1][:10]}...): {e}")
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """조회 통계"""
+        return {**cls.stats, "memory_entries": len(cls._facts)}
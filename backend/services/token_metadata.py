@@ -0,0 +1,390 @@
+"""토큰 메타데이터 서비스 - decimals/심볼 조회
+
+웹훅(스왑 로그 디코딩)과 분석기가 함께 쓴다. 메타데이터는 사실상 불변이므로
+인메모리 LRU -> SQLite(token_metadata) -> 온체인 일괄 조회 순으로 찾고,
+온체인에서 가져온 값은 SQLite에 저장해 재시작 후에도 RPC 없이 쓴다.
+
+- EVM: Multicall3 1회로 토큰 여러 개의 name/symbol/decimals 조회
+  (분석기용 get_with_supply는 같은 호출에 totalSupply까지 포함)
+- Solana: getMultipleAccounts 1회로 민트 여러 개의 decimals 조회
+  (심볼은 민트 계정에 없으므로 웹훅 페이로드에서 채운 값만 사용)
+
+체인은 웹훅 체인 코드(eth, bsc, sol ...)로 구분한다.
+봇(메인 루프)과 웹훅 서버(별도 스레드)가 함께 쓰므로 LRU 접근은 락으로 보호한다.
+"""
+import base64
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from cachetools import LRUCache, TTLCache
+from loguru import logger
+from web3 import AsyncWeb3
+
+from config import settings
+from db.crud import TokenMetadataCRUD
+from services.rpc_batcher import get_rpc_batcher
+from services.multicall import (
+    aggregate3,
+    decode_address,
+    decode_string,
+    decode_uint,
+    ERC20_DECIMALS,
+    ERC20_NAME,
+    ERC20_SYMBOL,
+    ERC20_TOTAL_SUPPLY,
+    POOL_TOKEN0,
+    POOL_TOKEN1,
+)
+
+# 체인 코드 -> RPC URL 설정 이름
+RPC_URL_SETTINGS = {
+    "eth": "eth_rpc_url",
+    "bsc": "bsc_rpc_url",
+    "polygon": "polygon_rpc_url",
+    "arb": "arb_rpc_url",
+    "base": "base_rpc_url",
+    "op": "op_rpc_url",
+    "avax": "avax_rpc_url",
+    "sol": "solana_rpc_url",
+}
+
+
+@dataclass(frozen=True)
+class TokenMetadata:
+    """토큰 메타데이터"""
+    chain: str
+    address: str
+    symbol: str
+    name: str
+    decimals: int
+
+
+class TokenMetadataService:
+    """토큰 메타데이터 조회 (LRU -> SQLite -> 온체인)"""
+
+    # 온체인 조회 1회당 토큰 수 (EVM은 토큰당 호출 3~4개)
+    EVM_BATCH_SIZE = 100
+    SOLANA_BATCH_SIZE = 100  # getMultipleAccounts 최대
+
+    # SPL 민트 계정의 decimals 위치 (mint_authority 36 + supply 8)
+    SPL_DECIMALS_OFFSET = 44
+
+    _tokens: LRUCache = LRUCache(maxsize=10000)
+    _pools: LRUCache = LRUCache(maxsize=5000)
+    # 온체인 응답으로 토큰(풀)이 아님이 확인된 주소 - 잠시 재조회 안 함
+    # (RPC 오류는 일시적일 수 있으므로 넣지 않음)
+    _failed: TTLCache = TTLCache(maxsize=5000, ttl=600)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(chain: str, address: str) -> str:
+        """주소 정규화 (EVM은 소문자, Solana는 대소문자 구분)"""
+        return address if chain == "sol" else address.lower()
+
+    @classmethod
+    def peek(cls, chain: str, address: str) -> Optional[TokenMetadata]:
+        """메모리 캐시만 조회 (I/O 없음)"""
+        with cls._lock:
+            return cls._tokens.get((chain, cls._normalize(chain, address)))
+
+    @classmethod
+    def remember(cls, chain: str, address: str, symbol: str, name: str, decimals: int):
+        """페이로드에 포함된 메타데이터를 메모리 캐시에 기록
+
+        이미 있으면 무시한다 (심볼을 모르는 Solana 민트는 심볼만 채움).
+        """
+        if not address:
+            return
+        key = (chain, cls._normalize(chain, address))
+        with cls._lock:
+            existing = cls._tokens.get(key)
+            if existing is None or existing.symbol == "???":
+                cls._tokens[key] = TokenMetadata(
+                    chain=chain, address=key[1], symbol=symbol, name=name, decimals=decimals
+                )
+
+    @classmethod
+    async def get(cls, chain: str, address: str) -> Optional[TokenMetadata]:
+        """토큰 1개 메타데이터"""
+        result = await cls.get_many(chain, [address])
+        return result.get(cls._normalize(chain, address))
+
+    @classmethod
+    async def get_many(cls, chain: str, addresses: list[str]) -> dict[str, TokenMetadata]:
+        """토큰 여러 개 메타데이터
+
+        Returns:
+            정규화된 주소 -> TokenMetadata (조회 실패한 주소는 제외)
+        """
+        result: dict[str, TokenMetadata] = {}
+        missing: list[str] = []
+
+        with cls._lock:
+            for address in dict.fromkeys(cls._normalize(chain, a) for a in addresses if a):
+                cached = cls._tokens.get((chain, address))
+                if cached is not None:
+                    result[address] = cached
+                elif (chain, address) not in cls._failed:
+                    missing.append(address)
+
+        if not missing:
+            return result
+
+        # SQLite
+        for row in await TokenMetadataCRUD.get_tokens(chain, missing):
+            meta = TokenMetadata(**row)
+            result[meta.address] = meta
+            cls._store(meta)
+        missing = [a for a in missing if a not in result]
+
+        if not missing:
+            return result
+
+        # 온체인 일괄 조회
+        try:
+            if chain == "sol":
+                answered = await cls._fetch_solana(missing)
+            else:
+                answered = await cls._fetch_evm(chain, missing)
+        except Exception as e:
+            # 실패 캐시에 넣지 않음 - 다음 요청에서 다시 조회
+            logger.warning(f"Token metadata fetch failed on {chain} ({len(missing)} tokens): {e}")
+            return result
+
+        fetched = {address: meta for address, meta in answered.items() if meta is not None}
+        result.update(fetched)
+
+        with cls._lock:
+            for address, meta in answered.items():
+                if meta is None:
+                    cls._failed[(chain, address)] = True
+
+        await cls._persist(list(fetched.values()))
+
+        logger.info(f"Token metadata on {chain}: fetched {len(fetched)}/{len(missing)}")
+        return result
+
+    @classmethod
+    async def get_with_supply(
+        cls,
+        chain: str,
+        addresses: list[str],
+        web3: Optional[AsyncWeb3] = None
+    ) -> dict[str, tuple[Optional[TokenMetadata], Optional[int]]]:
+        """EVM 토큰 메타데이터 + totalSupply (Multicall3 1회)
+
+        totalSupply는 바뀌므로 매번 조회하고, 메타데이터가 캐시(LRU/SQLite)에 없는 토큰만
+        decimals/symbol/name을 같은 aggregate3 호출에 넣는다. revert된 함수는 None으로 둔다.
+        web3를 넘기면 (분석기의 AsyncWeb3) 그 프로바이더로 호출한다.
+
+        Returns:
+            정규화된 주소 -> (메타데이터 또는 None, totalSupply raw 또는 None)
+        """
+        normalized = list(dict.fromkeys(cls._normalize(chain, a) for a in addresses if a))
+        if not normalized:
+            return {}
+
+        known: dict[str, TokenMetadata] = {}
+        with cls._lock:
+            for address in normalized:
+                cached = cls._tokens.get((chain, address))
+                if cached is not None:
+                    known[address] = cached
+
+        unknown = [a for a in normalized if a not in known]
+        if unknown:
+            for row in await TokenMetadataCRUD.get_tokens(chain, unknown):
+                meta = TokenMetadata(**row)
+                known[meta.address] = meta
+                cls._store(meta)
+
+        output: dict[str, tuple[Optional[TokenMetadata], Optional[int]]] = {}
+        fetched: list[TokenMetadata] = []
+        for start in range(0, len(normalized), cls.EVM_BATCH_SIZE):
+            chunk = normalized[start:start + cls.EVM_BATCH_SIZE]
+            calls: list[tuple[str, bytes]] = []
+            for address in chunk:
+                calls.append((address, ERC20_TOTAL_SUPPLY))
+                if address not in known:
+                    calls += [(address, ERC20_DECIMALS), (address, ERC20_SYMBOL), (address, ERC20_NAME)]
+
+            # 호출 순서대로 결과를 소비 (캐시에 없는 토큰만 메타데이터 3개가 뒤따름)
+            results = iter(await aggregate3(cls._rpc_url(chain), calls, web3=web3))
+            for address in chunk:
+                total_supply = decode_uint(next(results))
+                meta = known.get(address)
+                if meta is None:
+                    meta = cls._decode_metadata(chain, address, next(results), next(results), next(results))
+                    if meta is not None:
+                        fetched.append(meta)
+                output[address] = (meta, total_supply)
+
+        await cls._persist(fetched)
+        return output
+
+    @classmethod
+    async def get_pool_tokens(cls, chain: str, pools: list[str]) -> dict[str, tuple[str, str]]:
+        """DEX 풀의 (token0, token1) (EVM 전용)
+
+        Returns:
+            풀 주소(소문자) -> (token0, token1) (조회 실패한 풀은 제외)
+        """
+        result: dict[str, tuple[str, str]] = {}
+        missing: list[str] = []
+
+        with cls._lock:
+            for pool in dict.fromkeys(p.lower() for p in pools if p):
+                cached = cls._pools.get((chain, pool))
+                if cached is not None:
+                    result[pool] = cached
+                elif (chain, pool) not in cls._failed:
+                    missing.append(pool)
+
+        if not missing:
+            return result
+
+        for row in await TokenMetadataCRUD.get_pools(chain, missing):
+            result[row["pool"]] = (row["token0"], row["token1"])
+        missing = [p for p in missing if p not in result]
+
+        answered: dict[str, Optional[tuple[str, str]]] = {}
+        if missing:
+            try:
+                answered = await cls._fetch_pool_tokens(chain, missing)
+            except Exception as e:
+                # 실패 캐시에 넣지 않음 - 다음 요청에서 다시 조회
+                logger.warning(f"Pool token fetch failed on {chain} ({len(missing)} pools): {e}")
+            fetched = {pool: tokens for pool, tokens in answered.items() if tokens is not None}
+            await TokenMetadataCRUD.save_pools(chain, fetched)
+            result.update(fetched)
+
+        with cls._lock:
+            for pool, tokens in result.items():
+                cls._pools[(chain, pool)] = tokens
+            for pool, tokens in answered.items():
+                if tokens is None:
+                    cls._failed[(chain, pool)] = True
+
+        return result
+
+    @classmethod
+    def _store(cls, meta: TokenMetadata):
+        """메모리 캐시 저장"""
+        with cls._lock:
+            cls._tokens[(meta.chain, meta.address)] = meta
+
+    @classmethod
+    async def _persist(cls, fetched: list[TokenMetadata]):
+        """온체인에서 가져온 메타데이터를 메모리 캐시 + SQLite에 저장"""
+        for meta in fetched:
+            cls._store(meta)
+        await TokenMetadataCRUD.save_tokens([
+            {
+                "chain": m.chain,
+                "address": m.address,
+                "symbol": m.symbol,
+                "name": m.name,
+                "decimals": m.decimals,
+            }
+            for m in fetched
+        ])
+
+    @staticmethod
+    def _decode_metadata(
+        chain: str,
+        address: str,
+        decimals_data: Optional[bytes],
+        symbol_data: Optional[bytes],
+        name_data: Optional[bytes]
+    ) -> Optional[TokenMetadata]:
+        """decimals/symbol/name 반환값 -> 메타데이터 (decimals가 없으면 ERC20이 아닌 것으로 봄)"""
+        decimals = decode_uint(decimals_data)
+        if decimals is None or decimals > 255:
+            return None
+        return TokenMetadata(
+            chain=chain,
+            address=address,
+            symbol=decode_string(symbol_data) or "???",
+            name=decode_string(name_data) or "Unknown",
+            decimals=decimals,
+        )
+
+    @staticmethod
+    def _rpc_url(chain: str) -> str:
+        """체인 코드의 RPC URL"""
+        setting = RPC_URL_SETTINGS.get(chain)
+        if not setting:
+            raise ValueError(f"No RPC configured for chain: {chain}")
+        return getattr(settings, setting)
+
+    @classmethod
+    async def _fetch_evm(cls, chain: str, addresses: list[str]) -> dict[str, Optional[TokenMetadata]]:
+        """Multicall3로 name/symbol/decimals 일괄 조회
+
+        Returns:
+            응답받은 주소 -> 메타데이터 (decimals가 revert/디코딩 불가면 None)
+        """
+        rpc_url = cls._rpc_url(chain)
+        fetched: dict[str, Optional[TokenMetadata]] = {}
+
+        for start in range(0, len(addresses), cls.EVM_BATCH_SIZE):
+            chunk = addresses[start:start + cls.EVM_BATCH_SIZE]
+            calls = [
+                (address, data)
+                for address in chunk
+                for data in (ERC20_DECIMALS, ERC20_SYMBOL, ERC20_NAME)
+            ]
+            results = await aggregate3(rpc_url, calls)
+
+            for i, address in enumerate(chunk):
+                fetched[address] = cls._decode_metadata(
+                    chain, address, results[i * 3], results[i * 3 + 1], results[i * 3 + 2]
+                )
+
+        return fetched
+
+    @classmethod
+    async def _fetch_solana(cls, mints: list[str]) -> dict[str, Optional[TokenMetadata]]:
+        """getMultipleAccounts로 민트 decimals 일괄 조회
+
+        Returns:
+            응답받은 민트 -> 메타데이터 (계정이 없거나 민트 계정이 아니면 None)
+        """
+        batcher = get_rpc_batcher(cls._rpc_url("sol"))
+        fetched: dict[str, Optional[TokenMetadata]] = {}
+
+        for start in range(0, len(mints), cls.SOLANA_BATCH_SIZE):
+            chunk = mints[start:start + cls.SOLANA_BATCH_SIZE]
+            result = await batcher.call("getMultipleAccounts", [chunk, {"encoding": "base64"}])
+
+            for mint, account in zip(chunk, (result or {}).get("value", [])):
+                data = base64.b64decode(account["data"][0]) if account else b""
+                if len(data) <= cls.SPL_DECIMALS_OFFSET:
+                    fetched[mint] = None
+                    continue
+                fetched[mint] = TokenMetadata(
+                    chain="sol",
+                    address=mint,
+                    symbol="???",
+                    name="Unknown",
+                    decimals=data[cls.SPL_DECIMALS_OFFSET],
+                )
+
+        return fetched
+
+    @classmethod
+    async def _fetch_pool_tokens(cls, chain: str, pools: list[str]) -> dict[str, Optional[tuple[str, str]]]:
+        """Multicall3로 풀 token0/token1 일괄 조회
+
+        Returns:
+            풀 주소 -> (token0, token1) (token0/token1이 revert되면 None)
+        """
+        calls = [(pool, data) for pool in pools for data in (POOL_TOKEN0, POOL_TOKEN1)]
+        results = await aggregate3(cls._rpc_url(chain), calls)
+
+        fetched: dict[str, Optional[tuple[str, str]]] = {}
+        for i, pool in enumerate(pools):
+            token0 = decode_address(results[i * 2])
+            token1 = decode_address(results[i * 2 + 1])
+            fetched[pool] = (token0, token1) if token0 and token1 else None
+        return fetched
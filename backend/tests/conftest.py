@@ -0,0 +1,50 @@
+"""테스트 공통 설정
+
+pytest-asyncio 없이 각 테스트가 asyncio.run으로 코루틴을 실행한다.
+DB가 필요한 테스트는 run_with_db로 임시 SQLite 파일에서 init_db -> 테스트 -> close_db 순서로 실행한다.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyzers.cache import AnalysisCache  # noqa: E402
+from analyzers.speculative import SpeculativeAnalysis  # noqa: E402
+from config import settings  # noqa: E402
+from db.models import close_db, init_db  # noqa: E402
+
+
+@pytest.fixture
+def run_with_db(tmp_path, monkeypatch):
+    """임시 DB에서 코루틴 함수 실행"""
+    monkeypatch.setattr(settings, "database_path", str(tmp_path / "test.db"))
+
+    def run(test):
+        async def main():
+            await init_db()
+            try:
+                return await test()
+            finally:
+                await close_db()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def analysis_state(monkeypatch):
+    """분석 캐시/추측 분석 클래스 상태 초기화 + 기능 켜기"""
+    monkeypatch.setattr(AnalysisCache, "_cache", None)
+    monkeypatch.setattr(AnalysisCache, "_inflight", {})
+    monkeypatch.setattr(AnalysisCache, "_waiters", {})
+    monkeypatch.setattr(AnalysisCache, "stats", {})
+    monkeypatch.setattr(SpeculativeAnalysis, "_tasks", {})
+    monkeypatch.setattr(SpeculativeAnalysis, "_results", None)
+    monkeypatch.setattr(settings, "analysis_cache_enabled", True)
+    monkeypatch.setattr(settings, "analyze_speculative", True)
+    monkeypatch.setattr(settings, "analyze_speculative_chains", 2)
+    monkeypatch.setattr(settings, "analyze_speculative_budget", 8)
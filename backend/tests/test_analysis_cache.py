@@ -0,0 +1,94 @@
+"""섹션 캐시 요청 합치기 + 마지막 대기 요청 취소 + 섹션별 TTL"""
+import asyncio
+from functools import partial
+
+from analyzers.cache import AnalysisCache
+from config import settings
+
+
+class CountingFetch:
+    """delay초 걸리는 섹션 조회 (시작/취소 횟수 기록)"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> dict:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"price_usd": 1.5}
+
+
+def test_concurrent_fetches_share_one_call(analysis_state):
+    """같은 섹션 동시 요청은 조회 1회를 공유하고, 이후 요청은 캐시 히트 (EVM 주소는 대소문자 무시)"""
+    fetch = CountingFetch(delay=0.05)
+
+    async def test():
+        results = await asyncio.gather(*(
+            AnalysisCache.fetch("ethereum", "0xAbC", "market", fetch) for _ in range(5)
+        ))
+        cached = await AnalysisCache.fetch("ethereum", "0xabc", "market", fetch)
+        return results, cached
+
+    results, cached = asyncio.run(test())
+    assert fetch.started == 1
+    assert all(result == {"price_usd": 1.5} for result in results)
+    assert cached == {"price_usd": 1.5}
+    assert AnalysisCache.stats["market"] == {"hits": 1, "misses": 1, "coalesced": 4}
+
+
+def test_fetch_cancelled_only_when_last_waiter_leaves(analysis_state):
+    """요청 1건 취소로는 공유 조회가 계속되고, 마지막 요청이 취소되면 조회도 취소"""
+    fetch = CountingFetch(delay=10)
+
+    async def test():
+        request = partial(AnalysisCache.fetch, "ethereum", "0xabc", "market", fetch)
+        first, second = asyncio.create_task(request()), asyncio.create_task(request())
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert fetch.cancelled == 0
+        assert AnalysisCache.get_stats()["inflight"] == 1
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert fetch.cancelled == 1
+        assert AnalysisCache.get_stats()["inflight"] == 0
+
+    asyncio.run(test())
+
+
+def test_failed_fetch_is_not_cached(analysis_state):
+    """조회 실패는 캐시하지 않아 다음 요청이 다시 조회한다"""
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return {"price_usd": 2.0}
+
+    async def test():
+        try:
+            await AnalysisCache.fetch("ethereum", "0xabc", "market", flaky)
+        except RuntimeError:
+            pass
+        return await AnalysisCache.fetch("ethereum", "0xabc", "market", flaky)
+
+    assert asyncio.run(test()) == {"price_usd": 2.0}
+    assert len(calls) == 2
+
+
+def test_section_ttls():
+    """총 공급량이 든 basic은 정적 TTL을 쓰지 않고, 검증된 컨트랙트만 정적 TTL"""
+    ttl = AnalysisCache._ttl
+    assert ttl(("ethereum", "0xabc", "basic"), {"total_supply": 1}) == settings.analysis_cache_security_ttl
+    assert ttl(("ethereum", "0xabc", "contract"), {"is_verified": False}) == settings.analysis_cache_security_ttl
+    assert ttl(("ethereum", "0xabc", "contract"), {"is_verified": True}) == settings.analysis_cache_static_ttl
+    assert ttl(("ethereum", "0xabc", "market"), {}) == settings.analysis_cache_market_ttl
@@ -0,0 +1,57 @@
+"""텔레그램 전송 큐 속도 제한"""
+import asyncio
+
+from webhook import delivery
+from webhook.delivery import TelegramDelivery
+
+
+class FakeBot:
+    """전송 시각만 기록하는 봇"""
+
+    def __init__(self):
+        self.sent: list[tuple[int, float]] = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, asyncio.get_running_loop().time()))
+
+
+def _times(bot: FakeBot, chat_id: int) -> list[float]:
+    return [at for chat, at in bot.sent if chat == chat_id]
+
+
+def test_chat_rate_survives_drained_queue(monkeypatch):
+    """큐가 빈 뒤 곧 다시 온 메시지도 채팅당 속도 제한을 지킨다"""
+    bot = FakeBot()
+    monkeypatch.setattr(delivery, "get_bot", lambda: bot)
+
+    async def test():
+        sender = TelegramDelivery(global_rate=1000, chat_rate=10, max_pending=100, max_attempts=3)
+        for _ in range(3):
+            future = await sender.submit(1, "hi")
+            assert (await future).ok
+            # 다음 메시지 전에 큐가 비도록
+            await asyncio.sleep(0.01)
+        await sender.stop()
+
+    asyncio.run(test())
+    times = _times(bot, 1)
+    assert len(times) == 3
+    assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+
+
+def test_chats_are_limited_independently(monkeypatch):
+    """다른 채팅의 메시지는 서로의 채팅 제한을 기다리지 않는다"""
+    bot = FakeBot()
+    monkeypatch.setattr(delivery, "get_bot", lambda: bot)
+
+    async def test():
+        sender = TelegramDelivery(global_rate=1000, chat_rate=2, max_pending=100, max_attempts=3)
+        futures = [await sender.submit(chat_id, "hi") for chat_id in (1, 2, 3)]
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(*futures)
+        await sender.stop()
+        return start
+
+    start = asyncio.run(test())
+    assert len(bot.sent) == 3
+    assert all(at - start < 0.2 for _, at in bot.sent)
@@ -0,0 +1,83 @@
+"""요약 알림 버퍼 - 건수 기준 전송, 재시작 복구, auto 모드"""
+import asyncio
+
+import pytest
+from cachetools import TTLCache
+
+from config import settings
+from db.crud import DigestCRUD, OutboxCRUD
+from webhook.digest import DigestBuffer
+from webhook.processor import Notification, TransferInfo
+
+
+def _notification(n: int, digest_mode: str = "on") -> Notification:
+    info = TransferInfo(
+        from_addr="0x1", to_addr="0x2", chain="eth", tx_type="Token Transfer",
+        amount=f"{n} USDC", tx_hash=f"0x{n:04x}", amount_usd=float(n), quantity=float(n), symbol="USDC",
+    )
+    return Notification(
+        user_id=1, wallet_id=7, label="bot", direction="IN", counterparty="0x1", info=info,
+        digest_mode=digest_mode,
+    )
+
+
+@pytest.fixture
+def digest_state(monkeypatch):
+    """버퍼 클래스 상태 초기화"""
+    monkeypatch.setattr(DigestBuffer, "_buffers", {})
+    monkeypatch.setattr(DigestBuffer, "_recent", TTLCache(maxsize=100, ttl=DigestBuffer.RATE_WINDOW))
+    monkeypatch.setattr(DigestBuffer, "_flushes", set())
+    monkeypatch.setattr(DigestBuffer, "stats", dict.fromkeys(DigestBuffer.stats, 0))
+    monkeypatch.setattr(settings, "digest_window", 3600)
+    monkeypatch.setattr(settings, "digest_max_events", 3)
+
+
+def test_digest_flushes_when_full(run_with_db, digest_state):
+    """K건이 차면 요약 1건을 아웃박스에 저장하고 저장해 둔 이벤트를 지운다"""
+
+    async def test():
+        for n in range(1, 4):
+            assert await DigestBuffer.route(_notification(n)) == []
+        await asyncio.gather(*DigestBuffer._flushes)
+
+        assert (await OutboxCRUD.count_by_status()).get("pending") == 1
+        assert await DigestCRUD.get_events() == []
+        assert DigestBuffer.get_stats()["active_wallets"] == 0
+
+    run_with_db(test)
+
+
+def test_buffered_events_survive_restart(run_with_db, digest_state):
+    """버퍼에만 있던 이벤트는 재시작 후 복구되어 종료 시 요약으로 나간다"""
+
+    async def test():
+        await DigestBuffer.route(_notification(1))
+        await DigestBuffer.route(_notification(2))
+
+        # 프로세스 종료 (메모리 버퍼 유실)
+        for digest in DigestBuffer._buffers.values():
+            digest.timer.cancel()
+        DigestBuffer._buffers.clear()
+
+        await DigestBuffer.start()
+        assert DigestBuffer.get_stats()["pending_events"] == 2
+        await DigestBuffer.stop()
+
+        assert (await OutboxCRUD.count_by_status()).get("pending") == 1
+        assert await DigestCRUD.get_events() == []
+
+    run_with_db(test)
+
+
+def test_auto_mode_starts_digest_above_threshold(run_with_db, digest_state, monkeypatch):
+    """auto 모드는 최근 빈도가 임계값에 닿은 뒤부터 요약으로 돌린다"""
+    monkeypatch.setattr(settings, "digest_auto_threshold", 3)
+    monkeypatch.setattr(settings, "digest_max_events", 100)
+
+    async def test():
+        routed = [await DigestBuffer.route(_notification(n, "auto")) for n in range(1, 5)]
+        await DigestBuffer.stop()
+        return routed
+
+    routed = run_with_db(test)
+    assert [len(r) for r in routed] == [1, 1, 0, 0]
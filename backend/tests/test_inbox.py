@@ -0,0 +1,99 @@
+"""웹훅 인박스 재처리 + 파이프라인 완료 추적"""
+import asyncio
+
+from db.crud import InboxCRUD
+from webhook import inbox
+from webhook.inbox import WebhookInbox
+from webhook.pipeline import PipelineJob
+
+
+def test_inbox_replays_unprocessed_entries(run_with_db, monkeypatch):
+    """워커 없이 저장된 항목은 start() 때 재처리되고 처리 완료로 표시된다"""
+    handled = []
+
+    async def handler(data):
+        handled.append(data)
+
+    monkeypatch.setitem(inbox.HANDLERS, "moralis", handler)
+
+    async def test():
+        await WebhookInbox.enqueue("moralis", '{"n": 1}')
+        assert await InboxCRUD.count_pending() == 1
+
+        await WebhookInbox.start(num_workers=2)
+        try:
+            await asyncio.wait_for(WebhookInbox._queue.join(), timeout=5)
+        finally:
+            await WebhookInbox.stop()
+
+        assert handled == [{"n": 1}]
+        assert await InboxCRUD.count_pending() == 0
+
+    run_with_db(test)
+
+
+def test_inbox_gives_up_after_max_attempts(run_with_db, monkeypatch):
+    """계속 실패하는 항목은 MAX_ATTEMPTS번 시도 후 재처리 대상에서 빠진다"""
+    attempts = []
+
+    async def handler(data):
+        attempts.append(data)
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(inbox.HANDLERS, "moralis", handler)
+    monkeypatch.setattr(WebhookInbox, "RETRY_DELAY", 0.01)
+
+    async def test():
+        await WebhookInbox.start(num_workers=1)
+        try:
+            await WebhookInbox.enqueue("moralis", "{}")
+            for _ in range(200):
+                if len(attempts) >= WebhookInbox.MAX_ATTEMPTS:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.wait_for(WebhookInbox._queue.join(), timeout=5)
+        finally:
+            await WebhookInbox.stop()
+
+        assert len(attempts) == WebhookInbox.MAX_ATTEMPTS
+        assert await InboxCRUD.count_pending() == 0
+
+    run_with_db(test)
+
+
+def test_worker_does_not_wait_for_pipeline_completion(run_with_db, monkeypatch):
+    """워커는 파이프라인 투입 후 바로 다음 항목을 처리하고, 작업이 끝나면 항목별로 완료/재시도 표시"""
+    jobs = []
+
+    async def handler(data):
+        job = PipelineJob()
+        jobs.append(job)
+        return job
+
+    monkeypatch.setitem(inbox.HANDLERS, "moralis", handler)
+    monkeypatch.setattr(WebhookInbox, "RETRY_DELAY", 0.01)
+
+    async def test():
+        await WebhookInbox.start(num_workers=1)
+        try:
+            await WebhookInbox.enqueue("moralis", "{}")
+            await WebhookInbox.enqueue("moralis", "{}")
+            await asyncio.wait_for(WebhookInbox._queue.join(), timeout=5)
+            # 워커 1개로 두 항목 모두 투입됨 (완료 대기 없음)
+            assert len(jobs) == 2
+            assert WebhookInbox.in_flight() == 2
+            assert await InboxCRUD.count_pending() == 2
+
+            jobs[0].finish()
+            jobs[1].finish("deliver: boom")
+            for _ in range(200):
+                if len(jobs) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            # 실패한 항목만 다시 투입
+            assert len(jobs) == 3
+            assert await InboxCRUD.count_pending() == 1
+        finally:
+            await WebhookInbox.stop()
+
+    run_with_db(test)
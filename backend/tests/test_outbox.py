@@ -0,0 +1,135 @@
+"""알림 아웃박스 중복 방지"""
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from db.crud import InboxCRUD, LegConflictError, OutboxCRUD
+from db.models import get_db
+from webhook.outbox import NotificationOutbox
+from webhook.processor import Notification, NotificationGroup, TransactionProcessor, TransferInfo
+
+
+def test_outbox_ignores_replayed_notification(run_with_db):
+    """같은 (user_id, tx_hash, direction, leg) 알림은 한 번만 저장된다"""
+
+    async def test():
+        first = await NotificationOutbox.add(1, "0xabc", [("IN", "native")], "w", "text")
+        again = await NotificationOutbox.add(1, "0xabc", [("IN", "native")], "w", "text")
+        other_user = await NotificationOutbox.add(2, "0xabc", [("IN", "native")], "w", "text")
+
+        assert first is not None
+        assert again is None
+        assert other_user is not None
+        assert (await OutboxCRUD.count_by_status()).get("pending") == 2
+
+    run_with_db(test)
+
+
+async def _count_legs() -> int:
+    db = await get_db()
+    cursor = await db.execute("SELECT COUNT(*) FROM notification_legs")
+    return (await cursor.fetchone())[0]
+
+
+def test_failed_batch_leaves_no_leg_claims(run_with_db, monkeypatch):
+    """배치 커밋이 실패하면 이미 실행한 레그 선점도 롤백되어, 재처리 때 중복으로 오인하지 않는다"""
+    commit = aiosqlite.Connection.commit
+    calls = {"n": 0}
+
+    async def failing_commit(self):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise sqlite3.OperationalError("disk I/O error")
+        await commit(self)
+
+    async def test():
+        rows = [(1, "0xabc", [("IN", "erc20:1")], "w", "a"), (1, "0xdef", [("OUT", "erc20:2")], "w", "b")]
+        monkeypatch.setattr(aiosqlite.Connection, "commit", failing_commit)
+        with pytest.raises(sqlite3.OperationalError):
+            await OutboxCRUD.add_entries(rows, 0)
+
+        # 다른 CRUD의 커밋이 이어져도 선점이 남지 않는다
+        await InboxCRUD.add_entry("moralis", "{}")
+        assert await _count_legs() == 0
+
+        # 재처리하면 정상 저장
+        assert await NotificationOutbox.add(1, "0xabc", [("IN", "erc20:1")], "w", "a") is not None
+
+    run_with_db(test)
+
+
+def test_failing_row_does_not_poison_batch(run_with_db):
+    """그룹 커밋 중 한 행이 실패하면 그 행만 되돌리고 같은 배치의 다른 행은 저장된다"""
+
+    async def test():
+        results = await asyncio.gather(
+            NotificationOutbox.add(1, "0xabc", [("IN", "erc20:1")], "w", "ok"),
+            # 레그 선점 뒤 항목 저장에서 실패 (바인딩할 수 없는 라벨)
+            NotificationOutbox.add(1, "0xdef", [("OUT", "erc20:2")], object(), "bad"),
+            NotificationOutbox.add(2, "0xabc", [("IN", "erc20:1")], "w", "ok"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], int) and isinstance(results[2], int)
+        assert isinstance(results[1], Exception)
+        # 실패한 행의 선점은 남지 않음
+        assert await _count_legs() == 2
+        assert await NotificationOutbox.add(1, "0xdef", [("OUT", "erc20:2")], "w", "retry") is not None
+
+    run_with_db(test)
+
+
+def test_outbox_dedupes_by_leg_when_regrouped(run_with_db):
+    """묶음 구성이 달라진 재처리도 이미 저장된 레그만이면 중복, 일부만 저장돼 있으면 충돌"""
+
+    async def test():
+        legs = [("OUT", "erc20:1"), ("IN", "erc20:2")]
+        assert await NotificationOutbox.add(1, "0xabc", legs, "w", "group") is not None
+
+        # 재처리에서 두 레그가 따로 들어온 경우
+        assert await NotificationOutbox.add(1, "0xabc", [legs[0]], "w", "single") is None
+        assert await NotificationOutbox.add(1, "0xabc", [legs[1]], "w", "single") is None
+
+        # 이미 보낸 레그가 섞인 묶음은 저장하지 않고, 새 레그 선점도 남기지 않는다
+        with pytest.raises(LegConflictError) as e:
+            await NotificationOutbox.add(1, "0xabc", [legs[0], ("IN", "erc20:3")], "w", "x")
+        assert e.value.existing == [legs[0]]
+        assert await _count_legs() == 2
+
+    run_with_db(test)
+
+
+def _notification(direction: str, leg: str, amount: str) -> Notification:
+    info = TransferInfo(
+        from_addr="0x1", to_addr="0x2", chain="ethereum", tx_type="Token Transfer",
+        amount=amount, tx_hash="0xabc", leg=leg,
+    )
+    return Notification(
+        user_id=1, wallet_id=1, label="w", direction=direction, counterparty="0x2", info=info,
+    )
+
+
+def test_deliver_rerenders_without_delivered_legs(run_with_db):
+    """일부 레그가 이미 전송된 묶음은 남은 레그만 다시 렌더링해 저장한다"""
+
+    async def test():
+        sent = NotificationGroup([_notification("OUT", "erc20:1", "1 AAA")])
+        await TransactionProcessor.render(sent)
+        await TransactionProcessor.deliver(sent)
+
+        regrouped = NotificationGroup([
+            _notification("OUT", "erc20:1", "1 AAA"),
+            _notification("IN", "erc20:2", "2 BBB"),
+        ])
+        await TransactionProcessor.render(regrouped)
+        await TransactionProcessor.deliver(regrouped)
+
+        db = await get_db()
+        cursor = await db.execute("SELECT text FROM notification_outbox ORDER BY id")
+        texts = [row[0] for row in await cursor.fetchall()]
+        assert len(texts) == 2
+        assert "BBB" in texts[1] and "AAA" not in texts[1]
+        assert await _count_legs() == 2
+
+    run_with_db(test)
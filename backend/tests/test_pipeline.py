@@ -0,0 +1,100 @@
+"""파이프라인 작업 완료 추적 + 합치기 단계"""
+import asyncio
+
+import pytest
+
+from webhook.pipeline import CoalescingStage, EventPipeline, PipelineError, Stage
+
+
+def _run(coro_fn):
+    return asyncio.run(coro_fn())
+
+
+def test_job_completes_after_fan_out_and_drops():
+    """분기된 항목이 모두 마지막 단계를 지나거나 걸러져야 작업이 끝난다"""
+    delivered = []
+
+    async def split(n):
+        return list(range(n))
+
+    async def keep_even(i):
+        await asyncio.sleep(0.01 * i)
+        return [i] if i % 2 == 0 else []
+
+    async def deliver(i):
+        delivered.append(i)
+
+    async def test():
+        pipeline = EventPipeline([
+            Stage("split", split, 1, 10),
+            Stage("filter", keep_even, 4, 10),
+            Stage("deliver", deliver, 2, 10),
+        ])
+        pipeline.start()
+        try:
+            await asyncio.wait_for(pipeline.run(5), timeout=5)
+            # 항목이 없어도 작업은 끝난다
+            await asyncio.wait_for(pipeline.run(0), timeout=5)
+        finally:
+            await pipeline.stop()
+
+    _run(test)
+    assert sorted(delivered) == [0, 2, 4]
+
+
+def test_stage_error_fails_job():
+    """단계 에러는 작업 완료 후 PipelineError로 올라온다"""
+
+    async def split(n):
+        return list(range(n))
+
+    async def deliver(i):
+        if i == 1:
+            raise ValueError("bad item")
+
+    async def test():
+        pipeline = EventPipeline([Stage("split", split, 1, 10), Stage("deliver", deliver, 2, 10)])
+        pipeline.start()
+        try:
+            with pytest.raises(PipelineError, match="bad item"):
+                await asyncio.wait_for(pipeline.run(3), timeout=5)
+        finally:
+            await pipeline.stop()
+
+    _run(test)
+
+
+def test_coalescing_merges_items_from_separate_jobs():
+    """같은 키의 항목은 여러 작업에서 와도 하나로 합쳐지고, 모든 작업이 함께 끝난다"""
+    delivered = []
+
+    async def passthrough(item):
+        return [item]
+
+    async def deliver(group):
+        delivered.append(group)
+
+    async def test():
+        pipeline = EventPipeline([
+            Stage("decode", passthrough, 2, 10),
+            CoalescingStage("coalesce", key=lambda item: item[0], merge=list, window=0.05, queue_size=10),
+            Stage("deliver", deliver, 1, 10),
+        ])
+        pipeline.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    pipeline.run(("tx1", "out")),
+                    pipeline.run(("tx1", "in")),
+                    pipeline.run(("tx2", "out")),
+                ),
+                timeout=5,
+            )
+        finally:
+            await pipeline.stop()
+
+    _run(test)
+    assert sorted(sorted(group) for group in delivered) == [
+        [("tx1", "in"), ("tx1", "out")],
+        [("tx2", "out")],
+    ]
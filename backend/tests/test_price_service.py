@@ -0,0 +1,129 @@
+"""가격 서비스 - 페이로드 단위 일괄 조회, 요청 합치기 + negative 캐시, stale-while-revalidate"""
+import asyncio
+from collections import Counter
+
+import pytest
+from cachetools import TTLCache
+
+from config import settings
+from services import price_service
+from services.price_service import PriceService
+
+
+class FakeResolver:
+    """resolve 호출을 기록하고 delay초 뒤 고정 가격을 돌려주는 조회기"""
+
+    class Source:
+        @staticmethod
+        def supports(chain: str) -> bool:
+            return chain in ("eth", "sol")
+
+    def __init__(self, prices: dict, delay: float = 0.0):
+        self.sources = [self.Source()]
+        self.prices = prices
+        self.delay = delay
+        self.calls: list[tuple[str, list[str]]] = []
+
+    async def resolve(self, chain: str, addresses: list[str]) -> dict:
+        self.calls.append((chain, sorted(addresses)))
+        await asyncio.sleep(self.delay)
+        return {address: self.prices.get(address, 0.0) for address in addresses}
+
+
+@pytest.fixture
+def price_state(monkeypatch):
+    """모듈 캐시 초기화 + 조회기 교체"""
+    monkeypatch.setattr(price_service, "_price_cache", TTLCache(maxsize=100, ttl=3600))
+    monkeypatch.setattr(price_service, "_negative_cache", TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(price_service, "_inflight", {})
+    monkeypatch.setattr(price_service, "_refreshing", set())
+    monkeypatch.setattr(price_service, "_background_tasks", set())
+    monkeypatch.setattr(price_service, "_token_hits", Counter())
+    resolver = FakeResolver({"0xa": 1.0, "0xb": 2.0, "mint": 3.0})
+    monkeypatch.setattr(price_service, "get_price_resolver", lambda: resolver)
+    return resolver
+
+
+def test_prefetch_batches_tokens_per_chain(price_state):
+    """페이로드의 토큰은 체인별 조회 1회로 묶이고, 이후 조회는 캐시 히트"""
+
+    async def test():
+        await PriceService.prefetch([("eth", "0xA"), ("eth", "0xb"), ("eth", "0xa"), ("sol", "mint")])
+        return await PriceService.get_token_price("eth", "0xa"), await PriceService.get_token_price("sol", "mint")
+
+    assert asyncio.run(test()) == (1.0, 3.0)
+    assert sorted(price_state.calls) == [("eth", ["0xa", "0xb"]), ("sol", ["mint"])]
+
+
+def test_concurrent_misses_share_one_fetch(price_state):
+    """같은 토큰의 동시 캐시 미스는 진행 중인 조회 1건을 함께 기다린다"""
+    price_state.delay = 0.05
+
+    async def test():
+        return await asyncio.gather(*(PriceService.get_token_price("eth", "0xa") for _ in range(5)))
+
+    assert asyncio.run(test()) == [1.0] * 5
+    assert price_state.calls == [("eth", ["0xa"])]
+
+
+def test_unlisted_token_is_negative_cached(price_state):
+    """가격이 없는 토큰은 negative 캐시에 남아 바로 재조회하지 않는다"""
+
+    async def test():
+        first = await PriceService.get_token_price("eth", "0xdead")
+        second = await PriceService.get_token_price("eth", "0xdead")
+        return first, second
+
+    assert asyncio.run(test()) == (0.0, 0.0)
+    assert price_state.calls == [("eth", ["0xdead"])]
+
+
+def test_cancelled_fetch_is_not_negative_cached(price_state):
+    """조회가 취소되면 기다리던 요청만 풀어주고 negative 캐시에는 넣지 않는다"""
+    price_state.delay = 10
+
+    async def test():
+        owner = asyncio.create_task(PriceService.get_token_price("eth", "0xa"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(PriceService.get_token_price("eth", "0xa"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        shared = await asyncio.wait_for(waiter, timeout=1)
+
+        price_state.delay = 0
+        return shared, await PriceService.get_token_price("eth", "0xa")
+
+    assert asyncio.run(test()) == (0.0, 1.0)
+    assert len(price_state.calls) == 2
+
+
+def test_stale_price_is_served_and_revalidated(price_state, monkeypatch):
+    """soft TTL이 지난 가격은 기다리지 않고 반환하고, 백그라운드에서 갱신한다"""
+    monkeypatch.setattr(settings, "price_soft_ttl", 0)
+    price_service._price_cache["token:eth:0xa"] = (0.5, 0.0)
+    price_state.delay = 0.05
+
+    async def test():
+        stale = await PriceService.get_token_price("eth", "0xa")
+        assert len(price_service._background_tasks) == 1
+        await asyncio.gather(*price_service._background_tasks)
+        assert price_state.calls == [("eth", ["0xa"])]
+        return stale, price_service._price_cache["token:eth:0xa"][0]
+
+    assert asyncio.run(test()) == (0.5, 1.0)
+
+
+def test_refresher_renews_hot_tokens_and_decays_hits(price_state, monkeypatch):
+    """갱신 잡은 자주 조회된 토큰을 미리 갱신하고 조회 횟수를 절반으로 줄인다"""
+    monkeypatch.setattr(settings, "price_refresh_top_tokens", 1)
+
+    async def no_native():
+        return {}
+
+    monkeypatch.setattr(PriceService, "batch_get_native_prices", staticmethod(no_native))
+    price_service._token_hits.update({("eth", "0xa"): 4, ("eth", "0xb"): 1})
+
+    asyncio.run(PriceService.refresh_hot_prices())
+    assert price_state.calls == [("eth", ["0xa"])]
+    assert price_service._price_cache["token:eth:0xa"][0] == 1.0
+    assert price_service._token_hits == Counter({("eth", "0xa"): 2})
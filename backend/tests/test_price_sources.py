@@ -0,0 +1,113 @@
+"""단계별 가격 조회 - 헤지, 제한 시간, 소스 예산"""
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from services.price_sources import PriceSource, TieredPriceResolver
+
+
+class FakeSource(PriceSource):
+    """delay초 뒤 고정 가격을 돌려주는 소스"""
+
+    CHAINS = {"eth": "ethereum"}
+
+    def __init__(self, name: str, prices: dict, delay: float = 0.0, burst: int = 5):
+        self.name = name
+        self.BURST = burst
+        self.RATE_PER_SEC = 0.001
+        super().__init__()
+        self.prices = prices
+        self.delay = delay
+        self.calls = 0
+
+    async def _fetch(self, chain: str, addresses: list[str]) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {address: self.prices.get(address, 0.0) for address in addresses}
+
+
+@pytest.fixture(autouse=True)
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(settings, "price_hedge_delay", 0.05)
+    monkeypatch.setattr(settings, "price_resolve_timeout", 0.3)
+
+
+def test_source_requires_fetch():
+    """_fetch를 구현하지 않은 소스는 만들 수 없다"""
+
+    class Incomplete(PriceSource):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_slow_source_is_hedged():
+    """1순위 소스가 지연 예산을 넘기면 다음 소스를 동시에 시작해 먼저 온 결과를 쓴다"""
+    slow = FakeSource("slow", {"0xa": 1.0}, delay=10)
+    fast = FakeSource("fast", {"0xa": 2.0})
+    resolver = TieredPriceResolver([slow, fast])
+
+    async def test():
+        start = time.monotonic()
+        prices = await resolver.resolve("eth", ["0xa"])
+        elapsed = time.monotonic() - start
+        await resolver.close()
+        return prices, elapsed
+
+    prices, elapsed = asyncio.run(test())
+    assert prices == {"0xa": 2.0}
+    assert elapsed < 0.2
+    assert resolver.stats["hedged"] == 1
+
+
+def test_fallback_for_tokens_missing_in_first_source():
+    """앞 소스에 없는 토큰(0.0)만 다음 소스에서 찾는다"""
+    first = FakeSource("first", {"0xa": 1.0})
+    second = FakeSource("second", {"0xb": 3.0})
+    resolver = TieredPriceResolver([first, second])
+
+    prices = asyncio.run(resolver.resolve("eth", ["0xa", "0xb", "0xc"]))
+    assert prices == {"0xa": 1.0, "0xb": 3.0, "0xc": 0.0}
+    assert resolver.stats["hedged"] == 0
+
+
+def test_resolve_timeout_keeps_late_result_in_source_cache():
+    """제한 시간을 넘기면 0.0으로 돌려주고, 늦게 끝난 요청은 소스 캐시를 채운다"""
+    slow = FakeSource("slow", {"0xa": 1.0}, delay=0.4)
+    resolver = TieredPriceResolver([slow])
+
+    async def test():
+        start = time.monotonic()
+        prices = await resolver.resolve("eth", ["0xa"])
+        elapsed = time.monotonic() - start
+        await asyncio.sleep(0.2)
+        cached = await resolver.resolve("eth", ["0xa"])
+        return prices, elapsed, cached
+
+    prices, elapsed, cached = asyncio.run(test())
+    assert prices == {"0xa": 0.0}
+    assert elapsed < 0.35
+    assert resolver.stats["timeouts"] == 1
+    assert cached == {"0xa": 1.0}
+    assert slow.calls == 1
+
+
+def test_throttled_source_falls_through():
+    """예산이 떨어진 소스는 요청하지 않고 다음 소스로 넘어간다"""
+    limited = FakeSource("limited", {"0xa": 1.0, "0xb": 1.0}, burst=1)
+    backup = FakeSource("backup", {"0xb": 2.0})
+    resolver = TieredPriceResolver([limited, backup])
+
+    async def test():
+        first = await resolver.resolve("eth", ["0xa"])
+        second = await resolver.resolve("eth", ["0xb"])
+        return first, second
+
+    first, second = asyncio.run(test())
+    assert first == {"0xa": 1.0}
+    assert second == {"0xb": 2.0}
+    assert limited.calls == 1
+    assert limited.stats["throttled"] == 1
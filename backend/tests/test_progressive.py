@@ -0,0 +1,83 @@
+"""분석 결과 점진 표시 - 섹션별 중간 결과 + 메시지 수정 간격"""
+import asyncio
+
+from analyzers.base import BaseAnalyzer
+from bot.handlers.analyzer import analyze_progressively
+from config import settings
+from models.token import TokenAnalysis
+
+
+class SectionedAnalyzer(BaseAnalyzer):
+    """섹션마다 정해진 시간 뒤 끝나는 분석기 (error 섹션은 실패)"""
+
+    DELAYS = {"basic": 0.01, "error": 0.03, "market": 0.06}
+
+    def __init__(self):
+        self.chain = "ethereum"
+
+    async def analyze(self, address: str) -> TokenAnalysis:
+        async for analysis, _ in self.analyze_iter(address):
+            pass
+        return analysis
+
+    def _new_analysis(self, address: str) -> TokenAnalysis:
+        return TokenAnalysis(chain=self.chain, chain_name=self.chain, address=address)
+
+    def _sections(self, address: str) -> dict:
+        return {section: (lambda s=section: self._fetch(s)) for section in self.DELAYS}
+
+    def _apply(self, analysis: TokenAnalysis, section: str, result: dict):
+        if section == "basic":
+            analysis.basic.name = result["name"]
+        elif section == "market":
+            analysis.market.price_usd = result["price_usd"]
+
+    async def _fetch(self, section: str) -> dict:
+        await asyncio.sleep(self.DELAYS[section])
+        if section == "error":
+            raise RuntimeError("upstream down")
+        return {"name": "Token", "price_usd": 2.0}
+
+    async def close(self):
+        pass
+
+
+def test_analyze_iter_yields_after_each_section(analysis_state):
+    """섹션이 끝날 때마다 중간 결과와 남은 섹션을 내보내고, 실패한 섹션은 에러로 남긴다"""
+
+    async def test():
+        return [
+            (analysis.basic.name, analysis.market.price_usd, sorted(pending))
+            async for analysis, pending in SectionedAnalyzer().analyze_iter("0xabc")
+        ]
+
+    steps = asyncio.run(test())
+    assert steps == [
+        ("Token", None, ["error", "market"]),
+        ("Token", None, ["market"]),
+        ("Token", 2.0, []),
+    ]
+
+
+def test_progressive_edits_respect_interval(analysis_state, monkeypatch):
+    """중간 수정은 간격을 지키고 그 사이 결과는 합쳐지며, 최종 결과는 호출자에게 돌아간다"""
+    monkeypatch.setattr(settings, "analyze_progressive", True)
+    monkeypatch.setattr(settings, "analyze_edit_interval", 0.1)
+    edits: list[float] = []
+
+    async def edit_text(text, **kwargs):
+        edits.append(asyncio.get_running_loop().time())
+
+    async def test():
+        start = asyncio.get_running_loop().time()
+        result = await analyze_progressively(edit_text, SectionedAnalyzer(), "0xabc")
+        return result, start, asyncio.get_running_loop().time()
+
+    result, start, end = asyncio.run(test())
+    assert result.market.price_usd == 2.0
+    assert result.errors == ["Error in error: upstream down"]
+    # basic 후 바로 1회 (error 결과는 간격 때문에 최종 결과 전에 버려짐)
+    assert len(edits) == 1
+    assert edits[0] - start < 0.05
+    # 최종 수정(호출자)도 간격 뒤에
+    assert end - edits[0] >= 0.09
@@ -0,0 +1,93 @@
+"""JSON-RPC 마이크로 배칭 - 합치기, 응답 분배, 배치 거부 폴백"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services import rpc_batcher
+from services.rpc_batcher import RpcBatcher, RpcError
+
+
+class FakeEndpoint:
+    """params[0]을 그대로 돌려주는 RPC 엔드포인트 ("fail"이면 에러 응답)"""
+
+    def __init__(self, accepts_batch: bool = True):
+        self.accepts_batch = accepts_batch
+        self.requests: list = []
+
+    def _answer(self, body: dict) -> dict:
+        if body["params"][0] == "fail":
+            return {"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32000, "message": "reverted"}}
+        return {"jsonrpc": "2.0", "id": body["id"], "result": body["params"][0]}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        if isinstance(payload, list):
+            if not self.accepts_batch:
+                return httpx.Response(400, json={"error": "batch requests are not supported"})
+            # 응답 순서는 요청과 다를 수 있음
+            return httpx.Response(200, json=[self._answer(body) for body in reversed(payload)])
+        return httpx.Response(200, json=self._answer(payload))
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    endpoint = FakeEndpoint()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint.handle))
+
+    async def get_http_client():
+        return client
+
+    monkeypatch.setattr(rpc_batcher, "get_http_client", get_http_client)
+    return endpoint
+
+
+def test_concurrent_calls_share_one_request(endpoint):
+    """window 안의 동시 호출은 배치 요청 1회로 나가고, 응답은 id로 각 호출자에게 돌아간다"""
+
+    async def test():
+        batcher = RpcBatcher("http://rpc", window=0.01, max_batch=10)
+        results = await asyncio.gather(
+            batcher.call("eth_call", ["a"]),
+            batcher.call("eth_call", ["fail"]),
+            batcher.call("eth_call", ["b"]),
+            return_exceptions=True,
+        )
+        await batcher.close()
+        return results
+
+    a, failed, b = asyncio.run(test())
+    assert (a, b) == ("a", "b")
+    assert isinstance(failed, RpcError)
+    assert len(endpoint.requests) == 1 and len(endpoint.requests[0]) == 3
+
+
+def test_full_batch_is_sent_without_waiting(endpoint):
+    """max batch개가 차면 window를 기다리지 않고 보낸다"""
+
+    async def test():
+        batcher = RpcBatcher("http://rpc", window=10, max_batch=2)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.call("eth_call", ["a"]), batcher.call("eth_call", ["b"])),
+            timeout=1,
+        )
+
+    assert asyncio.run(test()) == ["a", "b"]
+    assert len(endpoint.requests) == 1
+
+
+def test_endpoint_rejecting_batches_falls_back_to_single_calls(endpoint):
+    """배치를 거부한 엔드포인트는 그 배치를 1건씩 다시 보내고, 이후에도 배칭하지 않는다"""
+    endpoint.accepts_batch = False
+
+    async def test():
+        batcher = RpcBatcher("http://rpc", window=0.01, max_batch=10)
+        first = await asyncio.gather(batcher.call("eth_call", ["a"]), batcher.call("eth_call", ["b"]))
+        second = await asyncio.gather(batcher.call("eth_call", ["c"]), batcher.call("eth_call", ["d"]))
+        return first, second
+
+    assert asyncio.run(test()) == (["a", "b"], ["c", "d"])
+    # 거부된 배치 1회 + 1건씩 4회
+    assert [isinstance(payload, list) for payload in endpoint.requests] == [True] + [False] * 4
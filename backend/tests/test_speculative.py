@@ -0,0 +1,86 @@
+"""추측 분석 취소 + 예산"""
+import asyncio
+from functools import partial
+
+from analyzers import speculative
+from analyzers.base import BaseAnalyzer
+from analyzers.speculative import SpeculativeAnalysis
+from config import settings
+from models.token import TokenAnalysis
+
+
+class FakeAnalyzer(BaseAnalyzer):
+    """market 섹션 하나만 delay초 걸려 조회하는 분석기"""
+
+    def __init__(self, chain: str, delay: float):
+        self.chain = chain
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def analyze(self, address: str) -> TokenAnalysis:
+        async for analysis, _ in self.analyze_iter(address):
+            pass
+        return analysis
+
+    def _new_analysis(self, address: str) -> TokenAnalysis:
+        return TokenAnalysis(chain=self.chain, chain_name=self.chain, address=address)
+
+    def _sections(self, address: str) -> dict:
+        return {"market": partial(self._fetch, address)}
+
+    def _apply(self, analysis: TokenAnalysis, section: str, result: dict):
+        analysis.market.price_usd = result["price_usd"]
+
+    async def _fetch(self, address: str) -> dict:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"price_usd": 1.5}
+
+    async def close(self):
+        pass
+
+
+def test_speculation_cancel_stops_upstream_fetch(analysis_state, monkeypatch):
+    """선택하지 않은 체인의 추측 분석을 취소하면 섹션 조회까지 멈추고, 선택한 체인은 결과를 재사용"""
+    analyzers = {
+        "ethereum": FakeAnalyzer("ethereum", delay=0.05),
+        "bsc": FakeAnalyzer("bsc", delay=10),
+    }
+    monkeypatch.setattr(speculative.AnalyzerRegistry, "get", staticmethod(analyzers.get))
+
+    async def test():
+        SpeculativeAnalysis.start("0xabc", ["ethereum", "bsc"])
+        await asyncio.sleep(0.01)
+        assert SpeculativeAnalysis.get_stats()["running"] == 2
+
+        SpeculativeAnalysis.cancel("0xabc", keep="ethereum")
+        analysis = await SpeculativeAnalysis.get("ethereum", "0xabc")
+        await asyncio.sleep(0.01)
+        return analysis
+
+    analysis = asyncio.run(test())
+    assert analysis.market.price_usd == 1.5
+    assert analyzers["bsc"].started == 1
+    assert analyzers["bsc"].cancelled == 1
+    assert SpeculativeAnalysis.get_stats()["running"] == 0
+
+
+def test_speculation_respects_budget(analysis_state, monkeypatch):
+    """동시 추측 분석 수가 예산에 닿으면 새 추측을 시작하지 않는다"""
+    analyzer = FakeAnalyzer("ethereum", delay=10)
+    monkeypatch.setattr(speculative.AnalyzerRegistry, "get", staticmethod(lambda chain: analyzer))
+    monkeypatch.setattr(settings, "analyze_speculative_budget", 1)
+
+    async def test():
+        SpeculativeAnalysis.start("0xabc", ["ethereum", "bsc"])
+        SpeculativeAnalysis.start("0xdef", ["ethereum"])
+        running = SpeculativeAnalysis.get_stats()["running"]
+        await SpeculativeAnalysis.close()
+        return running
+
+    assert asyncio.run(test()) == 1
@@ -0,0 +1,69 @@
+"""토큰 불변 사실 저장소 - LRU -> SQLite, 검증된 컨트랙트만 저장"""
+from types import SimpleNamespace
+
+import pytest
+from cachetools import LRUCache
+
+from analyzers.evm_analyzer import EVMAnalyzer
+from services.token_facts import CONTRACT, TokenFactsService
+
+TOKEN = "0x" + "ab" * 20
+
+
+@pytest.fixture
+def facts_state(monkeypatch):
+    monkeypatch.setattr(TokenFactsService, "_facts", LRUCache(maxsize=100))
+    monkeypatch.setattr(TokenFactsService, "stats", dict.fromkeys(TokenFactsService.stats, 0))
+
+
+def test_facts_survive_memory_eviction(run_with_db, facts_state):
+    """저장한 사실은 메모리에서 빠져도 SQLite에서 다시 찾는다 (EVM 주소는 대소문자 무시)"""
+
+    async def test():
+        assert await TokenFactsService.get("eth", TOKEN, CONTRACT) is None
+        await TokenFactsService.save("eth", TOKEN.upper().replace("0X", "0x"), CONTRACT, {"is_verified": True})
+
+        assert await TokenFactsService.get("eth", TOKEN, CONTRACT) == {"is_verified": True}
+        TokenFactsService._facts.clear()
+        assert await TokenFactsService.get("eth", TOKEN, CONTRACT) == {"is_verified": True}
+        # 다른 체인은 별개
+        assert await TokenFactsService.get("bsc", TOKEN, CONTRACT) is None
+
+    run_with_db(test)
+    assert TokenFactsService.stats == {"memory_hits": 1, "db_hits": 1, "misses": 2, "saved": 1}
+
+
+class FakeEtherscan:
+    """검증 여부를 정해 둔 Etherscan"""
+
+    def __init__(self, verified: bool):
+        self.verified = verified
+        self.calls = 0
+
+    async def get_contract_source(self, address):
+        self.calls += 1
+        return {"verified": self.verified}
+
+    def parse_contract_data(self, data):
+        return {"is_verified": data["verified"], "contract_name": "Token"}
+
+
+def _analyzer(verified: bool) -> EVMAnalyzer:
+    analyzer = EVMAnalyzer.__new__(EVMAnalyzer)
+    analyzer.config = SimpleNamespace(chain_code="eth")
+    analyzer.etherscan = FakeEtherscan(verified)
+    return analyzer
+
+
+def test_only_verified_contracts_are_stored(run_with_db, facts_state):
+    """검증된 컨트랙트 정보는 다시 조회하지 않고, 미검증은 매번 조회한다"""
+    verified, unverified = _analyzer(True), _analyzer(False)
+
+    async def test():
+        for _ in range(2):
+            await verified._get_contract_info(TOKEN)
+            await unverified._get_contract_info("0x" + "cd" * 20)
+
+    run_with_db(test)
+    assert verified.etherscan.calls == 1
+    assert unverified.etherscan.calls == 2
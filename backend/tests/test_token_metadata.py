@@ -0,0 +1,78 @@
+"""토큰 메타데이터 조회 순서 (LRU -> SQLite -> Multicall3) + 실패 캐시"""
+import pytest
+from cachetools import LRUCache, TTLCache
+from eth_abi import encode
+
+from services import token_metadata
+from services.multicall import ERC20_DECIMALS, ERC20_NAME, ERC20_SYMBOL
+from services.token_metadata import TokenMetadataService
+
+TOKEN = "0x" + "11" * 20
+NOT_TOKEN = "0x" + "22" * 20
+
+RESPONSES = {
+    ERC20_DECIMALS: encode(["uint8"], [6]),
+    ERC20_SYMBOL: encode(["string"], ["USDC"]),
+    ERC20_NAME: encode(["string"], ["USD Coin"]),
+}
+
+
+@pytest.fixture
+def metadata_state(monkeypatch):
+    """메모리 캐시 초기화 + Multicall3 호출 기록"""
+    monkeypatch.setattr(TokenMetadataService, "_tokens", LRUCache(maxsize=100))
+    monkeypatch.setattr(TokenMetadataService, "_pools", LRUCache(maxsize=100))
+    monkeypatch.setattr(TokenMetadataService, "_failed", TTLCache(maxsize=100, ttl=600))
+    calls: list[list[tuple[str, bytes]]] = []
+
+    async def aggregate3(rpc_url, batch, web3=None):
+        calls.append(batch)
+        # NOT_TOKEN은 모든 호출이 revert
+        return [RESPONSES[data] if target == TOKEN else None for target, data in batch]
+
+    monkeypatch.setattr(token_metadata, "aggregate3", aggregate3)
+    return calls
+
+
+def test_lookup_order_lru_sqlite_multicall(run_with_db, metadata_state):
+    """처음엔 Multicall3, 다음엔 메모리 캐시, 재시작 후엔 SQLite에서 찾는다"""
+
+    async def test():
+        meta = await TokenMetadataService.get("eth", TOKEN)
+        assert (meta.symbol, meta.decimals) == ("USDC", 6)
+        assert len(metadata_state) == 1
+
+        assert await TokenMetadataService.get("eth", TOKEN) == meta
+        assert len(metadata_state) == 1
+
+        # 재시작 (메모리 캐시 비움)
+        TokenMetadataService._tokens.clear()
+        assert await TokenMetadataService.get("eth", TOKEN) == meta
+        assert len(metadata_state) == 1
+
+    run_with_db(test)
+
+
+def test_only_definitive_answers_are_negative_cached(run_with_db, metadata_state, monkeypatch):
+    """RPC 오류는 실패 캐시에 넣지 않고, 토큰이 아니라고 응답받은 주소만 넣는다"""
+
+    async def test():
+        async def broken(rpc_url, batch, web3=None):
+            raise ConnectionError("rpc down")
+
+        working = token_metadata.aggregate3
+        monkeypatch.setattr(token_metadata, "aggregate3", broken)
+        assert await TokenMetadataService.get_many("eth", [TOKEN, NOT_TOKEN]) == {}
+        assert len(TokenMetadataService._failed) == 0
+
+        # RPC가 돌아오면 바로 다시 조회
+        monkeypatch.setattr(token_metadata, "aggregate3", working)
+        result = await TokenMetadataService.get_many("eth", [TOKEN, NOT_TOKEN])
+        assert list(result) == [TOKEN]
+        assert ("eth", NOT_TOKEN) in TokenMetadataService._failed
+
+        # 토큰이 아닌 주소는 다시 조회하지 않음
+        await TokenMetadataService.get_many("eth", [NOT_TOKEN])
+        assert len(metadata_state) == 1
+
+    run_with_db(test)
@@ -0,0 +1,69 @@
+"""봇 업데이트 동시 처리 - 사용자별 순서 + 전체 동시성 제한"""
+import asyncio
+from datetime import datetime
+
+from telegram import Chat, Message, Update, User
+
+from bot.update_processor import PerUserUpdateProcessor
+
+
+def _update(update_id: int, user_id: int) -> Update:
+    user = User(id=user_id, first_name="user", is_bot=False)
+    chat = Chat(id=user_id, type="private")
+    message = Message(message_id=update_id, date=datetime.now(), chat=chat, from_user=user)
+    return Update(update_id=update_id, message=message)
+
+
+class Recorder:
+    """처리 시작/끝과 동시 실행 수 기록"""
+
+    def __init__(self):
+        self.events: list[tuple[str, int]] = []
+        self.running = 0
+        self.peak = 0
+
+    async def handle(self, update_id: int, delay: float):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.events.append(("start", update_id))
+        await asyncio.sleep(delay)
+        self.events.append(("end", update_id))
+        self.running -= 1
+
+
+def test_same_user_updates_run_in_order():
+    """같은 사용자의 업데이트는 도착 순서대로 하나씩, 다른 사용자는 동시에 처리된다"""
+    recorder = Recorder()
+
+    async def test():
+        processor = PerUserUpdateProcessor(max_concurrent=8)
+        await asyncio.gather(
+            processor.process_update(_update(1, user_id=1), recorder.handle(1, 0.05)),
+            processor.process_update(_update(2, user_id=1), recorder.handle(2, 0.01)),
+            processor.process_update(_update(3, user_id=2), recorder.handle(3, 0.01)),
+        )
+        return processor
+
+    processor = asyncio.run(test())
+    events = recorder.events
+    # 사용자 1의 두 번째 업데이트는 첫 번째가 끝난 뒤 시작
+    assert events.index(("end", 1)) < events.index(("start", 2))
+    # 사용자 2는 사용자 1을 기다리지 않음
+    assert events.index(("end", 3)) < events.index(("end", 1))
+    assert processor._users == {}
+
+
+def test_global_concurrency_is_limited():
+    """여러 사용자의 업데이트도 max_concurrent개까지만 동시에 처리된다"""
+    recorder = Recorder()
+
+    async def test():
+        processor = PerUserUpdateProcessor(max_concurrent=2)
+        await asyncio.gather(*(
+            processor.process_update(_update(n, user_id=n), recorder.handle(n, 0.01))
+            for n in range(6)
+        ))
+
+    asyncio.run(test())
+    assert recorder.peak == 2
+    assert len(recorder.events) == 12
@@ -0,0 +1,69 @@
+"""네트워크 조회 없는 USD 가치 계산 + 스왑 레그 수집"""
+import asyncio
+
+import pytest
+
+from config import DEX_CONTRACTS, WRAPPED_NATIVE
+from services.price_service import PriceService
+from webhook import moralis
+from webhook.valuation import SwapLeg, value_locally
+
+USDC = "0xA0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+WETH = WRAPPED_NATIVE["eth"]
+MEME = "0x" + "33" * 20
+SWAPPER = "0x" + "44" * 20
+
+
+@pytest.fixture
+def native_price(monkeypatch):
+    """캐시된 ETH 가격 $2000"""
+    prices = {"eth": 2000.0}
+    monkeypatch.setattr(PriceService, "get_cached_native_price", staticmethod(prices.get))
+    return prices
+
+
+def test_stablecoin_and_native_legs(native_price):
+    """스테이블은 $1, 래핑 네이티브/네이티브는 캐시된 가격으로 계산하고 큰 쪽을 쓴다"""
+    assert value_locally("eth", [SwapLeg(USDC, 150.0)]) == 150.0
+    assert value_locally("eth", [SwapLeg(WETH, 0.5)]) == 1000.0
+    assert value_locally("eth", [SwapLeg(None, 0.1)]) == 200.0
+    assert value_locally("eth", [SwapLeg(USDC, 990.0), SwapLeg(WETH, 0.5)]) == 1000.0
+
+
+def test_unknown_legs_fall_back(native_price):
+    """기준 토큰이 없거나 네이티브 가격이 캐시에 없으면 None (가격 API 폴백)"""
+    assert value_locally("eth", [SwapLeg(MEME, 1e6)]) is None
+    assert value_locally("eth", [SwapLeg(USDC, 0.0)]) is None
+    native_price.clear()
+    assert value_locally("eth", [SwapLeg(WETH, 1.0)]) is None
+
+
+def test_token_to_native_swap_is_valued_from_swap_logs(native_price, monkeypatch):
+    """ERC20 전송에 출력 레그가 없는 토큰 -> 네이티브 스왑도 스왑 로그의 WETH 출력으로 계산"""
+
+    async def parse_swap_logs(logs, chain):
+        return {
+            "token_in": MEME,
+            "token_out": WETH,
+            "amount_in": 1e6,
+            "amount_out": 0.25,
+            "summary": "1000000.0000 MEME -> 0.2500 WETH",
+        }
+
+    monkeypatch.setattr(moralis, "parse_swap_logs", parse_swap_logs)
+    monkeypatch.setattr(moralis.WalletIndex, "is_watched", staticmethod(lambda address: True))
+
+    tx = {"toAddress": DEX_CONTRACTS["eth"]["uniswap_v2"], "fromAddress": SWAPPER, "hash": "0xabc"}
+    # 실행자가 보낸 밈코인 전송만 있음 (ETH는 언랩되어 네이티브로 받음)
+    transfers = [{
+        "transactionHash": "0xabc",
+        "from": SWAPPER,
+        "to": "0x" + "55" * 20,
+        "contract": MEME,
+        "value": str(10 ** 24),
+        "tokenDecimals": "18",
+    }]
+
+    info = asyncio.run(moralis.decode_dex_swap(tx, "eth", transfers))
+    assert [leg.token_address for leg in info.valuation_legs()] == [MEME, WETH]
+    assert value_locally("eth", info.valuation_legs()) == 500.0
@@ -1,18 +1,25 @@
 """텔레그램 메시지 포맷팅"""
+from typing import Optional
 from models.token import TokenAnalysis, RiskLevel
 from config.chains import get_chain_configs
 
 
-def format_analysis_result(analysis: TokenAnalysis) -> str:
+# 조회 중인 섹션 표시
+LOADING = "<i>loading...</i>"
+
+
+def format_analysis_result(analysis: TokenAnalysis, pending: Optional[set[str]] = None) -> str:
     """
     분석 결과를 텔레그램 메시지로 포맷팅
 
     Args:
         analysis: TokenAnalysis 결과
+        pending: 아직 조회 중인 섹션 (중간 결과 표시용, 해당 섹션은 로딩 표시)
 
     Returns:
         HTML 포맷된 메시지
     """
+    pending = pending or set()
     lines = []
 
     # 헤더
@@ -21,6 +28,8 @@ def format_analysis_result(analysis: TokenAnalysis) -> str:
 
     # 기본 정보
     lines.append("<b>Basic Info</b>")
+    if "basic" in pending:
+        lines.append(LOADING)
     lines.append(f"Name: <code>{escape_html(analysis.basic.name)}</code>")
     lines.append(f"Symbol: <code>{escape_html(analysis.basic.symbol)}</code>")
     lines.append(f"Chain: {analysis.chain_name}")
@@ -34,7 +43,11 @@ def format_analysis_result(analysis: TokenAnalysis) -> str:
     lines.append("")
 
     # 시장 정보
-    if analysis.market.price_usd is not None:
+    if "market" in pending:
+        lines.append("<b>Market Data</b>")
+        lines.append(LOADING)
+        lines.append("")
+    elif analysis.market.price_usd is not None:
         lines.append("<b>Market Data</b>")
 
         price_str = format_price(analysis.market.price_usd)
@@ -91,7 +104,10 @@ def format_analysis_result(analysis: TokenAnalysis) -> str:
 
     # 보안 정보
     lines.append("<b>Security Analysis</b>")
-    lines.append(f"Risk Level: {format_risk_badge(analysis.security.risk_level)}")
+    if "security" in pending:
+        lines.append(f"Risk Level: {LOADING}")
+    else:
+        lines.append(f"Risk Level: {format_risk_badge(analysis.security.risk_level)}")
     lines.append("")
 
     # 안전 항목
@@ -109,7 +125,9 @@ def format_analysis_result(analysis: TokenAnalysis) -> str:
     lines.append("")
 
     # 컨트랙트 검증 정보
-    if analysis.contract.is_verified is not None:
+    if "contract" in pending:
+        lines.append(f"Contract: {LOADING}")
+    elif analysis.contract.is_verified is not None:
         status = "Verified" if analysis.contract.is_verified else "Not Verified"
         lines.append(f"Contract: {status}")
 
@@ -128,7 +146,10 @@ def format_analysis_result(analysis: TokenAnalysis) -> str:
 
     # 타임스탬프
     lines.append("")
-    lines.append(f"<i>Analyzed: {analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S')} UTC</i>")
+    if pending:
+        lines.append(f"<i>Still loading: {', '.join(sorted(pending))}</i>")
+    else:
+        lines.append(f"<i>Analyzed: {analysis.analyzed_at.strftime('%Y-%m-%d %H:%M:%S')} UTC</i>")
 
     return "\n".join(lines)
 
@@ -0,0 +1,40 @@
+"""요청 속도 제한 - 토큰 버킷"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """토큰 버킷 (초당 rate개 충전, 최대 capacity개 보관)
+
+    한 이벤트 루프 안에서만 사용한다.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        """경과 시간만큼 토큰 충전"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """토큰이 있으면 소비하고 True (대기 없음)"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def time_until(self, tokens: float = 1.0) -> float:
+        """토큰이 모일 때까지 남은 시간 (초)"""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        """토큰이 모일 때까지 대기 후 소비"""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.time_until(tokens))
@@ -0,0 +1,251 @@
+"""텔레그램 알림 전송 큐 - 속도 제한 + 재시도
+
+텔레그램 제한(전체 약 30건/초, 채팅당 약 1건/초)을 넘기면 429(RetryAfter)가 나고
+알림이 유실된다. 채팅별 큐 + 토큰 버킷과 전체 토큰 버킷으로 제한 안에서 최대한
+빠르게 보내고, RetryAfter는 지정 시간만큼 해당 채팅을 멈춘 뒤 같은 메시지를 다시 보낸다.
+
+- 채팅별 큐는 순서를 보장하고, 메시지가 있는 채팅만 전송 태스크를 가진다
+- 채팅별 토큰 버킷은 큐와 별도로 두고 다 충전될 때까지 유지한다
+  (큐가 비었다고 버킷을 버리면 띄엄띄엄 오는 메시지가 매번 새 버킷으로 바로 나감)
+- 네트워크 오류는 지수 백오프로 재시도, 차단/잘못된 요청은 재시도하지 않음
+- 최종 결과는 DeliveryResult로 돌려주고, 재시도 여부는 아웃박스가 판단한다
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+from cachetools import TTLCache
+from loguru import logger
+from telegram.error import BadRequest, ChatMigrated, Forbidden, InvalidToken, RetryAfter
+
+from config import settings
+from utils.rate_limit import TokenBucket
+from .notifier import get_bot
+
+# 재시도해도 소용없는 에러 (봇 차단, 잘못된 메시지 등)
+PERMANENT_ERRORS = (Forbidden, BadRequest, ChatMigrated, InvalidToken)
+
+
+@dataclass
+class DeliveryResult:
+    """전송 결과 (permanent=True면 다시 보내도 실패)"""
+    ok: bool
+    error: str = ""
+    permanent: bool = False
+
+
+@dataclass
+class OutgoingMessage:
+    """전송 대기 메시지"""
+    chat_id: int
+    text: str
+    label: str = ""
+    attempts: int = 0
+    future: Optional[asyncio.Future] = None
+
+
+@dataclass
+class ChatQueue:
+    """채팅별 대기열"""
+    messages: deque = field(default_factory=deque)
+    task: Optional[asyncio.Task] = None
+
+
+class TelegramDelivery:
+    """속도 제한 전송 큐 (웹훅 서버 루프에서 사용)"""
+
+    RETRY_BASE_DELAY = 1.0  # 초 (시도마다 2배)
+    RETRY_MAX_DELAY = 30.0
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        max_pending: int,
+        max_attempts: int
+    ):
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_rate = chat_rate
+        self._chats: dict[int, ChatQueue] = {}
+        # 채팅별 토큰 버킷 - 마지막 사용 후 다 충전되는 시간(버스트 1 / rate)이 지나면 만료
+        self._buckets: TTLCache = TTLCache(maxsize=100_000, ttl=1 / chat_rate)
+        # 전체 대기 메시지 상한 (가득 차면 submit 대기 = 파이프라인 backpressure)
+        self._slots = asyncio.Semaphore(max_pending)
+        self.max_attempts = max_attempts
+        self.stats = {"sent": 0, "retried": 0, "rate_limited": 0, "failed": 0, "pending": 0}
+
+    async def submit(self, chat_id: int, text: str, label: str = "") -> asyncio.Future:
+        """메시지 등록 (전송 완료를 기다리지 않음)
+
+        Returns:
+            전송 결과 Future (DeliveryResult)
+        """
+        await self._slots.acquire()
+
+        message = OutgoingMessage(
+            chat_id=chat_id,
+            text=text,
+            label=label,
+            future=asyncio.get_running_loop().create_future(),
+        )
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = ChatQueue()
+            self._chats[chat_id] = chat
+
+        chat.messages.append(message)
+        self.stats["pending"] += 1
+        if chat.task is None:
+            chat.task = asyncio.create_task(self._drain(chat_id, chat))
+
+        return message.future
+
+    async def _drain(self, chat_id: int, chat: ChatQueue):
+        """채팅 대기열을 순서대로 전송 (비면 종료)"""
+        try:
+            while chat.messages:
+                message = chat.messages[0]
+
+                await self._acquire_chat(chat_id)
+                await self._global.acquire()
+
+                delay = await self._attempt(message)
+                if delay is None:
+                    chat.messages.popleft()
+                    self._slots.release()
+                    self.stats["pending"] -= 1
+                else:
+                    await asyncio.sleep(delay)
+        finally:
+            chat.task = None
+            if not chat.messages:
+                self._chats.pop(chat_id, None)
+
+    async def _acquire_chat(self, chat_id: int):
+        """채팅 토큰 1개 소비 (버킷이 없거나 만료됐으면 새로 만듦)"""
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            # 첫 메시지는 바로 보낼 수 있도록 버스트 1
+            bucket = TokenBucket(self._chat_rate, 1)
+        await bucket.acquire()
+        # 토큰을 쓴 시점부터 다시 다 찰 때까지 유지
+        self._buckets[chat_id] = bucket
+
+    async def _attempt(self, message: OutgoingMessage) -> Optional[float]:
+        """1회 전송 시도
+
+        Returns:
+            None = 처리 끝 (성공 또는 최종 실패), 숫자 = 그만큼 기다린 후 재시도
+        """
+        try:
+            await get_bot().send_message(
+                chat_id=message.chat_id,
+                text=message.text,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
+            self.stats["sent"] += 1
+            logger.info(f"Notification sent to {message.chat_id}: {message.label}")
+            self._resolve(message, DeliveryResult(ok=True))
+            return None
+
+        except RetryAfter as e:
+            # 제한 초과 - 시도 횟수에 포함하지 않고 지정 시간 후 재전송
+            self.stats["rate_limited"] += 1
+            retry_after = float(e.retry_after)
+            logger.warning(
+                f"Telegram rate limit for {message.chat_id}: retry after {retry_after:.0f}s"
+            )
+            return retry_after
+
+        except PERMANENT_ERRORS as e:
+            self._fail(message, e, permanent=True)
+            return None
+
+        except Exception as e:
+            message.attempts += 1
+            if message.attempts >= self.max_attempts:
+                self._fail(message, e, permanent=False)
+                return None
+
+            self.stats["retried"] += 1
+            delay = min(self.RETRY_BASE_DELAY * 2 ** (message.attempts - 1), self.RETRY_MAX_DELAY)
+            logger.warning(
+                f"Notification to {message.chat_id} failed "
+                f"[{message.attempts}/{self.max_attempts}], retry in {delay:.0f}s: {e}"
+            )
+            return delay
+
+    def _fail(self, message: OutgoingMessage, error: Exception, permanent: bool):
+        """최종 실패 처리"""
+        self.stats["failed"] += 1
+        logger.error(
+            f"Failed to send notification to user {message.chat_id} "
+            f"({message.label}): {error}"
+        )
+        self._resolve(
+            message, DeliveryResult(ok=False, error=str(error), permanent=permanent)
+        )
+
+    @staticmethod
+    def _resolve(message: OutgoingMessage, result: DeliveryResult):
+        """결과 Future 완료"""
+        if message.future and not message.future.done():
+            message.future.set_result(result)
+
+    async def stop(self, timeout: float = 5.0):
+        """남은 메시지를 timeout까지 전송 후 종료"""
+        tasks = [chat.task for chat in self._chats.values() if chat.task]
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=timeout)
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+        unsent = sum(len(chat.messages) for chat in self._chats.values())
+        if unsent:
+            logger.warning(f"Telegram delivery stopped with {unsent} unsent notifications")
+        self._chats.clear()
+
+
+# 전송 큐 인스턴스 (웹훅 서버 루프에서 start_delivery)
+_delivery: Optional[TelegramDelivery] = None
+
+
+def start_delivery() -> TelegramDelivery:
+    """전송 큐 생성"""
+    global _delivery
+    if _delivery is None:
+        _delivery = TelegramDelivery(
+            global_rate=settings.telegram_global_rate,
+            chat_rate=settings.telegram_chat_rate,
+            max_pending=settings.telegram_max_pending,
+            max_attempts=settings.telegram_send_attempts,
+        )
+        logger.info(
+            f"Telegram delivery started (global {settings.telegram_global_rate}/s, "
+            f"per chat {settings.telegram_chat_rate}/s)"
+        )
+    return _delivery
+
+
+async def stop_delivery():
+    """전송 큐 종료"""
+    global _delivery
+    if _delivery is not None:
+        await _delivery.stop()
+        _delivery = None
+        logger.info("Telegram delivery stopped")
+
+
+def get_delivery_stats() -> dict:
+    """전송 통계 (미시작이면 빈 dict)"""
+    return dict(_delivery.stats) if _delivery else {}
+
+
+async def enqueue_notification(user_id: int, text: str, label: str = "") -> asyncio.Future:
+    """알림 전송 등록"""
+    if _delivery is None:
+        raise RuntimeError("Telegram delivery is not running")
+    return await _delivery.submit(user_id, text, label)
@@ -0,0 +1,339 @@
+"""요약(digest) 알림 - 빈도가 높은 지갑의 알림을 모아 한 메시지로
+
+봇 지갑/마켓메이커처럼 분당 수백 건을 만드는 지갑은 알림을 하나씩 보내지 않고
+지갑별 버퍼에 모았다가 요약 주기 경계가 지나거나 K건이 차면 요약 메시지 1건을 보낸다
+(방향별 건수, 토큰별 순유입, 큰 전송 상위 목록).
+
+지갑 설정 digest_mode:
+- on: 항상 요약
+- off: 항상 개별 알림
+- auto: 최근 1분 알림 수가 임계값 이상이면 요약 (빈도가 내려가면 다시 개별 알림)
+
+요약 주기 동안 인박스 워커를 붙잡지 않도록 버퍼에 넣은 이벤트는 SQLite(digest_events)에
+저장한 뒤 처리 완료로 본다. 재시작하면 남은 이벤트를 다시 버퍼에 올린다.
+전송할 묶음은 먼저 DB에서 확정(batch_id)하고 아웃박스에 저장한 뒤 지우므로,
+중간에 죽어도 같은 묶음이 같은 키로 다시 저장된다 (아웃박스 중복 방지).
+아웃박스 저장이 실패하면 잠시 후 다시 시도한다.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+from cachetools import TTLCache
+from loguru import logger
+
+from config import settings
+from db.crud import DigestCRUD
+from .notifier import format_digest_notification
+from .outbox import NotificationOutbox
+from .processor import Notification
+
+# 상위 전송/토큰 표시 개수
+TOP_TRANSFERS = 3
+TOP_TOKENS = 5
+
+
+@dataclass
+class DigestEvent:
+    """요약에 들어갈 전송 1건 (요약에 쓰는 값만, DB에는 JSON으로 저장)"""
+    direction: str  # "IN" / "OUT" / "SWAP"
+    amount: str
+    amount_usd: float
+    tx_hash: str
+    is_swap: bool = False
+    symbol: str = ""
+    quantity: float = 0.0
+    at: float = 0.0  # 수신 시각 (epoch 초)
+
+    @classmethod
+    def from_notification(cls, notification: Notification) -> "DigestEvent":
+        info = notification.info
+        return cls(
+            direction=notification.direction or "SWAP",
+            amount=info.amount,
+            amount_usd=info.amount_usd,
+            tx_hash=info.tx_hash,
+            is_swap=info.is_swap,
+            symbol=info.symbol,
+            quantity=info.quantity,
+            at=time.time(),
+        )
+
+
+@dataclass
+class WalletDigest:
+    """지갑 1개의 요약 버퍼"""
+    wallet_id: int
+    user_id: int
+    label: str
+    chain: str
+    window_start: float  # 요약 주기 시작 경계 (epoch 초)
+    events: list[DigestEvent] = field(default_factory=list)
+    event_ids: list[int] = field(default_factory=list)
+    batch_id: Optional[int] = None  # 전송 묶음으로 확정되면 첫 이벤트 ID
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class DigestBuffer:
+    """지갑별 요약 버퍼 (파이프라인 digest 단계)
+
+    웹훅 서버와 같은 이벤트 루프에서 사용한다.
+    """
+
+    RATE_WINDOW = 60.0  # 초 (auto 모드 빈도 측정 구간)
+    RETRY_DELAY = 10.0  # 초 (아웃박스 저장 실패 시 재시도 간격)
+    STOP_TIMEOUT = 5.0  # 초 (종료 시 요약 전송 대기, 남은 묶음은 다음 시작 때 전송)
+
+    _buffers: dict[int, WalletDigest] = {}
+    # 지갑 ID -> 최근 알림 시각 (한동안 알림이 없으면 만료)
+    _recent: TTLCache = TTLCache(maxsize=20000, ttl=RATE_WINDOW)
+    _flushes: set[asyncio.Task] = set()
+    stats = {"buffered": 0, "digests": 0, "auto_enabled": 0, "restored": 0, "retries": 0}
+
+    @classmethod
+    async def start(cls):
+        """남아 있는 이벤트 복구 (파이프라인 시작 전에 호출)
+
+        확정된 묶음은 바로 다시 전송하고, 나머지는 지갑별 버퍼에 다시 올린다.
+        """
+        rows = await DigestCRUD.get_events()
+        batches: dict[int, WalletDigest] = {}
+        for row in rows:
+            event = DigestEvent(**row["event"])
+            if row["batch_id"] is not None:
+                digest = batches.get(row["batch_id"])
+                if digest is None:
+                    digest = cls._new_digest(row)
+                    digest.batch_id = row["batch_id"]
+                    batches[row["batch_id"]] = digest
+                digest.events.append(event)
+                digest.event_ids.append(row["id"])
+                continue
+
+            digest = cls._buffers.get(row["wallet_id"])
+            if digest is None:
+                digest = cls._new_digest(row)
+                cls._buffers[row["wallet_id"]] = digest
+                cls._schedule_timer(digest)
+            digest.events.append(event)
+            digest.event_ids.append(row["id"])
+
+        for digest in batches.values():
+            cls._start_flush(digest)
+
+        cls.stats["restored"] += len(rows)
+        if rows:
+            logger.info(
+                f"Digest buffer restored: {len(rows)} events "
+                f"({len(batches)} pending digests, {len(cls._buffers)} wallets)"
+            )
+
+    @classmethod
+    async def route(cls, notification: Notification) -> list[Notification]:
+        """digest 단계: 요약 대상이면 버퍼에 넣고 개별 알림에서 제외"""
+        if not cls._should_digest(notification):
+            return [notification]
+
+        await cls._buffer(notification)
+        return []
+
+    @classmethod
+    def _should_digest(cls, notification: Notification) -> bool:
+        """요약 대상 여부 (auto 모드는 최근 빈도로 판단)"""
+        mode = notification.digest_mode
+        if mode == "off":
+            return False
+        if mode == "on":
+            return True
+
+        threshold = settings.digest_auto_threshold
+        if threshold <= 0:
+            return False
+
+        now = time.monotonic()
+        recent = cls._recent.get(notification.wallet_id) or deque()
+        recent.append(now)
+        while recent and recent[0] < now - cls.RATE_WINDOW:
+            recent.popleft()
+        # 다시 넣어 만료 시각 갱신
+        cls._recent[notification.wallet_id] = recent
+
+        # 이미 요약 중이면 이번 주기는 끝까지 모은다
+        if notification.wallet_id in cls._buffers:
+            return True
+        if len(recent) >= threshold:
+            cls.stats["auto_enabled"] += 1
+            logger.info(
+                f"Digest auto-enabled for {notification.label}: "
+                f"{len(recent)} alerts in {cls.RATE_WINDOW:.0f}s"
+            )
+            return True
+        return False
+
+    @staticmethod
+    def _new_digest(row: dict) -> WalletDigest:
+        """이벤트 행(또는 같은 키의 dict)으로 빈 버퍼 생성"""
+        return WalletDigest(
+            wallet_id=row["wallet_id"],
+            user_id=row["user_id"],
+            label=row["label"],
+            chain=row["chain"],
+            window_start=row["window_start"],
+        )
+
+    @classmethod
+    def _schedule_timer(cls, digest: WalletDigest):
+        """주기 끝 경계에 전송 예약 (이미 지났으면 바로)"""
+        delay = max(0.0, digest.window_start + settings.digest_window - time.time())
+        digest.timer = asyncio.get_running_loop().call_later(
+            delay, cls._schedule_flush, digest.wallet_id
+        )
+
+    @classmethod
+    async def _buffer(cls, notification: Notification):
+        """이벤트를 저장한 뒤 버퍼에 추가 (첫 이벤트면 주기 예약, K건이 차면 바로 전송)
+
+        저장이 실패하면 예외가 그대로 올라가 인박스가 페이로드를 재처리한다.
+        """
+        wallet_id = notification.wallet_id
+        event = DigestEvent.from_notification(notification)
+        # 주기는 digest_window 단위 경계로 나눈다 (요약 키가 재처리와 무관하게 정해짐)
+        window = settings.digest_window
+        window_start = math.floor(event.at / window) * window if window > 0 else event.at
+        row = {
+            "wallet_id": wallet_id,
+            "user_id": notification.user_id,
+            "label": notification.label,
+            "chain": notification.info.chain,
+            "window_start": window_start,
+        }
+        event_id = await DigestCRUD.add_event(**row, event=asdict(event))
+
+        digest = cls._buffers.get(wallet_id)
+        if digest is None:
+            digest = cls._new_digest(row)
+            cls._buffers[wallet_id] = digest
+            cls._schedule_timer(digest)
+
+        digest.events.append(event)
+        digest.event_ids.append(event_id)
+        cls.stats["buffered"] += 1
+
+        if len(digest.events) >= settings.digest_max_events:
+            digest.timer.cancel()
+            cls._schedule_flush(wallet_id)
+
+    @classmethod
+    def _schedule_flush(cls, wallet_id: int):
+        """버퍼를 떼어 요약 전송 태스크 시작"""
+        digest = cls._buffers.pop(wallet_id, None)
+        if digest is not None:
+            cls._start_flush(digest)
+
+    @classmethod
+    def _start_flush(cls, digest: WalletDigest):
+        task = asyncio.create_task(cls._flush(digest))
+        cls._flushes.add(task)
+        task.add_done_callback(cls._flushes.discard)
+
+    @classmethod
+    async def _flush(cls, digest: WalletDigest):
+        """묶음 확정 -> 아웃박스 저장 -> 묶음 삭제 (실패하면 성공할 때까지 재시도)
+
+        키는 (지갑, 주기 시작 경계, 묶음 첫 이벤트 ID)라서 같은 묶음을 다시 저장해도
+        아웃박스가 중복으로 무시한다.
+        """
+        while True:
+            try:
+                if digest.batch_id is None:
+                    await DigestCRUD.seal_batch(digest.event_ids[0], digest.event_ids)
+                    digest.batch_id = digest.event_ids[0]
+                await NotificationOutbox.add(
+                    user_id=digest.user_id,
+                    tx_hash=f"digest:{digest.wallet_id}:{int(digest.window_start)}",
+                    legs=[("DIGEST", str(digest.batch_id))],
+                    label=digest.label,
+                    text=cls._render(digest),
+                )
+                await DigestCRUD.delete_batch(digest.batch_id)
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls.stats["retries"] += 1
+                logger.error(
+                    f"Digest for {digest.label} failed, retrying in {cls.RETRY_DELAY:.0f}s: {e}",
+                    exc_info=True,
+                )
+                await asyncio.sleep(cls.RETRY_DELAY)
+
+        cls.stats["digests"] += 1
+        logger.info(f"Digest for {digest.label}: {len(digest.events)} events")
+
+    @staticmethod
+    def _render(digest: WalletDigest) -> str:
+        """건수 / 토큰별 순유입 / 상위 전송으로 요약 메시지 생성"""
+        counts = {"IN": 0, "OUT": 0, "SWAP": 0}
+        # 심볼 -> [순수량, 순 USD]
+        flows: dict[str, list[float]] = {}
+        net_usd = 0.0
+
+        for event in digest.events:
+            counts[event.direction] = counts.get(event.direction, 0) + 1
+            if event.is_swap or not event.symbol:
+                continue
+
+            sign = 1 if event.direction == "IN" else -1
+            flow = flows.setdefault(event.symbol, [0.0, 0.0])
+            flow[0] += sign * event.quantity
+            flow[1] += sign * event.amount_usd
+            net_usd += sign * event.amount_usd
+
+        net_flows = sorted(flows.items(), key=lambda kv: abs(kv[1][1]) or abs(kv[1][0]), reverse=True)
+        top = sorted(digest.events, key=lambda e: e.amount_usd, reverse=True)[:TOP_TRANSFERS]
+
+        return format_digest_notification(
+            label=digest.label,
+            chain=digest.chain,
+            seconds=max(event.at for event in digest.events) - digest.window_start,
+            counts=counts,
+            net_flows=[(symbol, qty, usd) for symbol, (qty, usd) in net_flows[:TOP_TOKENS]],
+            net_usd=net_usd,
+            top=[
+                {
+                    "direction": e.direction,
+                    "amount": e.amount,
+                    "amount_usd": e.amount_usd,
+                    "tx_hash": e.tx_hash,
+                }
+                for e in top
+            ],
+        )
+
+    @classmethod
+    async def stop(cls):
+        """남은 버퍼를 모두 요약으로 보내고 종료 (끝나지 않은 묶음은 다음 시작 때 전송)"""
+        for wallet_id, digest in list(cls._buffers.items()):
+            if digest.timer:
+                digest.timer.cancel()
+            cls._schedule_flush(wallet_id)
+
+        if cls._flushes:
+            _, pending = await asyncio.wait(list(cls._flushes), timeout=cls.STOP_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.warning(f"Digest buffer stopped with {len(pending)} unsent digests (kept in DB)")
+        cls._recent.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """요약 통계"""
+        return {
+            **cls.stats,
+            "active_wallets": len(cls._buffers),
+            "pending_events": sum(len(d.events) for d in cls._buffers.values()),
+        }
@@ -1,26 +1,34 @@
-"""Helius 웹훅 처리 (Solana) - 실시간 가격 연동
+"""Helius 웹훅 처리 (Solana) - 페이로드 디코딩
 
 Solana 체인 트랜잭션 처리 (SOL, SPL 토큰)
 """
 from loguru import logger
 
-from services.price_service import PriceService
-from .processor import TransactionProcessor, TransferInfo
+from .processor import TransferInfo
+from .valuation import SwapLeg
+from .pipeline import PipelineJob, submit_pipeline
 
 
-async def process_helius_webhook(data: list):
-    """Helius 웹훅 데이터 처리"""
+async def process_helius_webhook(data: list) -> PipelineJob:
+    """Helius 웹훅 데이터 처리 (파이프라인 투입, 완료는 반환된 작업으로 확인)"""
+    return await submit_pipeline("helius", data)
+
+
+async def decode_helius_webhook(data: list) -> list[TransferInfo]:
+    """Helius 웹훅 데이터를 전송 목록으로 디코딩"""
     if not isinstance(data, list):
         data = [data]
 
     logger.info(f"Processing {len(data)} Solana transactions")
 
+    transfers = []
     for tx in data:
-        await process_solana_tx(tx)
+        transfers.extend(decode_solana_tx(tx))
+    return transfers
 
 
-async def process_solana_tx(tx: dict):
-    """Solana 트랜잭션 처리"""
+def decode_solana_tx(tx: dict) -> list[TransferInfo]:
+    """Solana 트랜잭션 디코딩"""
     tx_type = tx.get("type", "UNKNOWN")
     signature = tx.get("signature", "")
 
@@ -28,83 +36,71 @@ async def process_solana_tx(tx: dict):
 
     # 스왑 감지
     if tx_type == "SWAP":
-        await process_swap(tx, signature)
-        return
+        return [decode_swap(tx, signature)]
 
     # 토큰 전송
     token_transfers = tx.get("tokenTransfers", [])
     native_transfers = tx.get("nativeTransfers", [])
 
-    # 네이티브 SOL 전송
-    for transfer in native_transfers:
-        await process_native_transfer(transfer, signature)
+    # 네이티브 SOL 전송 (leg: 페이로드 내 순번)
+    transfers = [
+        decode_native_transfer(t, signature, leg=f"native:{i}")
+        for i, t in enumerate(native_transfers)
+    ]
 
     # SPL 토큰 전송
-    for transfer in token_transfers:
-        await process_token_transfer(transfer, signature)
+    transfers += [
+        decode_token_transfer(t, signature, leg=f"spl:{i}")
+        for i, t in enumerate(token_transfers)
+    ]
 
+    return transfers
 
-async def process_native_transfer(transfer: dict, signature: str):
-    """네이티브 SOL 전송 처리"""
+
+def decode_native_transfer(transfer: dict, signature: str, leg: str = "") -> TransferInfo:
+    """네이티브 SOL 전송 디코딩"""
     from_addr = transfer.get("fromUserAccount", "").lower()
     to_addr = transfer.get("toUserAccount", "").lower()
     amount_lamports = transfer.get("amount", 0)
     amount_sol = amount_lamports / 1e9
 
-    # 실시간 SOL USD 가격 조회
-    value_usd = await PriceService.get_usd_value("sol", amount_sol)
-
-    logger.debug(
-        f"SOL transfer: {from_addr[:10]}... -> {to_addr[:10]}... "
-        f"| {amount_sol:.4f} SOL (${value_usd:.2f})"
-    )
-
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_transfer(
-        TransferInfo(
-            from_addr=from_addr,
-            to_addr=to_addr,
-            chain="sol",
-            tx_type="Transfer",
-            amount=f"{amount_sol:.4f} SOL",
-            amount_usd=value_usd,
-            tx_hash=signature,
-        )
+    return TransferInfo(
+        from_addr=from_addr,
+        to_addr=to_addr,
+        chain="sol",
+        tx_type="Transfer",
+        amount=f"{amount_sol:.4f} SOL",
+        tx_hash=signature,
+        quantity=amount_sol,
+        symbol="SOL",
+        leg=leg,
     )
 
 
-async def process_token_transfer(transfer: dict, signature: str):
-    """SPL 토큰 전송 처리"""
+def decode_token_transfer(transfer: dict, signature: str, leg: str = "") -> TransferInfo:
+    """SPL 토큰 전송 디코딩"""
     from_addr = transfer.get("fromUserAccount", "").lower()
     to_addr = transfer.get("toUserAccount", "").lower()
     amount = transfer.get("tokenAmount", 0)
     symbol = transfer.get("tokenSymbol", "???")
     mint = transfer.get("mint", "")
 
-    # 실시간 SPL 토큰 USD 가격 조회
-    value_usd = await PriceService.get_usd_value("sol", amount, mint)
-
-    logger.debug(
-        f"SPL transfer: {from_addr[:10]}... -> {to_addr[:10]}... "
-        f"| {amount:.4f} {symbol} (${value_usd:.2f})"
-    )
-
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_transfer(
-        TransferInfo(
-            from_addr=from_addr,
-            to_addr=to_addr,
-            chain="sol",
-            tx_type="Token Transfer",
-            amount=f"{amount:.4f} {symbol}",
-            amount_usd=value_usd,
-            tx_hash=signature,
-        )
+    return TransferInfo(
+        from_addr=from_addr,
+        to_addr=to_addr,
+        chain="sol",
+        tx_type="Token Transfer",
+        amount=f"{amount:.4f} {symbol}",
+        tx_hash=signature,
+        quantity=amount,
+        token_address=mint,
+        symbol=symbol,
+        leg=leg,
     )
 
 
-async def process_swap(tx: dict, signature: str):
-    """스왑 트랜잭션 처리"""
+def decode_swap(tx: dict, signature: str) -> TransferInfo:
+    """스왑 트랜잭션 디코딩"""
     fee_payer = tx.get("feePayer", "").lower()
     description = tx.get("description", "")
 
@@ -116,22 +112,21 @@ async def process_swap(tx: dict, signature: str):
     token_inputs = swap_info.get("tokenInputs", [])
     token_outputs = swap_info.get("tokenOutputs", [])
 
-    # 매도/매수 정보 구성
+    # 매도/매수 정보 구성 (가격 조회 폴백은 매도 수량 기준)
     sell_info = ""
     buy_info = ""
-    value_usd = 0
+    quantity = 0.0
+    token_address = None
 
     if native_input:
-        amount_sol = native_input.get("amount", 0) / 1e9
-        sell_info = f"{amount_sol:.4f} SOL"
-        value_usd = await PriceService.get_usd_value("sol", amount_sol)
+        quantity = native_input.get("amount", 0) / 1e9
+        sell_info = f"{quantity:.4f} SOL"
     elif token_inputs:
         ti = token_inputs[0]
-        amount = ti.get("tokenAmount", 0)
+        quantity = ti.get("tokenAmount", 0)
         symbol = ti.get("tokenSymbol", "???")
-        mint = ti.get("mint", "")
-        sell_info = f"{amount:.4f} {symbol}"
-        value_usd = await PriceService.get_usd_value("sol", amount, mint)
+        token_address = ti.get("mint", "")
+        sell_info = f"{quantity:.4f} {symbol}"
 
     if native_output:
         amount_sol = native_output.get("amount", 0) / 1e9
@@ -142,14 +137,29 @@ async def process_swap(tx: dict, signature: str):
 
     swap_summary = f"{sell_info} -> {buy_info}" if sell_info and buy_info else description
 
-    logger.info(f"Solana Swap: {swap_summary} (${value_usd:.2f})")
+    # 양쪽 레그 (스테이블/SOL 레그가 있으면 가격 조회 없이 USD 계산)
+    legs = [
+        SwapLeg(token_address=None, quantity=native.get("amount", 0) / 1e9)
+        for native in (native_input, native_output) if native
+    ]
+    legs += [
+        SwapLeg(token_address=t.get("mint", ""), quantity=t.get("tokenAmount", 0))
+        for t in token_inputs + token_outputs
+    ]
+
+    logger.info(f"Solana Swap: {swap_summary}")
 
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_swap(
+    return TransferInfo(
         from_addr=fee_payer,
+        to_addr="",
         chain="sol",
-        swap_summary=swap_summary,
-        amount_usd=value_usd,
+        tx_type="DEX Swap",
+        amount=swap_summary,
         tx_hash=signature,
-        dex_name="Jupiter/Raydium",
+        is_swap=True,
+        counterparty_name="Jupiter/Raydium",
+        quantity=quantity,
+        token_address=token_address,
+        legs=legs,
+        leg="swap",
     )
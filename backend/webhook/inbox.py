@@ -0,0 +1,175 @@
+"""웹훅 인박스 - 즉시 응답 + 백그라운드 처리
+
+서명/인증 검증이 끝난 웹훅 원본을 SQLite에 먼저 기록하고 바로 200을 반환한다.
+실제 처리(가격 조회, DB 조회, 텔레그램 전송)는 워커 풀이 인박스를 비우며 파이프라인에 넘기고,
+재시작 시 미처리 항목은 다시 큐에 올려 재처리한다.
+
+워커는 페이로드가 파이프라인 첫 단계 큐에 들어가면 바로 다음 항목으로 넘어간다.
+알림 묶음 대기(coalesce window)를 포함한 완료는 항목별 완료 태스크가 기다렸다가
+처리 완료/실패(재시도)로 표시하므로, 처리량이 워커 수 / 묶음 대기 시간에 묶이지 않는다.
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+from loguru import logger
+
+from db.crud import InboxCRUD
+from .moralis import process_moralis_webhook
+from .helius import process_helius_webhook
+from .pipeline import PipelineJob
+
+
+# 소스별 처리 함수 (파이프라인에 넘긴 경우 그 작업 반환, None이면 처리 완료)
+HANDLERS: dict[str, Callable[[object], Awaitable[Optional[PipelineJob]]]] = {
+    "moralis": process_moralis_webhook,
+    "helius": process_helius_webhook,
+}
+
+
+class WebhookInbox:
+    """영속 인박스 + 워커 풀
+
+    웹훅 서버와 같은 이벤트 루프에서 start()/stop() 해야 한다.
+    """
+
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = 5.0  # 초 (시도 횟수만큼 증가)
+
+    _queue: Optional[asyncio.Queue] = None
+    _workers: list[asyncio.Task] = []
+    # 파이프라인 완료를 기다리는 항목별 태스크
+    _completions: set[asyncio.Task] = set()
+
+    @classmethod
+    async def enqueue(cls, source: str, payload: str) -> int:
+        """웹훅 원본 저장 후 처리 큐에 등록
+
+        Returns:
+            인박스 항목 ID
+        """
+        entry_id = await InboxCRUD.add_entry(source, payload)
+
+        # 워커가 아직 없으면 DB에만 남기고 다음 start()에서 재처리
+        if cls._queue is not None:
+            cls._queue.put_nowait((entry_id, source, payload, 0))
+
+        return entry_id
+
+    @classmethod
+    async def start(cls, num_workers: int, retention_days: int = 3):
+        """워커 시작 + 미처리 항목 재등록"""
+        cls._queue = asyncio.Queue()
+
+        purged = await InboxCRUD.purge_processed(retention_days)
+        if purged:
+            logger.info(f"Inbox: purged {purged} processed entries")
+
+        pending = await InboxCRUD.get_pending()
+        for entry in pending:
+            cls._queue.put_nowait(
+                (entry["id"], entry["source"], entry["payload"], entry["attempts"])
+            )
+        if pending:
+            logger.info(f"Inbox: replaying {len(pending)} unprocessed entries")
+
+        cls._workers = [
+            asyncio.create_task(cls._worker(i)) for i in range(max(1, num_workers))
+        ]
+        logger.info(f"Inbox workers started: {len(cls._workers)}")
+
+    @classmethod
+    async def stop(cls):
+        """워커 종료 (처리 중이던 항목은 pending으로 남아 재시작시 재처리)"""
+        tasks = cls._workers + list(cls._completions)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        cls._workers = []
+        cls._completions.clear()
+        cls._queue = None
+        logger.info("Inbox workers stopped")
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        """대기 중인 항목 수"""
+        return cls._queue.qsize() if cls._queue else 0
+
+    @classmethod
+    def in_flight(cls) -> int:
+        """파이프라인 완료를 기다리는 항목 수"""
+        return len(cls._completions)
+
+    @classmethod
+    async def _worker(cls, worker_id: int):
+        """인박스 워커 루프"""
+        queue = cls._queue
+        while True:
+            entry_id, source, payload, attempts = await queue.get()
+            try:
+                await cls._process(entry_id, source, payload, attempts)
+            finally:
+                queue.task_done()
+
+    @classmethod
+    async def _process(cls, entry_id: int, source: str, payload: str, attempts: int):
+        """인박스 항목 1개 처리"""
+        handler = HANDLERS.get(source)
+        if handler is None:
+            logger.error(f"Inbox: unknown source '{source}' (entry {entry_id})")
+            await InboxCRUD.mark_failed(entry_id, f"unknown source: {source}", give_up=True)
+            return
+
+        try:
+            job = await handler(json.loads(payload))
+            if job is None:
+                await InboxCRUD.mark_done(entry_id)
+                return
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            await cls._fail(entry_id, source, payload, attempts, e)
+            return
+
+        task = asyncio.create_task(cls._complete(entry_id, source, payload, attempts, job))
+        cls._completions.add(task)
+        task.add_done_callback(cls._completions.discard)
+
+    @classmethod
+    async def _complete(cls, entry_id: int, source: str, payload: str, attempts: int, job: PipelineJob):
+        """파이프라인 작업 완료 후 처리 완료/실패 표시"""
+        try:
+            await job.wait()
+            await InboxCRUD.mark_done(entry_id)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            await cls._fail(entry_id, source, payload, attempts, e)
+
+    @classmethod
+    async def _fail(cls, entry_id: int, source: str, payload: str, attempts: int, error: Exception):
+        """실패 기록 + 재시도 예약 (MAX_ATTEMPTS에 닿으면 포기)"""
+        attempts += 1
+        give_up = attempts >= cls.MAX_ATTEMPTS
+        logger.error(
+            f"Inbox entry {entry_id} ({source}) failed "
+            f"[{attempts}/{cls.MAX_ATTEMPTS}]: {error}",
+            exc_info=True,
+        )
+        await InboxCRUD.mark_failed(entry_id, str(error), give_up=give_up)
+
+        if not give_up:
+            cls._schedule_retry((entry_id, source, payload, attempts))
+
+    @classmethod
+    def _schedule_retry(cls, item: tuple):
+        """지연 후 재시도 등록"""
+        queue = cls._queue
+        if queue is None:
+            return
+        delay = cls.RETRY_DELAY * item[3]
+        asyncio.get_running_loop().call_later(delay, queue.put_nowait, item)
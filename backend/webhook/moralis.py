@@ -1,12 +1,16 @@
-"""Moralis 웹훅 처리 - 실시간 가격 연동
+"""Moralis 웹훅 처리 - 페이로드 디코딩
 
 EVM 체인 트랜잭션 처리 (ETH, BSC, Polygon, Arbitrum, Base, Optimism, Avalanche)
 """
+from typing import Optional
 from loguru import logger
 
 from config import SUPPORTED_CHAINS, DEX_CONTRACTS
-from services.price_service import PriceService
-from .processor import TransactionProcessor, TransferInfo
+from db.wallet_index import WalletIndex
+from services.token_metadata import TokenMetadataService
+from .processor import TransferInfo
+from .valuation import SwapLeg
+from .pipeline import PipelineJob, submit_pipeline
 
 
 # 체인별 네이티브 토큰 심볼
@@ -21,11 +25,16 @@ NATIVE_SYMBOLS = {
 }
 
 
-async def process_moralis_webhook(data: dict):
-    """Moralis 웹훅 데이터 처리"""
+async def process_moralis_webhook(data: dict) -> PipelineJob:
+    """Moralis 웹훅 데이터 처리 (파이프라인 투입, 완료는 반환된 작업으로 확인)"""
+    return await submit_pipeline("moralis", data)
+
+
+async def decode_moralis_webhook(data: dict) -> list[TransferInfo]:
+    """Moralis 웹훅 데이터를 전송 목록으로 디코딩"""
     if not data.get("confirmed"):
         logger.debug("Skipping unconfirmed transaction")
-        return
+        return []
 
     txs = data.get("txs", [])
     erc20_transfers = data.get("erc20Transfers", [])
@@ -40,93 +49,129 @@ async def process_moralis_webhook(data: dict):
 
     if not chain_code:
         logger.warning(f"Unknown chain ID: {chain_id}")
-        return
+        return []
 
     logger.info(f"Processing {len(txs)} txs, {len(erc20_transfers)} token transfers on {chain_code}")
 
-    # 네이티브 트랜잭션 처리
+    transfers = []
+
+    # 페이로드의 토큰 메타데이터를 캐시에 기록 (스왑 로그 디코딩 시 RPC 절약)
+    for transfer in erc20_transfers:
+        if transfer.get("tokenDecimals") not in (None, ""):
+            TokenMetadataService.remember(
+                chain_code,
+                transfer.get("contract", ""),
+                symbol=transfer.get("tokenSymbol") or "???",
+                name=transfer.get("tokenName") or "Unknown",
+                decimals=int(transfer["tokenDecimals"]),
+            )
+
+    # 네이티브 트랜잭션
     for tx in txs:
-        await process_native_tx(tx, chain_code)
+        info = await decode_native_tx(tx, chain_code, erc20_transfers)
+        if info:
+            transfers.append(info)
 
-    # ERC20 전송 처리
+    # ERC20 전송
     for transfer in erc20_transfers:
-        await process_erc20_transfer(transfer, chain_code)
+        transfers.append(decode_erc20_transfer(transfer, chain_code))
 
+    return transfers
 
-async def process_native_tx(tx: dict, chain: str):
-    """네이티브 트랜잭션 처리"""
+
+async def decode_native_tx(
+    tx: dict,
+    chain: str,
+    erc20_transfers: Optional[list] = None
+) -> Optional[TransferInfo]:
+    """네이티브 트랜잭션 디코딩 (erc20_transfers: 스왑 레그 추출용)"""
     from_addr = tx.get("fromAddress", "").lower()
     to_addr = tx.get("toAddress", "").lower()
     value_wei = int(tx.get("value", 0))
     tx_hash = tx.get("hash", "")
 
-    # 값이 없으면 스킵 (컨트랙트 호출일 수 있음)
+    # 값이 없으면 스왑 확인 (컨트랙트 호출일 수 있음)
     if value_wei == 0:
-        await check_dex_swap(tx, chain)
-        return
+        return await decode_dex_swap(tx, chain, erc20_transfers or [])
 
     # ETH 단위로 변환
     value_eth = value_wei / 1e18
     symbol = NATIVE_SYMBOLS.get(chain, "???")
 
-    # 실시간 USD 가격 조회
-    value_usd = await PriceService.get_usd_value(chain, value_eth)
-
-    logger.debug(
-        f"Native tx: {from_addr[:10]}... -> {to_addr[:10]}... "
-        f"| {value_eth:.4f} {symbol} (${value_usd:.2f})"
+    return TransferInfo(
+        from_addr=from_addr,
+        to_addr=to_addr,
+        chain=chain,
+        tx_type="Transfer",
+        amount=f"{value_eth:.4f} {symbol}",
+        tx_hash=tx_hash,
+        quantity=value_eth,
+        symbol=symbol,
+        leg="native",
     )
 
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_transfer(
-        TransferInfo(
-            from_addr=from_addr,
-            to_addr=to_addr,
-            chain=chain,
-            tx_type="Transfer",
-            amount=f"{value_eth:.4f} {symbol}",
-            amount_usd=value_usd,
-            tx_hash=tx_hash,
-        )
-    )
+
+def _erc20_amount(transfer: dict) -> float:
+    """ERC20 전송 수량 (decimals 반영)"""
+    value = int(transfer.get("value", 0))
+    decimals = int(transfer.get("tokenDecimals", 18))
+    return value / (10 ** decimals)
 
 
-async def process_erc20_transfer(transfer: dict, chain: str):
-    """ERC20 전송 처리"""
+def decode_erc20_transfer(transfer: dict, chain: str) -> TransferInfo:
+    """ERC20 전송 디코딩"""
     from_addr = transfer.get("from", "").lower()
     to_addr = transfer.get("to", "").lower()
-    value = int(transfer.get("value", 0))
-    decimals = int(transfer.get("tokenDecimals", 18))
     symbol = transfer.get("tokenSymbol", "???")
     contract_address = transfer.get("contract", "").lower()
     tx_hash = transfer.get("transactionHash", "")
 
-    amount = value / (10 ** decimals)
+    amount = _erc20_amount(transfer)
 
-    # 실시간 토큰 USD 가격 조회
-    value_usd = await PriceService.get_usd_value(chain, amount, contract_address)
-
-    logger.debug(
-        f"ERC20 tx: {from_addr[:10]}... -> {to_addr[:10]}... "
-        f"| {amount:.4f} {symbol} (${value_usd:.2f})"
+    return TransferInfo(
+        from_addr=from_addr,
+        to_addr=to_addr,
+        chain=chain,
+        tx_type="Token Transfer",
+        amount=f"{amount:.4f} {symbol}",
+        tx_hash=tx_hash,
+        quantity=amount,
+        token_address=contract_address,
+        symbol=symbol,
+        leg=f"erc20:{transfer.get('logIndex', contract_address)}",
     )
 
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_transfer(
-        TransferInfo(
-            from_addr=from_addr,
-            to_addr=to_addr,
-            chain=chain,
-            tx_type="Token Transfer",
-            amount=f"{amount:.4f} {symbol}",
-            amount_usd=value_usd,
-            tx_hash=tx_hash,
+
+def collect_swap_legs(tx_hash: str, swapper: str, erc20_transfers: list) -> tuple[list, list]:
+    """같은 트랜잭션의 ERC20 전송 중 스왑 실행자가 보낸/받은 레그
+
+    Returns:
+        (보낸 레그 목록, 받은 레그 목록)
+    """
+    sent, received = [], []
+    for transfer in erc20_transfers:
+        if transfer.get("transactionHash", "").lower() != tx_hash.lower():
+            continue
+
+        leg = SwapLeg(
+            token_address=transfer.get("contract", "").lower(),
+            quantity=_erc20_amount(transfer),
         )
-    )
+        if transfer.get("from", "").lower() == swapper:
+            sent.append(leg)
+        elif transfer.get("to", "").lower() == swapper:
+            received.append(leg)
+
+    return sent, received
 
 
-async def check_dex_swap(tx: dict, chain: str):
-    """DEX 스왑 감지"""
+async def decode_dex_swap(tx: dict, chain: str, erc20_transfers: list) -> Optional[TransferInfo]:
+    """DEX 스왑 감지
+
+    USD 가치는 같은 트랜잭션 ERC20 전송에서 뽑은 레그로 계산한다
+    (스테이블/래핑 네이티브 레그가 없으면 보낸 토큰 가격 조회로 폴백).
+    ERC20 전송에 없는 쪽(토큰 -> 네이티브 스왑의 WETH 출력 등)은 스왑 로그의 입출력으로 보충한다.
+    """
     to_addr = tx.get("toAddress", "").lower()
     from_addr = tx.get("fromAddress", "").lower()
     tx_hash = tx.get("hash", "")
@@ -141,100 +186,139 @@ async def check_dex_swap(tx: dict, chain: str):
             break
 
     if not dex_name:
-        return
+        return None
+
+    # 스왑 알림은 실행자에게만 가므로, 추적하지 않는 실행자면 로그 파싱(풀/메타데이터 RPC) 생략
+    if not WalletIndex.is_watched(from_addr):
+        return None
 
     # 스왑 상세 파싱 시도
     swap_details = await parse_swap_logs(logs, chain)
     swap_summary = swap_details.get("summary", "Unknown swap")
-    value_usd = swap_details.get("usd_value", 0)
+
+    sent, received = collect_swap_legs(tx_hash, from_addr, erc20_transfers)
+    seen = {leg.token_address for leg in sent + received}
+    for side, legs in (("in", sent), ("out", received)):
+        token = swap_details[f"token_{side}"]
+        amount = swap_details[f"amount_{side}"]
+        if token and amount > 0 and token.lower() not in seen:
+            legs.append(SwapLeg(token_address=token.lower(), quantity=amount))
 
     logger.info(f"DEX Swap detected: {dex_name} | {swap_summary}")
 
-    # 공통 프로세서로 알림 처리
-    await TransactionProcessor.process_swap(
+    return TransferInfo(
         from_addr=from_addr,
+        to_addr="",
         chain=chain,
-        swap_summary=swap_summary,
-        amount_usd=value_usd,
+        tx_type="DEX Swap",
+        amount=swap_summary,
         tx_hash=tx_hash,
-        dex_name=dex_name,
+        is_swap=True,
+        counterparty_name=dex_name,
+        quantity=sent[0].quantity if sent else 0.0,
+        token_address=sent[0].token_address if sent else None,
+        legs=sent + received,
+        leg="swap",
     )
 
 
+# Uniswap V2 Swap 이벤트 시그니처
+SWAP_V2_TOPIC = "0xd78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822"
+# Uniswap V3 Swap 이벤트 시그니처
+SWAP_V3_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+
+
+def _decode_swap_amounts(topic0: str, data: str) -> Optional[tuple[int, int, bool]]:
+    """스왑 로그 data -> (입력 raw 수량, 출력 raw 수량, 입력이 token0인지)"""
+    if topic0 == SWAP_V2_TOPIC:
+        if not data or len(data) < 258:
+            return None
+        # data format: amount0In, amount1In, amount0Out, amount1Out
+        amount0_in = int(data[2:66], 16)
+        amount1_in = int(data[66:130], 16)
+        amount0_out = int(data[130:194], 16)
+        amount1_out = int(data[194:258], 16)
+
+        if amount0_in > 0 and amount1_out > 0:
+            return amount0_in, amount1_out, True
+        if amount1_in > 0 and amount0_out > 0:
+            return amount1_in, amount0_out, False
+        logger.debug("V2 swap: both amounts are 0, skipping")
+        return None
+
+    if topic0 == SWAP_V3_TOPIC:
+        if not data or len(data) < 194:
+            return None
+        # amount0, amount1 (signed int256, 양수 = 풀이 받은 수량)
+        amount0 = int(data[2:66], 16)
+        amount1 = int(data[66:130], 16)
+        if amount0 >= 2**255:
+            amount0 -= 2**256
+        if amount1 >= 2**255:
+            amount1 -= 2**256
+
+        if amount0 == 0 and amount1 == 0:
+            logger.debug("V3 swap: both amounts are 0, skipping")
+            return None
+        if amount0 < 0:
+            return max(amount1, 0), abs(amount0), False
+        return amount0, abs(amount1), True
+
+    return None
+
+
 async def parse_swap_logs(logs: list, chain: str) -> dict:
-    """스왑 로그 파싱하여 상세 정보 추출"""
-    # Uniswap V2 Swap 이벤트 시그니처
-    SWAP_V2_TOPIC = "0xd78ad95fa46c994b6551d0da85fc275fe613ce37657fb8d5e3d130840159d822"
-    # Uniswap V3 Swap 이벤트 시그니처
-    SWAP_V3_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+    """스왑 로그 파싱하여 상세 정보 추출
 
+    풀의 token0/token1과 토큰 decimals/심볼은 TokenMetadataService에서 가져온다
+    (처음 보는 풀/토큰만 Multicall3로 조회, 이후에는 RPC 없음).
+    멀티홉 스왑은 첫 홉의 입력과 마지막 홉의 출력을 사용한다.
+    """
     result = {
         "token_in": None,
         "token_out": None,
         "amount_in": 0,
         "amount_out": 0,
         "summary": "",
-        "usd_value": 0,
     }
 
+    swaps = []
     for log in logs:
-        topic0 = log.get("topic0", "")
-
-        if topic0 == SWAP_V2_TOPIC:
-            # Uniswap V2 Swap 이벤트 파싱
-            try:
-                data = log.get("data", "")
-                if data and len(data) >= 258:
-                    # data format: amount0In, amount1In, amount0Out, amount1Out
-                    amount0_in = int(data[2:66], 16)
-                    amount1_in = int(data[66:130], 16)
-                    amount0_out = int(data[130:194], 16)
-                    amount1_out = int(data[194:258], 16)
-
-                    # 0 값 체크 후 안전하게 처리
-                    if amount0_in > 0 and amount1_out > 0:
-                        result["amount_in"] = amount0_in / 1e18
-                        result["amount_out"] = amount1_out / 1e18
-                    elif amount1_in > 0 and amount0_out > 0:
-                        result["amount_in"] = amount1_in / 1e18
-                        result["amount_out"] = amount0_out / 1e18
-                    else:
-                        logger.debug("V2 swap: both amounts are 0, skipping")
-                        continue
-
-                    result["summary"] = f"{result['amount_in']:.4f} -> {result['amount_out']:.4f}"
-            except Exception as e:
-                logger.debug(f"Failed to parse V2 swap log: {e}")
-
-        elif topic0 == SWAP_V3_TOPIC:
-            # Uniswap V3 Swap 이벤트 파싱
-            try:
-                data = log.get("data", "")
-                if data and len(data) >= 194:
-                    # amount0, amount1 (signed int256)
-                    amount0 = int(data[2:66], 16)
-                    amount1 = int(data[66:130], 16)
-
-                    # signed 변환 (uint256 -> int256)
-                    if amount0 >= 2**255:
-                        amount0 -= 2**256
-                    if amount1 >= 2**255:
-                        amount1 -= 2**256
-
-                    # 둘 다 0이면 스킵
-                    if amount0 == 0 and amount1 == 0:
-                        logger.debug("V3 swap: both amounts are 0, skipping")
-                        continue
-
-                    if amount0 < 0:
-                        result["amount_out"] = abs(amount0) / 1e18
-                        result["amount_in"] = max(amount1, 0) / 1e18
-                    else:
-                        result["amount_in"] = amount0 / 1e18
-                        result["amount_out"] = abs(amount1) / 1e18
-
-                    result["summary"] = f"{result['amount_in']:.4f} -> {result['amount_out']:.4f}"
-            except Exception as e:
-                logger.debug(f"Failed to parse V3 swap log: {e}")
+        try:
+            amounts = _decode_swap_amounts(log.get("topic0", ""), log.get("data", ""))
+        except Exception as e:
+            logger.debug(f"Failed to parse swap log: {e}")
+            continue
+        if amounts:
+            swaps.append((log.get("address", "").lower(), *amounts))
+
+    if not swaps:
+        return result
+
+    first_pool, raw_in, _, in_is_token0 = swaps[0]
+    last_pool, _, raw_out, last_in_is_token0 = swaps[-1]
+
+    pools = await TokenMetadataService.get_pool_tokens(chain, [first_pool, last_pool])
+    token_in = token_out = None
+    if first_pool in pools:
+        token_in = pools[first_pool][0 if in_is_token0 else 1]
+    if last_pool in pools:
+        token_out = pools[last_pool][1 if last_in_is_token0 else 0]
+
+    metadata = await TokenMetadataService.get_many(chain, [t for t in (token_in, token_out) if t])
+    meta_in = metadata.get(token_in) if token_in else None
+    meta_out = metadata.get(token_out) if token_out else None
+
+    # 메타데이터를 못 구하면 18 decimals로 가정
+    result["token_in"] = token_in
+    result["token_out"] = token_out
+    result["amount_in"] = raw_in / 10 ** (meta_in.decimals if meta_in else 18)
+    result["amount_out"] = raw_out / 10 ** (meta_out.decimals if meta_out else 18)
+
+    symbol_in = f" {meta_in.symbol}" if meta_in else ""
+    symbol_out = f" {meta_out.symbol}" if meta_out else ""
+    result["summary"] = (
+        f"{result['amount_in']:.4f}{symbol_in} -> {result['amount_out']:.4f}{symbol_out}"
+    )
 
     return result
@@ -1,6 +1,5 @@
 """텔레그램 알림 전송"""
 from telegram import Bot
-from loguru import logger
 
 from config import settings, SUPPORTED_CHAINS
 
@@ -16,8 +15,7 @@ def get_bot() -> Bot:
     return _bot
 
 
-async def send_notification(
-    user_id: int,
+def format_notification(
     label: str,
     chain: str,
     tx_type: str,
@@ -27,17 +25,9 @@ async def send_notification(
     counterparty: str,
     tx_hash: str,
     is_swap: bool = False,
-):
-    """텔레그램 알림 전송"""
-    chain_info = SUPPORTED_CHAINS.get(chain, {})
-    chain_name = chain_info.get("name", chain.upper())
-    explorer = chain_info.get("explorer", "")
-
-    # 탐색기 URL 생성
-    if chain == "sol":
-        tx_url = f"https://{explorer}/tx/{tx_hash}"
-    else:
-        tx_url = f"https://{explorer}/tx/{tx_hash}"
+) -> str:
+    """알림 메시지 생성 (HTML)"""
+    chain_name, tx_url = _chain_links(chain, tx_hash)
 
     # 메시지 구성
     if is_swap:
@@ -70,17 +60,95 @@ DEX: {counterparty}
 <a href="{tx_url}">트랜잭션 보기</a>
 """
 
-    try:
-        bot = get_bot()
-        await bot.send_message(
-            chat_id=user_id,
-            text=message.strip(),
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-        )
-        logger.info(f"Notification sent to {user_id}: {label} {tx_type}")
-    except Exception as e:
-        logger.error(
-            f"Failed to send notification to user {user_id} ({label}): {e}",
-            exc_info=True
-        )
+    return message.strip()
+
+
+def format_grouped_notification(chain: str, tx_hash: str, items: list[dict]) -> str:
+    """같은 트랜잭션의 알림 여러 건을 한 메시지로 생성 (HTML)
+
+    Args:
+        items: label, tx_type, direction, amount, amount_usd, counterparty, is_swap
+    """
+    chain_name, tx_url = _chain_links(chain, tx_hash)
+    labels = list(dict.fromkeys(item["label"] for item in items))
+    # 지갑이 여러 개 섞이면 줄마다 지갑 이름 표시
+    show_label = len(labels) > 1
+
+    lines = []
+    for item in items:
+        prefix = f"[{item['label']}] " if show_label else ""
+        if item["is_swap"]:
+            lines.append(f"\U0001F504 {prefix}스왑 ({item['counterparty']}): {item['amount']}")
+            continue
+
+        counterparty = item["counterparty"]
+        short_addr = f"{counterparty[:10]}...{counterparty[-6:]}" if len(counterparty) > 20 else counterparty
+        usd_text = f" (${item['amount_usd']:,.0f})" if item["amount_usd"] > 0 else ""
+        if item["direction"] == "OUT":
+            lines.append(f"\U0001F514 {prefix}OUT {item['amount']}{usd_text} → <code>{short_addr}</code>")
+        else:
+            lines.append(f"\U0001F4E5 {prefix}IN {item['amount']}{usd_text} ← <code>{short_addr}</code>")
+
+    body = "\n".join(lines)
+    message = f"""
+<b>[{", ".join(labels)}] 트랜잭션 감지! ({len(items)}건)</b>
+
+체인: {chain_name}
+{body}
+
+<a href="{tx_url}">트랜잭션 보기</a>
+"""
+    return message.strip()
+
+
+def format_digest_notification(
+    label: str,
+    chain: str,
+    seconds: float,
+    counts: dict[str, int],
+    net_flows: list[tuple[str, float, float]],
+    net_usd: float,
+    top: list[dict],
+) -> str:
+    """요약 알림 메시지 생성 (HTML)
+
+    Args:
+        counts: 방향(IN/OUT/SWAP)별 건수
+        net_flows: (심볼, 순수량, 순 USD) - 양수는 유입
+        top: 큰 전송 목록 (direction, amount, amount_usd, tx_hash)
+    """
+    chain_name, _ = _chain_links(chain, "")
+    total = sum(counts.values())
+    count_text = " / ".join(f"{key} {value}" for key, value in counts.items() if value)
+
+    lines = [
+        f"\U0001F4CA <b>[{label}] 요약 알림</b>",
+        "",
+        f"체인: {chain_name}",
+        f"기간: 최근 {seconds:.0f}초 | {total}건 ({count_text})",
+    ]
+
+    if net_flows:
+        lines += ["", "<b>순유입</b>"]
+        for symbol, quantity, usd in net_flows:
+            usd_text = f" (${usd:+,.0f})" if usd else ""
+            lines.append(f"{symbol}: {quantity:+,.4f}{usd_text}")
+        if net_usd:
+            lines.append(f"합계: ${net_usd:+,.0f}")
+
+    if top:
+        lines += ["", "<b>주요 전송</b>"]
+        for item in top:
+            _, tx_url = _chain_links(chain, item["tx_hash"])
+            usd_text = f" (${item['amount_usd']:,.0f})" if item["amount_usd"] > 0 else ""
+            lines.append(f'{item["direction"]} {item["amount"]}{usd_text} <a href="{tx_url}">tx</a>')
+
+    return "\n".join(lines)
+
+
+def _chain_links(chain: str, tx_hash: str) -> tuple[str, str]:
+    """체인 표시 이름 + 탐색기 트랜잭션 URL"""
+    chain_info = SUPPORTED_CHAINS.get(chain, {})
+    chain_name = chain_info.get("name", chain.upper())
+    explorer = chain_info.get("explorer", "")
+    return chain_name, f"https://{explorer}/tx/{tx_hash}"
@@ -0,0 +1,250 @@
+"""알림 아웃박스 - 렌더링된 알림의 영속 저장 + 최소 1회 전송
+
+deliver 단계는 알림을 전송 큐에 바로 넣지 않고 SQLite(notification_outbox)에 먼저
+커밋한 뒤 전송을 시작한다. 전송 결과에 따라 sent로 표시하거나, 백오프 후 재시도,
+N회 실패하면 dead-letter(dead)로 남긴다. 재시작 시 미전송 항목은 스위퍼가 다시 보낸다.
+
+중복 방지 키는 알림이 다루는 개별 전송(레그)마다 (user_id, tx_hash, direction, leg)이다.
+- 공급자의 웹훅 재전송이나 인박스 재처리로 같은 전송이 다시 들어와도 INSERT가 무시된다
+- leg는 한 트랜잭션 안의 개별 전송(네이티브/ERC20 로그/SPL 전송 등) 구분자로,
+  같은 tx에서 같은 방향으로 여러 토큰이 움직여도 알림이 합쳐지지 않는다
+- 여러 레그를 묶은 알림은 모든 레그가 이미 저장돼 있을 때만 중복으로 본다
+  (재처리 때 묶음 구성이 달라져도 같은 전송을 다시 보내지 않음)
+- 일부 레그만 저장돼 있으면 LegConflictError - 호출자가 남은 레그만으로 다시 렌더링해 저장
+
+sent 직전에 프로세스가 죽으면 재시작 후 한 번 더 보낼 수 있다 (최소 1회 전송).
+
+인기 지갑 알림처럼 deliver 워커들이 동시에 저장하면 대기 중인 저장을 모아
+커밋 1회로 처리한다 (그룹 커밋 - 전송 대기 시간이 SQLite 커밋 횟수에 비례하지 않음).
+행마다 SAVEPOINT를 두므로 저장에 실패한 행만 되돌리고 그 알림의 요청만 실패한다.
+"""
+import asyncio
+import time
+from typing import Optional
+from loguru import logger
+
+from db.crud import OutboxCRUD
+from .delivery import enqueue_notification
+
+
+class NotificationOutbox:
+    """영속 아웃박스 + 재시도 스위퍼
+
+    웹훅 서버와 같은 이벤트 루프에서 start()/stop() 해야 한다.
+    """
+
+    RETRY_MAX_DELAY = 3600.0  # 초
+    # 새 항목은 저장 직후 바로 전송하므로 이 시간 동안 스위퍼 대상에서 제외
+    # (전송 전에 죽으면 이후 스위퍼가 재전송)
+    DISPATCH_LEASE = 60.0
+
+    max_attempts: int = 5
+    retry_base_delay: float = 30.0  # 초 (시도마다 2배)
+    sweep_interval: float = 5.0
+
+    _sweeper: Optional[asyncio.Task] = None
+    # 그룹 커밋 대기 (행, 결과 Future)
+    _pending_writes: list[tuple[tuple, asyncio.Future]] = []
+    _writer: Optional[asyncio.Task] = None
+    # 전송 중인 항목 (스위퍼가 중복으로 보내지 않도록)
+    _inflight: dict[int, asyncio.Task] = {}
+    stats = {
+        "queued": 0, "duplicates": 0, "sent": 0, "retried": 0, "dead": 0,
+        "commits": 0,
+    }
+
+    @classmethod
+    async def add(
+        cls,
+        user_id: int,
+        tx_hash: str,
+        legs: list[tuple[str, str]],
+        label: str,
+        text: str
+    ) -> Optional[int]:
+        """알림 저장 후 전송 시작 (전송은 커밋 직후 _flush_writes가 시작)
+
+        Args:
+            legs: 알림이 다루는 전송의 (direction, leg) 목록
+
+        Returns:
+            아웃박스 항목 ID (모든 레그가 이미 저장된 알림이면 None)
+
+        Raises:
+            LegConflictError: 레그 일부가 이미 다른 알림으로 저장된 경우
+        """
+        entry_id = await cls._write((user_id, tx_hash, legs, label, text))
+        if entry_id is None:
+            cls.stats["duplicates"] += 1
+            legs_str = ", ".join(f"{direction or 'SWAP'} {leg}" for direction, leg in legs)
+            logger.debug(f"[DUP] {label}: {tx_hash[:16]}... {legs_str}")
+        return entry_id
+
+    @classmethod
+    async def _write(cls, row: tuple) -> Optional[int]:
+        """저장 요청 (진행 중인 커밋이 있으면 다음 커밋에 합류)"""
+        future = asyncio.get_running_loop().create_future()
+        cls._pending_writes.append((row, future))
+        if cls._writer is None:
+            cls._writer = asyncio.create_task(cls._flush_writes())
+        return await future
+
+    @classmethod
+    async def _flush_writes(cls):
+        """대기 중인 저장을 모아 커밋 (빌 때까지 반복)"""
+        try:
+            while cls._pending_writes:
+                # 같은 틱에 들어온 저장 요청이 합류하도록 양보
+                await asyncio.sleep(0)
+                batch, cls._pending_writes = cls._pending_writes, []
+                try:
+                    entry_ids = await OutboxCRUD.add_entries(
+                        [row for row, _ in batch], time.time() + cls.DISPATCH_LEASE
+                    )
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                cls.stats["commits"] += 1
+                for (row, future), entry_id in zip(batch, entry_ids):
+                    if isinstance(entry_id, Exception):
+                        # 이 행만 롤백됨 (같은 배치의 다른 행은 저장)
+                        if not future.done():
+                            future.set_exception(entry_id)
+                        continue
+                    # 스위퍼가 없으면 DB에만 남기고 다음 start()에서 전송
+                    if entry_id is not None:
+                        cls.stats["queued"] += 1
+                        if cls._sweeper is not None:
+                            user_id, _, _, label, text = row
+                            cls._dispatch(entry_id, user_id, label, text, attempts=0)
+                    if not future.done():
+                        future.set_result(entry_id)
+        finally:
+            cls._writer = None
+
+    @classmethod
+    def _dispatch(cls, entry_id: int, user_id: int, label: str, text: str, attempts: int):
+        """전송 태스크 시작"""
+        task = asyncio.create_task(cls._send(entry_id, user_id, label, text, attempts))
+        cls._inflight[entry_id] = task
+        task.add_done_callback(lambda _: cls._inflight.pop(entry_id, None))
+
+    @classmethod
+    async def _send(cls, entry_id: int, user_id: int, label: str, text: str, attempts: int):
+        """전송 큐에 넣고 결과를 아웃박스에 기록"""
+        try:
+            future = await enqueue_notification(user_id, text, label)
+            result = await future
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 전송 큐 미동작 등 - 재시도 대상
+            logger.warning(f"Outbox #{entry_id}: enqueue failed: {e}")
+            await cls._record_failure(entry_id, label, attempts, str(e), permanent=False)
+            return
+
+        if result.ok:
+            await OutboxCRUD.mark_sent(entry_id)
+            cls.stats["sent"] += 1
+        else:
+            await cls._record_failure(entry_id, label, attempts, result.error, result.permanent)
+
+    @classmethod
+    async def _record_failure(
+        cls,
+        entry_id: int,
+        label: str,
+        attempts: int,
+        error: str,
+        permanent: bool
+    ):
+        """실패 기록 (백오프 후 재시도 또는 dead-letter)"""
+        attempts += 1
+        give_up = permanent or attempts >= cls.max_attempts
+        delay = min(cls.retry_base_delay * 2 ** (attempts - 1), cls.RETRY_MAX_DELAY)
+
+        await OutboxCRUD.mark_failed(entry_id, error, time.time() + delay, give_up)
+
+        if give_up:
+            cls.stats["dead"] += 1
+            logger.error(
+                f"Outbox #{entry_id} ({label}) dead-lettered after {attempts} attempts: {error}"
+            )
+        else:
+            cls.stats["retried"] += 1
+            logger.warning(
+                f"Outbox #{entry_id} ({label}) failed [{attempts}/{cls.max_attempts}], "
+                f"retry in {delay:.0f}s: {error}"
+            )
+
+    @classmethod
+    async def _sweep_loop(cls):
+        """전송 시각이 된 미전송 항목을 주기적으로 재전송"""
+        while True:
+            try:
+                for entry in await OutboxCRUD.get_due(time.time()):
+                    if entry["id"] in cls._inflight:
+                        continue
+                    cls._dispatch(
+                        entry["id"], entry["user_id"], entry["label"], entry["text"],
+                        attempts=entry["attempts"],
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox sweep failed: {e}")
+
+            await asyncio.sleep(cls.sweep_interval)
+
+    @classmethod
+    async def start(
+        cls,
+        max_attempts: int,
+        retry_base_delay: float,
+        sweep_interval: float,
+        retention_days: int = 3
+    ):
+        """스위퍼 시작 (첫 스윕에서 이전 실행의 미전송 항목 재전송)"""
+        cls.max_attempts = max_attempts
+        cls.retry_base_delay = retry_base_delay
+        cls.sweep_interval = sweep_interval
+
+        purged = await OutboxCRUD.purge_sent(retention_days)
+        if purged:
+            logger.info(f"Outbox: purged {purged} sent entries")
+
+        released = await OutboxCRUD.release_leases()
+        if released:
+            logger.info(f"Outbox: resending {released} unsent entries")
+
+        cls._sweeper = asyncio.create_task(cls._sweep_loop())
+        logger.info(
+            f"Outbox started (max {max_attempts} attempts, sweep every {sweep_interval:.0f}s)"
+        )
+
+    @classmethod
+    async def stop(cls):
+        """스위퍼 종료 (결과를 기다리던 항목은 pending으로 남아 재시작 시 재전송)"""
+        tasks = list(cls._inflight.values())
+        if cls._sweeper is not None:
+            tasks.append(cls._sweeper)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        cls._sweeper = None
+        cls._inflight.clear()
+        logger.info("Outbox stopped")
+
+    @classmethod
+    async def get_stats(cls) -> dict:
+        """아웃박스 통계 (상태별 항목 수 포함)"""
+        return {
+            **cls.stats,
+            "inflight": len(cls._inflight),
+            "by_status": await OutboxCRUD.count_by_status(),
+        }
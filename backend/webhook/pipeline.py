@@ -0,0 +1,385 @@
+"""웹훅 이벤트 파이프라인 - 단계별 비동기 처리
+
+decode → match → enrich → digest → coalesce → render → deliver 단계를 bounded asyncio.Queue로 연결한다.
+각 단계는 자체 워커 수(동시성)를 가지므로 지갑 매칭, 가격 조회, 텔레그램 전송이
+여러 전송에 걸쳐 겹쳐서 실행되고, 느린 단계가 있으면 큐가 차면서 상위 단계에
+자연스럽게 backpressure가 걸린다.
+
+digest 단계는 빈도가 높은 지갑의 알림을 요약 버퍼로 빼내고 (webhook.digest),
+coalesce 단계는 같은 (사용자, 트랜잭션) 알림을 짧은 시간 모아 한 메시지로 합친다
+(OUT/IN 양쪽 추적, 스왑 + 토큰 전송 등 - 텔레그램 호출 수 감소).
+"""
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Union
+from loguru import logger
+
+from config import settings
+from .digest import DigestBuffer
+from .processor import NotificationGroup, TransactionProcessor
+
+# 핸들러: 입력 1개 -> 다음 단계로 넘길 항목 리스트 (마지막 단계는 None)
+StageHandler = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+
+
+class PipelineError(Exception):
+    """파이프라인 처리 중 단계 에러 발생"""
+
+
+class PipelineJob:
+    """웹훅 페이로드 1건의 처리 추적
+
+    단계에서 항목이 여러 개로 분기되면 대기 카운트를 늘리고, 항목이 마지막 단계를
+    통과하거나 중간에 걸러지면 줄인다. 0이 되면 페이로드 처리가 끝난 것.
+    """
+
+    def __init__(self):
+        self._pending = 1
+        self.errors: list[str] = []
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def fork(self, count: int):
+        """항목 분기 (count개 추가)"""
+        self._pending += count
+
+    def finish(self, error: Optional[str] = None):
+        """항목 1개 처리 종료"""
+        if error:
+            self.errors.append(error)
+        self._pending -= 1
+        if self._pending <= 0 and not self.done.done():
+            self.done.set_result(None)
+
+    async def wait(self):
+        """파생 항목이 모두 끝날 때까지 대기
+
+        Raises:
+            PipelineError: 처리 중 단계 에러가 있었던 경우
+        """
+        await self.done
+        if self.errors:
+            raise PipelineError("; ".join(self.errors[:3]))
+
+
+class MergedJob:
+    """여러 작업의 항목이 하나로 합쳐진 경우의 추적 (모든 원래 작업에 전파)"""
+
+    def __init__(self, jobs: list[PipelineJob]):
+        self.jobs = jobs
+
+    def fork(self, count: int):
+        for job in self.jobs:
+            job.fork(count)
+
+    def finish(self, error: Optional[str] = None):
+        for job in self.jobs:
+            job.finish(error)
+
+
+AnyJob = Union[PipelineJob, MergedJob]
+
+
+@dataclass
+class StageStats:
+    """단계별 처리 통계"""
+    processed: int = 0
+    emitted: int = 0
+    dropped: int = 0
+    errors: int = 0
+    in_flight: int = 0
+
+
+class Stage:
+    """파이프라인 단계 (bounded 입력 큐 + 워커 N개)"""
+
+    def __init__(self, name: str, handler: StageHandler, concurrency: int, queue_size: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.next: Optional["Stage"] = None
+        self.stats = StageStats()
+        self._workers: list[asyncio.Task] = []
+
+    async def put(self, job: PipelineJob, item: Any):
+        """항목 투입 (큐가 가득 차면 대기 = backpressure)"""
+        await self.queue.put((job, item))
+
+    def start(self):
+        """워커 시작"""
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """워커 종료"""
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def snapshot(self) -> dict:
+        """현재 상태 (큐 깊이 + 통계)"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_max": self.queue.maxsize,
+            "concurrency": self.concurrency,
+            **asdict(self.stats),
+        }
+
+    async def _worker(self):
+        """단계 워커 루프"""
+        while True:
+            job, item = await self.queue.get()
+            self.stats.in_flight += 1
+            try:
+                await self._handle(job, item)
+            finally:
+                self.stats.in_flight -= 1
+                self.queue.task_done()
+
+    async def _handle(self, job: PipelineJob, item: Any):
+        """항목 1개 처리 후 다음 단계로 전달"""
+        try:
+            outputs = await self.handler(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Pipeline stage '{self.name}' failed: {e}", exc_info=True)
+            job.finish(f"{self.name}: {e}")
+            return
+
+        self.stats.processed += 1
+
+        # 마지막 단계
+        if self.next is None:
+            job.finish()
+            return
+
+        outputs = list(outputs or [])
+        if not outputs:
+            self.stats.dropped += 1
+            job.finish()
+            return
+
+        job.fork(len(outputs) - 1)
+        self.stats.emitted += len(outputs)
+        for output in outputs:
+            await self.next.put(job, output)
+
+
+class CoalescingStage(Stage):
+    """같은 키의 항목을 window초 동안 모아 하나로 합치는 단계
+
+    키의 첫 항목이 들어온 뒤 window초가 지나면 모인 항목 목록을 merge()로 합쳐
+    다음 단계에 넘긴다. 여러 페이로드(작업)의 항목이 합쳐지면 MergedJob으로
+    모든 작업의 완료를 함께 추적한다. window가 0이면 항목별로 바로 넘긴다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: Callable[[Any], Hashable],
+        merge: Callable[[list], Any],
+        window: float,
+        queue_size: int
+    ):
+        # 버퍼링만 하므로 워커 1개로 충분
+        super().__init__(name, handler=None, concurrency=1, queue_size=queue_size)
+        self.key = key
+        self.merge = merge
+        self.window = window
+        self._buckets: dict[Hashable, list[tuple[PipelineJob, Any]]] = {}
+        self._timers: set[asyncio.Task] = set()
+
+    async def _handle(self, job: PipelineJob, item: Any):
+        """항목 버퍼링 (키의 첫 항목이면 flush 예약)"""
+        if self.window <= 0:
+            await self._emit([(job, item)])
+            return
+
+        key = self.key(item)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [(job, item)]
+            timer = asyncio.create_task(self._flush_later(key))
+            self._timers.add(timer)
+            timer.add_done_callback(self._timers.discard)
+        else:
+            bucket.append((job, item))
+
+    async def _flush_later(self, key: Hashable):
+        """window초 후 키의 항목 방출"""
+        await asyncio.sleep(self.window)
+        entries = self._buckets.pop(key, [])
+        if entries:
+            await self._emit(entries)
+
+    async def _emit(self, entries: list[tuple[PipelineJob, Any]]):
+        """모인 항목을 합쳐 다음 단계로 전달"""
+        # 작업별로 항목 1개만 남기고 나머지는 완료 처리
+        jobs: list[PipelineJob] = []
+        for job, _ in entries:
+            if any(job is seen for seen in jobs):
+                job.finish()
+            else:
+                jobs.append(job)
+        merged_job: AnyJob = jobs[0] if len(jobs) == 1 else MergedJob(jobs)
+
+        self.stats.processed += len(entries)
+        try:
+            output = self.merge([item for _, item in entries])
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Pipeline stage '{self.name}' failed: {e}", exc_info=True)
+            merged_job.finish(f"{self.name}: {e}")
+            return
+
+        if self.next is None:
+            merged_job.finish()
+            return
+
+        self.stats.emitted += 1
+        await self.next.put(merged_job, output)
+
+    async def stop(self):
+        """워커/예약 종료 (버퍼의 항목은 버림 - 인박스 재처리 + 아웃박스 중복 방지로 복구)"""
+        for task in list(self._timers):
+            task.cancel()
+        if self._timers:
+            await asyncio.gather(*self._timers, return_exceptions=True)
+
+        buffered = sum(len(entries) for entries in self._buckets.values())
+        if buffered:
+            logger.warning(f"Pipeline stage '{self.name}' stopped with {buffered} buffered items")
+        self._buckets.clear()
+        await super().stop()
+
+    def snapshot(self) -> dict:
+        """현재 상태 (버퍼 크기 포함)"""
+        return {
+            **super().snapshot(),
+            "buffered": sum(len(entries) for entries in self._buckets.values()),
+        }
+
+
+class EventPipeline:
+    """단계 연결 + 실행 관리"""
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = stages
+        for current, following in zip(stages, stages[1:]):
+            current.next = following
+
+    def start(self):
+        """모든 단계 워커 시작"""
+        for stage in self.stages:
+            stage.start()
+        logger.info(
+            "Event pipeline started: "
+            + " -> ".join(f"{s.name}({s.concurrency})" for s in self.stages)
+        )
+
+    async def stop(self):
+        """모든 단계 워커 종료"""
+        for stage in self.stages:
+            await stage.stop()
+        logger.info("Event pipeline stopped")
+
+    async def submit(self, item: Any) -> PipelineJob:
+        """항목 1개 투입 (첫 단계 큐에 들어가면 반환, 완료는 job.wait()으로 확인)"""
+        job = PipelineJob()
+        await self.stages[0].put(job, item)
+        return job
+
+    async def run(self, item: Any):
+        """항목 1개 투입 후 파생 항목이 모두 끝날 때까지 대기
+
+        Raises:
+            PipelineError: 처리 중 단계 에러가 있었던 경우
+        """
+        job = await self.submit(item)
+        await job.wait()
+
+    def stats(self) -> dict:
+        """단계별 큐 깊이/통계"""
+        return {stage.name: stage.snapshot() for stage in self.stages}
+
+
+@dataclass
+class WebhookPayload:
+    """파이프라인 입력 (웹훅 원본)"""
+    source: str  # "moralis" / "helius"
+    data: Any
+
+
+async def decode_payload(payload: WebhookPayload) -> list:
+    """decode 단계: 소스별 디코더로 전송 목록 추출 + 가격 일괄 조회"""
+    from .moralis import decode_moralis_webhook
+    from .helius import decode_helius_webhook
+
+    if payload.source == "moralis":
+        transfers = await decode_moralis_webhook(payload.data)
+    elif payload.source == "helius":
+        transfers = await decode_helius_webhook(payload.data)
+    else:
+        raise ValueError(f"Unknown webhook source: {payload.source}")
+
+    # 페이로드 전체 토큰 가격을 최소 요청으로 미리 조회 (enrich 단계는 캐시 히트)
+    await TransactionProcessor.prefetch_prices(transfers)
+    return transfers
+
+
+def build_pipeline() -> EventPipeline:
+    """설정값으로 파이프라인 구성"""
+    size = settings.pipeline_queue_size
+    return EventPipeline([
+        Stage("decode", decode_payload, settings.pipeline_decode_workers, size),
+        Stage("match", TransactionProcessor.match, settings.pipeline_match_workers, size),
+        Stage("enrich", TransactionProcessor.enrich, settings.pipeline_enrich_workers, size),
+        Stage("digest", DigestBuffer.route, 1, size),
+        CoalescingStage(
+            "coalesce",
+            key=TransactionProcessor.coalesce_key,
+            merge=NotificationGroup,
+            window=settings.notification_coalesce_window,
+            queue_size=size,
+        ),
+        Stage("render", TransactionProcessor.render, settings.pipeline_render_workers, size),
+        Stage("deliver", TransactionProcessor.deliver, settings.pipeline_deliver_workers, size),
+    ])
+
+
+# 파이프라인 인스턴스 (웹훅 서버 루프에서 start_pipeline)
+_pipeline: Optional[EventPipeline] = None
+
+
+def start_pipeline() -> EventPipeline:
+    """파이프라인 생성 + 시작"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = build_pipeline()
+        _pipeline.start()
+    return _pipeline
+
+
+async def stop_pipeline():
+    """파이프라인 종료"""
+    global _pipeline
+    if _pipeline is not None:
+        await _pipeline.stop()
+        _pipeline = None
+
+
+def get_pipeline_stats() -> dict:
+    """파이프라인 통계 (미시작이면 빈 dict)"""
+    return _pipeline.stats() if _pipeline else {}
+
+
+async def submit_pipeline(source: str, data: Any) -> PipelineJob:
+    """웹훅 페이로드 1건 투입 (완료는 반환된 작업으로 확인)"""
+    if _pipeline is None:
+        raise PipelineError("Event pipeline is not running")
+    return await _pipeline.submit(WebhookPayload(source=source, data=data))
@@ -1,13 +1,37 @@
 """트랜잭션 처리 공통 로직
 
-지갑 필터링 + 알림 발송 패턴을 추상화하여 코드 중복 제거
+디코딩된 전송(TransferInfo)을 파이프라인 단계별로 처리
+- match: 추적 지갑 매칭 (incoming 체크)
+- enrich: 필요한 경우에만 USD 가치 계산 + min_amount 필터
+- coalesce: 같은 (사용자, 트랜잭션) 알림 묶기 (pipeline.CoalescingStage)
+- render: 알림 메시지 생성 (묶음이면 한 메시지로, 라벨만 다른 메시지는 템플릿 재사용)
+- deliver: 아웃박스에 저장 후 전송 (중복 방지 + 재시도)
+
+매칭을 먼저 하므로 아무도 추적하지 않는 전송은 가격 조회 없이 버려진다.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
+from cachetools import LRUCache
 from loguru import logger
 
-from db.crud import WalletCRUD
-from .notifier import send_notification
+from config import settings
+from db.crud import LegConflictError
+from db.wallet_index import WalletIndex
+from services.price_service import PriceService
+from .notifier import format_grouped_notification, format_notification
+from .outbox import NotificationOutbox
+from .valuation import SwapLeg, value_locally
+
+
+# 렌더링 템플릿: 라벨을 뺀 알림 내용 -> 라벨 자리에 슬롯이 있는 메시지
+# (같은 고래 지갑을 추적하는 사용자 수백 명은 라벨만 다른 같은 메시지를 받는다)
+_templates: LRUCache = LRUCache(maxsize=2000)
+_template_stats = {"hits": 0, "misses": 0}
+
+
+def _label_slot(index: int) -> str:
+    """템플릿의 라벨 자리표시자 (메시지 본문에 나올 수 없는 문자 사용)"""
+    return f"\x00{index}\x00"
 
 
 @dataclass
@@ -18,102 +42,321 @@ class TransferInfo:
     chain: str
     tx_type: str  # "Transfer", "Token Transfer", "DEX Swap"
     amount: str  # "0.5 ETH", "100 USDC"
-    amount_usd: float
     tx_hash: str
+    amount_usd: float = 0.0
     is_swap: bool = False
     counterparty_name: Optional[str] = None  # DEX 이름 등
+    quantity: float = 0.0  # USD 환산용 수량 (0이면 amount_usd 유지)
+    token_address: Optional[str] = None  # None이면 네이티브 토큰
+    symbol: str = ""  # 전송 토큰 심볼 (스왑은 빈 값, 요약 알림 순유입 계산용)
+    legs: list[SwapLeg] = field(default_factory=list)  # 스왑 양쪽 레그 (가치 계산용)
+    leg: str = ""  # 트랜잭션 내 전송 구분자 (알림 중복 방지 키)
+
+    def valuation_legs(self) -> list[SwapLeg]:
+        """USD 가치 계산 대상 레그 (레그가 없으면 전송 자체)"""
+        if self.legs:
+            return self.legs
+        if self.quantity > 0:
+            return [SwapLeg(token_address=self.token_address, quantity=self.quantity)]
+        return []
+
+
+@dataclass
+class Notification:
+    """지갑별 알림 데이터 클래스"""
+    user_id: int
+    wallet_id: int
+    label: str
+    direction: str  # "IN" / "OUT" / "" (스왑)
+    counterparty: str
+    info: TransferInfo
+    min_amount_usd: float = 0.0
+    digest_mode: str = "auto"
+    text: str = ""
+
+
+@dataclass
+class NotificationGroup:
+    """같은 (사용자, 트랜잭션) 알림 묶음 - 메시지 1건으로 전송"""
+    items: list[Notification]
+    text: str = ""
+
+    def __post_init__(self):
+        # 웹훅 재전송으로 같은 전송이 묶음 안에 두 번 들어온 경우 제거
+        unique: dict[tuple, Notification] = {}
+        for item in self.items:
+            key = (item.label, item.direction, item.info.leg) if item.info.leg else id(item)
+            unique.setdefault(key, item)
+        self.items = list(unique.values())
+
+    @property
+    def user_id(self) -> int:
+        return self.items[0].user_id
+
+    @property
+    def info(self) -> TransferInfo:
+        """대표 전송 정보 (체인/tx_hash 공통)"""
+        return self.items[0].info
+
+    @property
+    def label(self) -> str:
+        return ", ".join(dict.fromkeys(item.label for item in self.items))
+
+    @property
+    def legs(self) -> list[tuple[str, str]]:
+        """아웃박스 중복 방지용 개별 전송 (direction, leg) 목록"""
+        return [(item.direction, item.info.leg) for item in self.items]
+
+
+@dataclass
+class MatchedTransfer:
+    """추적 지갑이 있는 전송 (USD 가치 계산 전)"""
+    info: TransferInfo
+    candidates: list[Notification]
 
 
 class TransactionProcessor:
     """트랜잭션 처리 공통 클래스
 
-    지갑 필터링, min_amount 체크, 알림 발송 로직을 통합
+    파이프라인 각 단계의 핸들러. 핸들러는 다음 단계로 넘길 항목 리스트를 반환한다.
     """
 
     @staticmethod
-    async def process_transfer(info: TransferInfo) -> int:
-        """전송 트랜잭션 처리
+    async def match(info: TransferInfo) -> list[MatchedTransfer]:
+        """추적 지갑 매칭 (추적자가 없으면 버림)"""
+        candidates = TransactionProcessor._collect_candidates(info)
+        if not candidates:
+            return []
+        return [MatchedTransfer(info=info, candidates=candidates)]
 
-        Args:
-            info: 전송 정보
+    @staticmethod
+    async def prefetch_prices(transfers: list[TransferInfo]):
+        """페이로드 단위 가격 일괄 조회
 
-        Returns:
-            발송된 알림 수
+        가치 계산이 필요한 전송의 (체인, 컨트랙트)만 모아 한 번에 캐시를 채워,
+        이후 enrich 단계의 개별 조회가 모두 캐시 히트가 되도록 한다.
+        스테이블/래핑 네이티브 레그로 계산 가능한 전송은 조회하지 않는다.
+        """
+        pairs = set()
+        for info in transfers:
+            if info.quantity <= 0:
+                continue
+            candidates = TransactionProcessor._collect_candidates(info)
+            if (
+                candidates
+                and TransactionProcessor._needs_usd(
+                    MatchedTransfer(info=info, candidates=candidates)
+                )
+                and value_locally(info.chain, info.valuation_legs()) is None
+            ):
+                pairs.add((info.chain, info.token_address))
+
+        if pairs:
+            await PriceService.prefetch(pairs)
+
+    @staticmethod
+    async def enrich(matched: MatchedTransfer) -> list[Notification]:
+        """USD 가치 계산 (필요할 때만) + min_amount 필터
+
+        스테이블/래핑 네이티브 레그가 있으면 로컬 계산, 없을 때만 가격 조회.
         """
-        notifications_sent = 0
+        info = matched.info
 
-        # FROM 지갑 알림 (항상)
-        notifications_sent += await TransactionProcessor._notify_wallets(
-            address=info.from_addr,
-            direction="OUT",
-            info=info,
-            counterparty=info.counterparty_name or info.to_addr,
-            check_incoming=False
+        if TransactionProcessor._needs_usd(matched):
+            local_usd = value_locally(info.chain, info.valuation_legs())
+            if local_usd is not None:
+                info.amount_usd = local_usd
+            elif info.quantity > 0:
+                info.amount_usd = await PriceService.get_usd_value(
+                    info.chain, info.quantity, info.token_address
+                )
+
+        logger.debug(
+            f"{info.tx_type} on {info.chain}: {info.from_addr[:10]}... -> "
+            f"{info.to_addr[:10]}... | {info.amount} (${info.amount_usd:.2f})"
         )
 
-        # TO 지갑 알림 (스왑이 아닌 경우, incoming 체크)
-        if not info.is_swap:
-            notifications_sent += await TransactionProcessor._notify_wallets(
-                address=info.to_addr,
-                direction="IN",
-                info=info,
-                counterparty=info.counterparty_name or info.from_addr,
-                check_incoming=True
+        notifications = []
+        for candidate in matched.candidates:
+            min_amount = candidate.min_amount_usd
+            if info.amount_usd < min_amount:
+                logger.debug(
+                    f"[SKIP] {candidate.label}: ${info.amount_usd:.2f} < ${min_amount:.2f} (min_amount)"
+                )
+                continue
+
+            logger.info(
+                f"[PASS] {candidate.label}: ${info.amount_usd:.2f} >= ${min_amount:.2f} "
+                f"({candidate.direction or 'SWAP'} on {info.chain})"
             )
+            notifications.append(candidate)
 
-        return notifications_sent
+        return notifications
 
     @staticmethod
-    async def process_swap(
-        from_addr: str,
-        chain: str,
-        swap_summary: str,
-        amount_usd: float,
-        tx_hash: str,
-        dex_name: str = "DEX"
-    ) -> int:
-        """스왑 트랜잭션 처리
+    def _needs_usd(matched: MatchedTransfer) -> bool:
+        """USD 가치가 필요한지 (금액 필터 또는 메시지 표시용)"""
+        if any(c.min_amount_usd > 0 for c in matched.candidates):
+            return True
+        # 스왑 메시지는 USD를 표시하지 않음
+        return settings.notification_show_usd and not matched.info.is_swap
 
-        Args:
-            from_addr: 스왑 실행자 주소
-            chain: 체인 코드
-            swap_summary: 스왑 요약 (예: "0.5 ETH -> 1000 USDC")
-            amount_usd: USD 가치
-            tx_hash: 트랜잭션 해시
-            dex_name: DEX 이름
+    @staticmethod
+    def coalesce_key(notification: Notification) -> tuple:
+        """알림 묶음 키 (사용자, 체인, 트랜잭션)"""
+        return notification.user_id, notification.info.chain, notification.info.tx_hash
 
-        Returns:
-            발송된 알림 수
+    @staticmethod
+    async def render(group: NotificationGroup) -> list[NotificationGroup]:
+        """알림 메시지 생성 (여러 건이면 한 메시지로)
+
+        라벨을 뺀 내용이 같은 묶음은 한 번만 렌더링하고 라벨만 치환한다.
         """
-        info = TransferInfo(
-            from_addr=from_addr,
-            to_addr="",
-            chain=chain,
-            tx_type="DEX Swap",
-            amount=swap_summary,
-            amount_usd=amount_usd,
-            tx_hash=tx_hash,
-            is_swap=True,
-            counterparty_name=dex_name
+        labels = list(dict.fromkeys(item.label for item in group.items))
+        key = tuple(
+            (
+                labels.index(item.label),
+                item.direction,
+                item.counterparty,
+                item.info.chain,
+                item.info.tx_hash,
+                item.info.leg,
+                item.info.tx_type,
+                item.info.amount,
+                item.info.amount_usd,
+                item.info.is_swap,
+            )
+            for item in group.items
+        )
+
+        template = _templates.get(key)
+        if template is None:
+            _template_stats["misses"] += 1
+            template = TransactionProcessor._render_template(group, labels)
+            _templates[key] = template
+        else:
+            _template_stats["hits"] += 1
+
+        text = template
+        for index, label in enumerate(labels):
+            text = text.replace(_label_slot(index), label)
+        group.text = text
+        return [group]
+
+    @staticmethod
+    def template_stats() -> dict:
+        """렌더링 템플릿 캐시 통계"""
+        return {**_template_stats, "size": len(_templates)}
+
+    @staticmethod
+    def _render_template(group: NotificationGroup, labels: list[str]) -> str:
+        """라벨 자리에 슬롯을 넣어 메시지 생성"""
+        slots = {label: _label_slot(index) for index, label in enumerate(labels)}
+
+        if len(group.items) == 1:
+            notification = group.items[0]
+            info = notification.info
+            return format_notification(
+                label=slots[notification.label],
+                chain=info.chain,
+                tx_type=info.tx_type,
+                direction=notification.direction,
+                amount=info.amount,
+                amount_usd=info.amount_usd,
+                counterparty=notification.counterparty,
+                tx_hash=info.tx_hash,
+                is_swap=info.is_swap,
+            )
+
+        logger.debug(f"Coalesced {len(group.items)} notifications for {group.user_id}")
+        return format_grouped_notification(
+            chain=group.info.chain,
+            tx_hash=group.info.tx_hash,
+            items=[
+                {
+                    "label": slots[item.label],
+                    "tx_type": item.info.tx_type,
+                    "direction": item.direction,
+                    "amount": item.info.amount,
+                    "amount_usd": item.info.amount_usd,
+                    "counterparty": item.counterparty,
+                    "is_swap": item.info.is_swap,
+                }
+                for item in group.items
+            ],
+        )
+
+    @staticmethod
+    async def deliver(group: NotificationGroup) -> None:
+        """아웃박스에 저장 후 전송 (이미 저장된 알림이면 무시)
+
+        재처리 때 묶음 일부가 이미 다른 알림으로 저장돼 있으면 남은 전송만 다시 렌더링해 저장한다.
+        """
+        while True:
+            try:
+                await NotificationOutbox.add(
+                    user_id=group.user_id,
+                    tx_hash=group.info.tx_hash,
+                    legs=group.legs,
+                    label=group.label,
+                    text=group.text,
+                )
+                return
+            except LegConflictError as e:
+                items = [
+                    item for item in group.items
+                    if (item.direction, item.info.leg) not in e.existing
+                ]
+                if not items:
+                    return
+                logger.debug(
+                    f"Regrouping {group.info.tx_hash[:16]}... for user {group.user_id}: "
+                    f"{len(e.existing)} legs already notified"
+                )
+                [group] = await TransactionProcessor.render(NotificationGroup(items))
+
+    @staticmethod
+    def _collect_candidates(info: TransferInfo) -> list[Notification]:
+        """전송 양쪽의 추적 지갑 알림 후보"""
+        # 스왑: 실행자만 알림
+        if info.is_swap:
+            return TransactionProcessor._match_wallets(
+                address=info.from_addr,
+                direction="",
+                info=info,
+                counterparty=info.counterparty_name or "DEX",
+                check_incoming=False,
+            )
+
+        # FROM 지갑 알림 (항상)
+        candidates = TransactionProcessor._match_wallets(
+            address=info.from_addr,
+            direction="OUT",
+            info=info,
+            counterparty=info.counterparty_name or info.to_addr,
+            check_incoming=False,
         )
 
-        return await TransactionProcessor._notify_wallets(
-            address=from_addr,
-            direction="",
+        # TO 지갑 알림 (incoming 체크)
+        candidates += TransactionProcessor._match_wallets(
+            address=info.to_addr,
+            direction="IN",
             info=info,
-            counterparty=dex_name,
-            check_incoming=False
+            counterparty=info.counterparty_name or info.from_addr,
+            check_incoming=True,
         )
 
+        return candidates
+
     @staticmethod
-    async def _notify_wallets(
+    def _match_wallets(
         address: str,
         direction: str,
         info: TransferInfo,
         counterparty: str,
         check_incoming: bool
-    ) -> int:
-        """지갑별 알림 발송
+    ) -> list[Notification]:
+        """주소를 추적 중인 지갑별 알림 후보 생성
 
         Args:
             address: 확인할 지갑 주소
@@ -123,46 +366,29 @@ class TransactionProcessor:
             check_incoming: incoming_enabled 체크 여부
 
         Returns:
-            발송된 알림 수
+            incoming 체크를 통과한 알림 후보 목록 (금액 필터 전)
         """
-        if not address:
-            return 0
-
-        wallets = await WalletCRUD.get_wallet_by_address(address.lower())
-        notifications_sent = 0
+        # 인메모리 인덱스 조회 (DB 왕복 없음, 미추적 주소는 빈 튜플)
+        wallets = WalletIndex.lookup(address)
+        candidates = []
 
         for wallet in wallets:
             # incoming 체크 (수신 알림인 경우)
-            if check_incoming and not wallet.get("incoming_enabled"):
-                logger.debug(f"[SKIP] {wallet['label']}: incoming disabled")
+            if check_incoming and not wallet.incoming_enabled:
+                logger.debug(f"[SKIP] {wallet.label}: incoming disabled")
                 continue
 
-            # min_amount 체크 (None 대비 float 변환)
-            min_amount = float(wallet.get("min_amount_usd") or 0)
-            if info.amount_usd < min_amount:
-                logger.debug(
-                    f"[SKIP] {wallet['label']}: ${info.amount_usd:.2f} < ${min_amount:.2f} (min_amount)"
+            candidates.append(
+                Notification(
+                    user_id=wallet.user_id,
+                    wallet_id=wallet.wallet_id,
+                    label=wallet.label,
+                    direction=direction,
+                    counterparty=counterparty,
+                    info=info,
+                    min_amount_usd=wallet.min_amount_usd,
+                    digest_mode=wallet.digest_mode,
                 )
-                continue
-
-            # 알림 발송
-            logger.info(
-                f"[PASS] {wallet['label']}: ${info.amount_usd:.2f} >= ${min_amount:.2f} "
-                f"({direction or 'SWAP'} on {info.chain})"
-            )
-
-            await send_notification(
-                user_id=wallet["user_id"],
-                label=wallet["label"],
-                chain=info.chain,
-                tx_type=info.tx_type,
-                direction=direction,
-                amount=info.amount,
-                amount_usd=info.amount_usd,
-                counterparty=counterparty,
-                tx_hash=info.tx_hash,
-                is_swap=info.is_swap,
             )
-            notifications_sent += 1
 
-        return notifications_sent
+        return candidates
@@ -1,4 +1,8 @@
-"""FastAPI 웹훅 서버 - 인증 강화 + Rate Limiting + 대시보드 서빙"""
+"""FastAPI 웹훅 서버 - 인증 강화 + Rate Limiting + 대시보드 서빙
+
+검증된 웹훅은 인박스에 기록 후 즉시 응답하고, 처리는 백그라운드 워커가 담당
+"""
+import json
 import time
 from pathlib import Path
 from typing import Optional
@@ -11,9 +15,18 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from config.base import settings
+from services.price_sources import get_price_resolver
 from utils.signature import verify_moralis_signature, verify_helius_auth
-from .moralis import process_moralis_webhook
-from .helius import process_helius_webhook
+from .inbox import WebhookInbox
+from .pipeline import get_pipeline_stats
+from .delivery import get_delivery_stats
+from .outbox import NotificationOutbox
+from .digest import DigestBuffer
+from .processor import TransactionProcessor
+from services.rpc_batcher import rpc_batch_stats
+from analyzers.cache import AnalysisCache
+from analyzers.speculative import SpeculativeAnalysis
+from services.token_facts import TokenFactsService
 
 # Rate Limiter 설정 (IP 기반)
 limiter = Limiter(key_func=get_remote_address)
@@ -30,7 +43,39 @@ def create_app() -> FastAPI:
     @app.get("/health")
     async def health():
         """헬스 체크"""
-        return {"status": "ok", "timestamp": int(time.time())}
+        return {
+            "status": "ok",
+            "timestamp": int(time.time()),
+            "inbox_queued": WebhookInbox.queue_depth(),
+        }
+
+    @app.get("/health/pipeline")
+    async def pipeline_health():
+        """파이프라인 단계별 큐 깊이/처리 통계"""
+        resolver = get_price_resolver()
+        return {
+            "inbox_queued": WebhookInbox.queue_depth(),
+            "inbox_in_flight": WebhookInbox.in_flight(),
+            "stages": get_pipeline_stats(),
+            "delivery": get_delivery_stats(),
+            "outbox": await NotificationOutbox.get_stats(),
+            "templates": TransactionProcessor.template_stats(),
+            "digest": DigestBuffer.get_stats(),
+            "rpc": rpc_batch_stats(),
+            "price_sources": {
+                "resolver": resolver.stats,
+                **{source.name: source.stats for source in resolver.sources},
+            },
+        }
+
+    @app.get("/health/analysis")
+    async def analysis_health():
+        """토큰 분석 캐시 / 추측 분석 통계"""
+        return {
+            "cache": AnalysisCache.get_stats(),
+            "speculation": SpeculativeAnalysis.get_stats(),
+            "facts": TokenFactsService.get_stats(),
+        }
 
     @app.post("/webhook/moralis")
     @limiter.limit("60/minute")  # IP당 분당 60회 제한
@@ -59,8 +104,7 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=401, detail="Invalid signature")
 
         try:
-            # JSON 파싱
-            import json
+            # JSON 파싱 (형식 검증)
             data = json.loads(body)
 
             tx_count = len(data.get("txs", []))
@@ -70,14 +114,19 @@ def create_app() -> FastAPI:
             )
             # 보안: 페이로드 전체 로깅 제거 (민감정보 포함 가능)
 
-            await process_moralis_webhook(data)
+            # 미확정 트랜잭션은 처리 대상이 아니므로 인박스에 기록하지 않음
+            if not data.get("confirmed"):
+                logger.debug("Skipping unconfirmed transaction")
+                return {"status": "ok", "queued": 0}
+
+            entry_id = await WebhookInbox.enqueue("moralis", body.decode("utf-8"))
 
             elapsed = time.time() - start_time
-            logger.info(f"Moralis webhook processed in {elapsed:.3f}s")
+            logger.info(f"Moralis webhook queued in {elapsed:.3f}s (inbox #{entry_id})")
 
-            return {"status": "ok", "processed": tx_count}
+            return {"status": "ok", "queued": tx_count}
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             logger.error(f"Moralis webhook JSON parse error: {e}")
             raise HTTPException(status_code=400, detail="Invalid JSON")
         except Exception as e:
@@ -107,20 +156,24 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=401, detail="Unauthorized")
 
         try:
-            body = await request.json()
+            raw = await request.body()
+            body = json.loads(raw)
 
             # body는 리스트 형태
             tx_count = len(body) if isinstance(body, list) else 1
             logger.info(f"Helius webhook received: txs={tx_count}")
             # 보안: 페이로드 전체 로깅 제거 (민감정보 포함 가능)
 
-            await process_helius_webhook(body)
+            entry_id = await WebhookInbox.enqueue("helius", raw.decode("utf-8"))
 
             elapsed = time.time() - start_time
-            logger.info(f"Helius webhook processed in {elapsed:.3f}s")
+            logger.info(f"Helius webhook queued in {elapsed:.3f}s (inbox #{entry_id})")
 
-            return {"status": "ok", "processed": tx_count}
+            return {"status": "ok", "queued": tx_count}
 
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Helius webhook JSON parse error: {e}")
+            raise HTTPException(status_code=400, detail="Invalid JSON")
         except Exception as e:
             logger.error(f"Helius webhook error: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,48 @@
+"""네트워크 조회 없는 USD 가치 계산
+
+전송/스왑 레그 중 스테이블코인이나 (래핑) 네이티브 토큰이 있으면 USD 가치는
+이미 페이로드에 들어 있는 셈이므로 가격 API 없이 계산한다.
+- 스테이블코인: 수량 x $1
+- 네이티브/래핑 네이티브: 수량 x 캐시된 네이티브 가격 (가격 갱신 스케줄러가 유지)
+
+알아볼 수 있는 레그가 없으면 None을 반환하고, 호출 측이 가격 API로 폴백한다.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from config import STABLECOINS, WRAPPED_NATIVE
+from services.price_service import PriceService
+
+
+@dataclass
+class SwapLeg:
+    """스왑 한쪽 레그 (보낸/받은 토큰)"""
+    token_address: Optional[str]  # None이면 네이티브 토큰
+    quantity: float
+
+
+def leg_value(chain: str, leg: SwapLeg) -> Optional[float]:
+    """레그 1개의 USD 가치 (기준 토큰이 아니거나 네이티브 가격이 캐시에 없으면 None)"""
+    if leg.quantity <= 0:
+        return None
+
+    if leg.token_address:
+        # Solana 민트는 대소문자 구분
+        address = leg.token_address if chain == "sol" else leg.token_address.lower()
+        if address in STABLECOINS.get(chain, {}):
+            return leg.quantity
+        if address != WRAPPED_NATIVE.get(chain):
+            return None
+
+    price = PriceService.get_cached_native_price(chain)
+    return leg.quantity * price if price else None
+
+
+def value_locally(chain: str, legs: list[SwapLeg]) -> Optional[float]:
+    """레그 목록의 USD 가치 (로컬 계산 불가면 None)"""
+    values = [v for v in (leg_value(chain, leg) for leg in legs) if v is not None]
+    if not values:
+        return None
+
+    # 스왑 양쪽 가치는 거의 같음 (수수료/슬리피지만큼 차이) - 큰 쪽 기준
+    return max(values)